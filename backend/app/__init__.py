@@ -6,6 +6,10 @@ from app.stripe_webhook import stripe_webhook
 from app.revenuecat_webhook import revenuecat_webhook
 from app.ai_evaluate import bp as ai_evaluate_bp
 from app.config import Config
+from app.warmup import start_cache_warmup
+from app.compression import init_compression
+from app.content_versions import start_content_version_poller
+from app.pathway_lessons import start_pathway_refresher
 
 def create_app():
     app = Flask(__name__)
@@ -35,7 +39,7 @@ def create_app():
         origin = request.headers.get("Origin")
         if origin and origin in allowed_origins:
             response.headers["Access-Control-Allow-Origin"] = origin
-            response.headers["Vary"] = "Origin"
+            response.vary.add("Origin")
             response.headers["Access-Control-Allow-Credentials"] = "true"
             response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
             response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
@@ -47,4 +51,8 @@ def create_app():
     app.register_blueprint(stripe_webhook)  # Register Stripe webhook
     app.register_blueprint(revenuecat_webhook)  # Register RevenueCat webhook
     app.register_blueprint(ai_evaluate_bp)  # Register AI evaluation routes
+    init_compression(app)  # gzip/brotli large JSON responses
+    start_cache_warmup()  # Fill hot caches in the background after a cold start
+    start_content_version_poller()  # Evict caches for content the import tools changed
+    start_pathway_refresher()  # Reload the pathway list before it expires
     return app
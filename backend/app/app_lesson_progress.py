@@ -4,7 +4,9 @@ import re
 import time
 from collections import defaultdict
 
-from app.supabase_client import supabase
+from app.cache import TTLCache
+from app.content_versions import LESSON_SCOPE, content_cache_ttl, register_invalidator
+from app.supabase_client import run_concurrently, supabase
 
 APP_PAGE_ORDER = [
     "prepare",
@@ -26,9 +28,21 @@ CARD_SECTION_TYPES = {
     "culture_note",
 }
 
+# Progress only needs to know whether a phrase has any content, so take the
+# first node of each rich-text array instead of the whole blob.
+PHRASE_CONTENT_PRESENCE_SELECT = (
+    "id, content, content_th, "
+    "content_jsonb_head:content_jsonb->0, content_jsonb_th_head:content_jsonb_th->0"
+)
+
 APP_KEY_PREFIX = "app:"
-APP_EXPECTATIONS_TTL_SECONDS = 900
-_app_expectations_cache = {}
+APP_EXPECTATIONS_TTL_SECONDS = content_cache_ttl(900)
+_app_expectations_cache = TTLCache(
+    "app_expectations",
+    ttl_seconds=APP_EXPECTATIONS_TTL_SECONDS,
+    copy_values=True,
+)
+_content_counts_rpc_missing = False
 
 
 def build_app_page_key(page_name):
@@ -141,6 +155,115 @@ def _execute_with_retry(build_query, label, retries=2, base_delay=0.2):
     raise last_error
 
 
+def _elapsed_ms(start):
+    return int((time.perf_counter() - start) * 1000)
+
+
+def timed_query(build_query, label):
+    start = time.perf_counter()
+    result = _execute_with_retry(build_query, label)
+    return result, _elapsed_ms(start)
+
+
+def _timed_fetch(fetch):
+    start = time.perf_counter()
+    result = fetch()
+    return result, _elapsed_ms(start)
+
+
+def run_source_queries(queries):
+    """Run source fetches concurrently and return ``({name: result}, {name: elapsed_ms})``.
+
+    Each value is either a ``(build_query, label)`` pair, executed with retry, or
+    a zero-argument callable for fetches that are not a single query.
+    """
+    fetches = {}
+    for name, spec in queries.items():
+        if callable(spec):
+            fetches[name] = spec
+        else:
+            build_query, label = spec
+            fetches[name] = (
+                lambda build_query=build_query, label=label: _execute_with_retry(build_query, label)
+            )
+    timed = run_concurrently({
+        name: (lambda fetch=fetch: _timed_fetch(fetch))
+        for name, fetch in fetches.items()
+    })
+    results = {name: result for name, (result, _) in timed.items()}
+    timings = {name: elapsed_ms for name, (_, elapsed_ms) in timed.items()}
+    return results, timings
+
+
+def _count_rows_by_lesson(table_name, lesson_ids):
+    result = _execute_with_retry(
+        lambda: (
+            supabase.table(table_name)
+            .select("lesson_id")
+            .in_("lesson_id", lesson_ids)
+        ),
+        f"{table_name} content counts",
+    )
+    counts = defaultdict(int)
+    for row in result.data or []:
+        counts[row.get("lesson_id")] += 1
+    return counts
+
+
+def fetch_lesson_content_counts(lesson_ids):
+    """Return ``{lesson_id: {"transcript": n, "questions": n}}`` for progress expectations.
+
+    Uses the grouped-count RPC so the payload is one row per lesson; falls back to
+    downloading lesson_id rows until the RPC migration is applied.
+    """
+    global _content_counts_rpc_missing
+    lesson_ids = [lesson_id for lesson_id in lesson_ids if lesson_id]
+    if not lesson_ids:
+        return {}
+
+    if not _content_counts_rpc_missing:
+        try:
+            result = _execute_with_retry(
+                lambda: supabase.rpc("get_lesson_content_counts", {"p_lesson_ids": lesson_ids}),
+                "lesson content counts rpc",
+            )
+            return {
+                row.get("lesson_id"): {
+                    "transcript": row.get("transcript_count") or 0,
+                    "questions": row.get("question_count") or 0,
+                }
+                for row in (result.data or [])
+                if row.get("lesson_id")
+            }
+        except Exception as exc:
+            if "PGRST202" in str(exc):
+                _content_counts_rpc_missing = True
+            print(f"[progress:content-counts] rpc failed, counting rows instead: {exc}", flush=True)
+
+    transcript_counts = _count_rows_by_lesson("transcript_lines", lesson_ids)
+    question_counts = _count_rows_by_lesson("comprehension_questions", lesson_ids)
+    return {
+        lesson_id: {
+            "transcript": transcript_counts.get(lesson_id, 0),
+            "questions": question_counts.get(lesson_id, 0),
+        }
+        for lesson_id in lesson_ids
+    }
+
+
+def format_query_timings(timings):
+    return " ".join(f"{name}_ms={elapsed_ms}" for name, elapsed_ms in timings.items())
+
+
+def phrase_has_content(phrase):
+    return bool(
+        _clean_text(phrase.get("content"))
+        or _clean_text(phrase.get("content_th"))
+        or phrase.get("content_jsonb_head") is not None
+        or phrase.get("content_jsonb_th_head") is not None
+    )
+
+
 def _coerce_jsonish(value):
     if isinstance(value, (list, dict)):
         return value
@@ -195,55 +318,45 @@ def _fetch_app_progress_source_rows(lesson_ids):
     if not lesson_ids:
         return {
             "sections": [],
-            "transcript": [],
-            "questions": [],
+            "content_counts": {},
             "exercises": [],
             "lesson_phrases": [],
             "phrases": [],
         }
 
-    sections_result = _execute_with_retry(
-        lambda: (
-            supabase.table("lesson_sections")
-            .select("lesson_id, id, type, sort_order, content_jsonb, content_jsonb_th")
-            .in_("lesson_id", lesson_ids)
-            .order("sort_order", desc=False)
-        ),
-        "app lesson progress lesson_sections",
-    )
-    transcript_result = _execute_with_retry(
-        lambda: (
-            supabase.table("transcript_lines")
-            .select("lesson_id")
-            .in_("lesson_id", lesson_ids)
-        ),
-        "app lesson progress transcript_lines",
-    )
-    questions_result = _execute_with_retry(
-        lambda: (
-            supabase.table("comprehension_questions")
-            .select("lesson_id, id")
-            .in_("lesson_id", lesson_ids)
+    fetch_start = time.perf_counter()
+    results, timings = run_source_queries({
+        "sections": (
+            lambda: (
+                supabase.table("lesson_sections")
+                .select("lesson_id, id, type, sort_order, content_jsonb, content_jsonb_th")
+                .in_("lesson_id", lesson_ids)
+                .order("sort_order", desc=False)
+            ),
+            "app lesson progress lesson_sections",
         ),
-        "app lesson progress comprehension_questions",
-    )
-    exercises_result = _execute_with_retry(
-        lambda: (
-            supabase.table("practice_exercises")
-            .select("lesson_id, id, title, sort_order")
-            .in_("lesson_id", lesson_ids)
-            .order("sort_order", desc=False)
+        "content_counts": lambda: fetch_lesson_content_counts(lesson_ids),
+        "exercises": (
+            lambda: (
+                supabase.table("practice_exercises")
+                .select("lesson_id, id, title, sort_order")
+                .in_("lesson_id", lesson_ids)
+                .order("sort_order", desc=False)
+            ),
+            "app lesson progress practice_exercises",
         ),
-        "app lesson progress practice_exercises",
-    )
-    lesson_phrases_result = _execute_with_retry(
-        lambda: (
-            supabase.table("lesson_phrases")
-            .select("lesson_id, phrase_id")
-            .in_("lesson_id", lesson_ids)
+        "lesson_phrases": (
+            lambda: (
+                supabase.table("lesson_phrases")
+                .select("lesson_id, phrase_id")
+                .in_("lesson_id", lesson_ids)
+            ),
+            "app lesson progress lesson_phrases",
         ),
-        "app lesson progress lesson_phrases",
-    )
+    })
+    sections_result = results["sections"]
+    exercises_result = results["exercises"]
+    lesson_phrases_result = results["lesson_phrases"]
 
     phrase_ids = sorted({
         row.get("phrase_id")
@@ -252,20 +365,24 @@ def _fetch_app_progress_source_rows(lesson_ids):
     })
     phrases = []
     if phrase_ids:
-        phrases_result = _execute_with_retry(
+        phrases_result, timings["phrases"] = timed_query(
             lambda: (
                 supabase.table("phrases")
-                .select("id, content, content_th, content_jsonb, content_jsonb_th")
+                .select(PHRASE_CONTENT_PRESENCE_SELECT)
                 .in_("id", phrase_ids)
             ),
             "app lesson progress phrases",
         )
         phrases = phrases_result.data or []
+    print(
+        f"[progress:app-sources] lessons={len(lesson_ids)} {format_query_timings(timings)} "
+        f"total_ms={_elapsed_ms(fetch_start)}",
+        flush=True,
+    )
 
     return {
         "sections": sections_result.data or [],
-        "transcript": transcript_result.data or [],
-        "questions": questions_result.data or [],
+        "content_counts": results["content_counts"],
         "exercises": exercises_result.data or [],
         "lesson_phrases": lesson_phrases_result.data or [],
         "phrases": phrases,
@@ -273,20 +390,14 @@ def _fetch_app_progress_source_rows(lesson_ids):
 
 
 def _get_cached_app_expectation(lesson_id):
-    cached = _app_expectations_cache.get(lesson_id)
-    if not cached:
-        return None
-    if time.time() - cached["ts"] > APP_EXPECTATIONS_TTL_SECONDS:
-        _app_expectations_cache.pop(lesson_id, None)
-        return None
-    return copy.deepcopy(cached["value"])
+    return _app_expectations_cache.get(lesson_id)
 
 
 def _set_cached_app_expectation(lesson_id, expectation):
-    _app_expectations_cache[lesson_id] = {
-        "ts": time.time(),
-        "value": copy.deepcopy(expectation),
-    }
+    _app_expectations_cache.set(lesson_id, expectation)
+
+
+register_invalidator(LESSON_SCOPE, _app_expectations_cache.invalidate)
 
 
 def _build_app_lesson_expectations_from_rows(lesson_ids, source_rows):
@@ -294,13 +405,13 @@ def _build_app_lesson_expectations_from_rows(lesson_ids, source_rows):
     for row in source_rows.get("sections") or []:
         sections_by_lesson[row.get("lesson_id")].append(row)
 
-    transcript_counts = defaultdict(int)
-    for row in source_rows.get("transcript") or []:
-        transcript_counts[row.get("lesson_id")] += 1
-
-    question_counts = defaultdict(int)
-    for row in source_rows.get("questions") or []:
-        question_counts[row.get("lesson_id")] += 1
+    content_counts = source_rows.get("content_counts") or {}
+    transcript_counts = {
+        lesson_id: counts["transcript"] for lesson_id, counts in content_counts.items()
+    }
+    question_counts = {
+        lesson_id: counts["questions"] for lesson_id, counts in content_counts.items()
+    }
 
     exercises_by_lesson = defaultdict(list)
     for row in source_rows.get("exercises") or []:
@@ -315,12 +426,7 @@ def _build_app_lesson_expectations_from_rows(lesson_ids, source_rows):
     for link in source_rows.get("lesson_phrases") or []:
         lesson_id = link.get("lesson_id")
         phrase = phrases_by_id.get(link.get("phrase_id")) or {}
-        if (
-            _clean_text(phrase.get("content"))
-            or _clean_text(phrase.get("content_th"))
-            or _coerce_jsonish(phrase.get("content_jsonb"))
-            or _coerce_jsonish(phrase.get("content_jsonb_th"))
-        ):
+        if phrase_has_content(phrase):
             has_phrase_content[lesson_id] = True
 
     expectations = {}
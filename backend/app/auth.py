@@ -0,0 +1,234 @@
+# app/auth.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import jwt
+from flask import jsonify, request
+
+from app.cache import register_cache_stats
+from app.config import Config
+from supabase_auth.errors import AuthApiError
+from app.supabase_client import supabase
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256", "EdDSA"}
+
+_jwks_client = None
+_jwks_client_lock = threading.Lock()
+_metrics_lock = threading.Lock()
+_logged_fallback_reasons = set()
+_auth_metrics = {
+    "local_verified": 0,
+    "local_rejected": 0,
+    "token_cache_hits": 0,
+    "token_cache_misses": 0,
+    "token_cache_evictions": 0,
+    "remote_fallbacks": 0,
+}
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+class _LocalVerificationUnavailable(Exception):
+    """Raised when a token cannot be checked locally and GoTrue must decide."""
+
+
+def _count(metric):
+    with _metrics_lock:
+        _auth_metrics[metric] += 1
+
+
+def _log_fallback_reason(reason):
+    # A missing secret would otherwise log on every request; once per reason is enough.
+    with _metrics_lock:
+        if reason in _logged_fallback_reasons:
+            return
+        _logged_fallback_reasons.add(reason)
+    print(f"[auth] local verification unavailable, using remote: {reason}", flush=True)
+
+
+def get_auth_metrics():
+    with _metrics_lock:
+        metrics = dict(_auth_metrics)
+    with _token_cache_lock:
+        metrics["token_cache_entries"] = len(_token_cache)
+    return metrics
+
+
+register_cache_stats("auth_tokens", get_auth_metrics)
+
+
+def _auth_issuer():
+    return f"{(Config.SUPABASE_URL or '').rstrip('/')}/auth/v1"
+
+
+def _get_jwks_client():
+    global _jwks_client
+    if _jwks_client is None:
+        with _jwks_client_lock:
+            if _jwks_client is None:
+                # PyJWKClient caches the key set for `lifespan` seconds and refetches
+                # it when a token names an unknown kid, which covers key rotation.
+                _jwks_client = jwt.PyJWKClient(
+                    f"{_auth_issuer()}/.well-known/jwks.json",
+                    cache_jwk_set=True,
+                    lifespan=Config.SUPABASE_JWKS_CACHE_SECONDS,
+                    headers={"apikey": Config.SUPABASE_KEY or ""},
+                    timeout=5,
+                )
+    return _jwks_client
+
+
+def _signing_key_for(access_token, algorithm):
+    if algorithm == "HS256":
+        if not Config.SUPABASE_JWT_SECRET:
+            raise _LocalVerificationUnavailable("SUPABASE_JWT_SECRET is not set")
+        return Config.SUPABASE_JWT_SECRET
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        try:
+            return _get_jwks_client().get_signing_key_from_jwt(access_token).key
+        except jwt.PyJWKClientError as e:
+            raise _LocalVerificationUnavailable(f"jwks lookup failed: {e}") from e
+    raise _LocalVerificationUnavailable(f"unsupported alg {algorithm}")
+
+
+def verify_access_token_locally(access_token):
+    """Validate signature, expiry, audience and issuer without calling GoTrue.
+
+    Returns the claims, raises ``jwt.InvalidTokenError`` for tokens that are
+    definitely invalid, and ``_LocalVerificationUnavailable`` when no key is
+    available to decide.
+    """
+    header = jwt.get_unverified_header(access_token)
+    algorithm = header.get("alg")
+    key = _signing_key_for(access_token, algorithm)
+    return jwt.decode(
+        access_token,
+        key,
+        algorithms=[algorithm],
+        audience=Config.SUPABASE_JWT_AUDIENCE,
+        issuer=_auth_issuer(),
+        leeway=Config.SUPABASE_JWT_LEEWAY_SECONDS,
+        options={"require": ["exp", "sub"]},
+    )
+
+
+def _user_from_claims(claims):
+    # Mirrors the attributes routes read from supabase.auth.get_user().user.
+    return SimpleNamespace(
+        id=claims.get("sub"),
+        email=claims.get("email"),
+        role=claims.get("role"),
+        app_metadata=claims.get("app_metadata") or {},
+        user_metadata=claims.get("user_metadata") or {},
+    )
+
+
+def _verify_token(access_token):
+    if Config.AUTH_LOCAL_JWT_VERIFY:
+        try:
+            claims = verify_access_token_locally(access_token)
+            _count("local_verified")
+            return SimpleNamespace(user=_user_from_claims(claims))
+        except (jwt.ExpiredSignatureError, jwt.InvalidSignatureError,
+                jwt.InvalidAudienceError, jwt.InvalidIssuerError) as e:
+            # A well-formed token we can check and that fails is rejected outright.
+            _count("local_rejected")
+            print(f"[auth] local verification rejected token: {e}", flush=True)
+            return SimpleNamespace(user=None)
+        except (_LocalVerificationUnavailable, jwt.InvalidTokenError) as e:
+            _log_fallback_reason(str(e))
+
+    _count("remote_fallbacks")
+    try:
+        return supabase.auth.get_user(access_token)
+    except AuthApiError as e:
+        if e.status in (401, 403):
+            # GoTrue rejected the token itself; report it like any other invalid token.
+            return SimpleNamespace(user=None)
+        raise
+
+
+def _token_key(access_token):
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+
+def _token_cache_expiry(access_token, user_response, now):
+    if not user_response.user:
+        return now + Config.AUTH_TOKEN_NEGATIVE_CACHE_SECONDS
+    try:
+        exp = jwt.decode(access_token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        exp = None
+    max_expiry = now + Config.AUTH_TOKEN_CACHE_MAX_SECONDS
+    return min(float(exp), max_expiry) if exp else max_expiry
+
+
+def _get_cached_token(key, now):
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is not None and now >= entry[1]:
+            del _token_cache[key]
+            entry = None
+        if entry is not None:
+            _token_cache.move_to_end(key)
+    _count("token_cache_hits" if entry is not None else "token_cache_misses")
+    return entry[0] if entry is not None else None
+
+
+def _store_cached_token(key, user_response, expires_at):
+    evicted = 0
+    with _token_cache_lock:
+        _token_cache[key] = (user_response, expires_at)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > Config.AUTH_TOKEN_CACHE_MAX_ENTRIES:
+            _token_cache.popitem(last=False)
+            evicted += 1
+    for _ in range(evicted):
+        _count("token_cache_evictions")
+
+
+def clear_token_cache():
+    with _token_cache_lock:
+        _token_cache.clear()
+
+
+def get_user_for_token(access_token):
+    """Drop-in for ``supabase.auth.get_user`` that verifies JWTs locally first.
+
+    Results are cached per token hash until the token's ``exp`` (capped), and
+    invalid tokens are remembered briefly, so a page-load burst of requests
+    carrying the same token verifies it once.
+    """
+    now = time.time()
+    key = _token_key(access_token)
+    cached = _get_cached_token(key, now)
+    if cached is not None:
+        return cached
+
+    user_response = _verify_token(access_token)
+    _store_cached_token(key, user_response, _token_cache_expiry(access_token, user_response, now))
+    return user_response
+
+
+def get_bearer_token():
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    return auth_header.split(" ")[1]
+
+
+def get_authenticated_user_id():
+    access_token = get_bearer_token()
+    if not access_token:
+        return None, (jsonify({"error": "Authorization token required"}), 401)
+
+    user_response = get_user_for_token(access_token)
+
+    if not user_response.user:
+        return None, (jsonify({"error": "Invalid token"}), 401)
+
+    return user_response.user.id, None
+
@@ -0,0 +1,306 @@
+# app/cache.py
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+_MISSING = object()
+_caches: "OrderedDict[str, Any]" = OrderedDict()
+_stats_providers: "OrderedDict[str, Callable[[], Dict[str, Any]]]" = OrderedDict()
+_registry_lock = threading.Lock()
+
+
+def approx_size(value: Any) -> int:
+    """Rough byte size of a cached value, measured once when it is stored."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, tuple) and value and isinstance(value[0], (bytes, bytearray)):
+        return len(value[0])
+    try:
+        return len(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _Flight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run one call per key at a time; callers that arrive meanwhile wait for its result."""
+
+    def __init__(self):
+        self._flights: Dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def in_flight(self, key) -> bool:
+        with self._lock:
+            return key in self._flights
+
+    def do(self, key, fn: Callable[[], Any]):
+        """Return ``(value, shared)``; ``shared`` is True when another caller's call produced it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            flight.value = fn()
+            return flight.value, False
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+
+def run_in_background(name: str, fn: Callable[[], Any]) -> None:
+    """Run ``fn`` on a daemon thread, logging instead of raising when it fails."""
+
+    def run():
+        try:
+            fn()
+        except Exception as e:
+            print(f"[cache] background refresh failed name={name}: {e}", flush=True)
+
+    threading.Thread(target=run, name=f"refresh-{name}", daemon=True).start()
+
+
+class TTLCache:
+    """Per-worker LRU with a TTL, entry/byte bounds and single-flight loading.
+
+    ``get_or_load`` runs ``loader`` once per key even when many requests miss at
+    the same time; the others wait for its result. For ``stale_seconds`` after an
+    entry expires it is still returned by ``get_or_load`` while one background
+    load replaces it. With ``copy_values`` the cache deep-copies on the way in and
+    out, for callers that mutate what they get.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        copy_values: bool = False,
+        sizeof: Callable[[Any], int] = approx_size,
+        stale_seconds: float = 0,
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.copy_values = copy_values
+        self.sizeof = sizeof
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._flights = SingleFlight()
+        self._bytes = 0
+        # Bumped by invalidate() so a load that started before it is not stored.
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+            "loads": 0,
+            "load_errors": 0,
+            "load_ms_total": 0,
+            "load_ms_max": 0,
+            "background_refreshes": 0,
+        }
+        register_cache(self)
+
+    def _copy(self, value):
+        return copy.deepcopy(value) if self.copy_values else value
+
+    def _remove(self, key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _lookup(self, key, allow_stale):
+        """Return ``(value, stale)`` or ``(_MISSING, False)``, counting the lookup."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return _MISSING, False
+            value, stored_at, _ = entry
+            age = now - stored_at
+            if age < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return value, False
+            self._stats["expired"] += 1
+            if age >= self.ttl_seconds + self.stale_seconds:
+                self._remove(key)
+            elif allow_stale:
+                self._entries.move_to_end(key)
+                self._stats["stale_hits"] += 1
+                return value, True
+            self._stats["misses"] += 1
+            return _MISSING, False
+
+    def get(self, key, default=None):
+        value, _ = self._lookup(key, allow_stale=False)
+        return default if value is _MISSING else self._copy(value)
+
+    def set(self, key, value) -> None:
+        value = self._copy(value)
+        size = self.sizeof(value) if self.sizeof else 0
+        with self._lock:
+            self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                self._stats["evictions"] += 1
+                return
+            self._entries[key] = (value, time.time(), size)
+            self._bytes += size
+            while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+    def get_or_load(self, key, loader: Callable[[], Any]):
+        """Return ``(value, cache_hit)``, calling ``loader`` at most once per key at a time."""
+        value, stale = self._lookup(key, allow_stale=self.stale_seconds > 0)
+        if value is not _MISSING:
+            if stale and not self._flights.in_flight(key):
+                with self._lock:
+                    self._stats["background_refreshes"] += 1
+                run_in_background(self.name, lambda: self._load(key, loader))
+            return self._copy(value), True
+        return self._copy(self._load(key, loader)), False
+
+    def _load(self, key, loader):
+        with self._lock:
+            generation = self._generation
+
+        def load():
+            load_start = time.perf_counter()
+            try:
+                value = loader()
+            except Exception:
+                with self._lock:
+                    self._stats["load_errors"] += 1
+                raise
+            finally:
+                load_ms = int((time.perf_counter() - load_start) * 1000)
+                with self._lock:
+                    self._stats["loads"] += 1
+                    self._stats["load_ms_total"] += load_ms
+                    self._stats["load_ms_max"] = max(self._stats["load_ms_max"], load_ms)
+            with self._lock:
+                current = self._generation == generation
+            if current:
+                self.set(key, value)
+            return value
+
+        value, _ = self._flights.do(key, load)
+        return value
+
+    def age(self, key) -> Optional[float]:
+        """Seconds since ``key`` was stored, or None when it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return None if entry is None else time.time() - entry[1]
+
+    def pop(self, key) -> None:
+        self.invalidate([key])
+
+    def invalidate(self, keys=None) -> None:
+        """Drop ``keys``, or every entry when ``keys`` is None."""
+        with self._lock:
+            self._generation += 1
+            if keys is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            for key in keys:
+                self._remove(key)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "entries": len(self._entries),
+                    "bytes": self._bytes,
+                    "max_entries": self.max_entries,
+                    "max_bytes": self.max_bytes,
+                    "ttl_seconds": self.ttl_seconds,
+                    "stale_seconds": self.stale_seconds,
+                    "coalesced": self._flights.coalesced,
+                }
+            )
+        served = stats["hits"] + stats["stale_hits"]
+        lookups = served + stats["misses"]
+        stats["hit_rate"] = round(served / lookups, 4) if lookups else None
+        stats["load_ms_avg"] = round(stats["load_ms_total"] / stats["loads"], 1) if stats["loads"] else None
+        return stats
+
+
+def register_cache(cache: TTLCache) -> None:
+    with _registry_lock:
+        _caches[cache.name] = cache
+
+
+def register_cache_stats(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """Report a cache that is not a ``TTLCache`` (byte LRUs, the token cache) on the stats endpoint."""
+    with _registry_lock:
+        _stats_providers[name] = provider
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        caches = list(_caches.values())
+        providers = list(_stats_providers.items())
+    stats = {cache.name: cache.stats() for cache in caches}
+    for name, provider in providers:
+        try:
+            stats[name] = provider()
+        except Exception as e:
+            stats[name] = {"error": str(e)}
+    return stats
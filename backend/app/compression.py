@@ -0,0 +1,108 @@
+# app/compression.py
+import gzip
+
+from flask import request
+
+from app.cache import TTLCache
+from app.config import Config
+
+try:
+    import brotli
+except ImportError:  # gzip alone is fine when the wheel is not installed
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain", "text/css", "application/javascript"}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSED_CACHE_TTL_SECONDS = 10 * 60
+
+# Compressed bodies of responses that carry an ETag, keyed by path, ETag and
+# encoding. The ETag names the exact bytes, so each body is compressed once.
+_compressed_cache = TTLCache(
+    "compressed_responses",
+    ttl_seconds=COMPRESSED_CACHE_TTL_SECONDS,
+    max_bytes=Config.RESPONSE_COMPRESSION_CACHE_MAX_BYTES,
+    sizeof=len,
+)
+
+
+def _accepted_encodings(accept_encoding):
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding):
+    """Return "br", "gzip" or None for an Accept-Encoding header value."""
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def get_compression_cache_stats():
+    return _compressed_cache.stats()
+
+
+def _should_compress(response):
+    return (
+        Config.RESPONSE_COMPRESSION_ENABLED
+        and request.method != "HEAD"
+        and response.status_code == 200
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and (response.content_length or 0) >= Config.RESPONSE_COMPRESSION_MIN_BYTES
+    )
+
+
+def compress_response(response):
+    if not _should_compress(response):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+    if encoding is None:
+        return response
+
+    etag, _ = response.get_etag()
+    cache_key = f"{request.path}|{etag}|{encoding}" if etag else None
+    compressed = _compressed_cache.get(cache_key) if cache_key else None
+    if compressed is None:
+        compressed = compress_body(response.get_data(), encoding)
+        if cache_key:
+            _compressed_cache.set(cache_key, compressed)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    if etag:
+        # Each encoding is different bytes, so the validator is weak from here on.
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
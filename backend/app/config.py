@@ -21,3 +21,56 @@ class Config:
     POSTMARK_SERVER_TOKEN = os.getenv("POSTMARK_SERVER_TOKEN")
     POSTMARK_FROM = os.getenv("POSTMARK_FROM")
     POSTMARK_TO = os.getenv("POSTMARK_TO") or POSTMARK_FROM
+    # Access tokens are verified locally (JWKS for asymmetric keys, the legacy
+    # JWT secret for HS256) and only fall back to GoTrue when that is not possible.
+    AUTH_LOCAL_JWT_VERIFY = os.getenv("AUTH_LOCAL_JWT_VERIFY", "true").strip().lower() not in ("0", "false", "no")
+    SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+    SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+    SUPABASE_JWT_LEEWAY_SECONDS = int(os.getenv("SUPABASE_JWT_LEEWAY_SECONDS", "10"))
+    SUPABASE_JWKS_CACHE_SECONDS = int(os.getenv("SUPABASE_JWKS_CACHE_SECONDS", "600"))
+    # Verified tokens are cached by hash until exp (capped); rejected ones briefly.
+    AUTH_TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_TOKEN_CACHE_MAX_ENTRIES", "4096"))
+    AUTH_TOKEN_CACHE_MAX_SECONDS = int(os.getenv("AUTH_TOKEN_CACHE_MAX_SECONDS", "300"))
+    AUTH_TOKEN_NEGATIVE_CACHE_SECONDS = int(os.getenv("AUTH_TOKEN_NEGATIVE_CACHE_SECONDS", "30"))
+    SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "true").strip().lower() not in ("0", "false", "no")
+    SUPABASE_HTTP_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_HTTP_TIMEOUT_SECONDS", "60"))
+    SUPABASE_HTTP_MAX_CONNECTIONS = int(os.getenv("SUPABASE_HTTP_MAX_CONNECTIONS", "20"))
+    SUPABASE_HTTP_MAX_KEEPALIVE = int(os.getenv("SUPABASE_HTTP_MAX_KEEPALIVE", "10"))
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY_SECONDS = float(
+        os.getenv("SUPABASE_HTTP_KEEPALIVE_EXPIRY_SECONDS", "20")
+    )
+    SUPABASE_EXECUTOR_MAX_WORKERS = int(os.getenv("SUPABASE_EXECUTOR_MAX_WORKERS", "16"))
+    # "rest" fans out one PostgREST query per table; "rpc" calls get_lesson_bundle once.
+    LESSON_BUNDLE_MODE = (os.getenv("LESSON_BUNDLE_MODE") or "rest").strip().lower()
+    # How long a worker trusts a cached users.is_paid before asking the database again.
+    LESSON_ACCESS_ENTITLEMENT_TTL_SECONDS = int(os.getenv("LESSON_ACCESS_ENTITLEMENT_TTL_SECONDS", "30"))
+    LESSON_ACCESS_ENTITLEMENT_MAX_ENTRIES = int(os.getenv("LESSON_ACCESS_ENTITLEMENT_MAX_ENTRIES", "4096"))
+    # Prefetch try lessons, the pathway list and global images when a worker boots.
+    CACHE_WARMUP_ENABLED = os.getenv("CACHE_WARMUP_ENABLED", "true").strip().lower() not in ("0", "false", "no")
+    # Serve the snapshots written by the lesson importer before resolving live.
+    COMPILED_LESSONS_ENABLED = os.getenv("COMPILED_LESSONS_ENABLED", "true").strip().lower() not in ("0", "false", "no")
+    # Read progress summaries from the trigger-maintained user_lesson_progress_summaries table.
+    PROGRESS_SUMMARIES_ENABLED = os.getenv("PROGRESS_SUMMARIES_ENABLED", "true").strip().lower() not in ("0", "false", "no")
+    # Poll content_versions (bumped by the import tools) and evict only the changed cache keys.
+    CONTENT_VERSION_POLLING_ENABLED = os.getenv("CONTENT_VERSION_POLLING_ENABLED", "true").strip().lower() not in ("0", "false", "no")
+    CONTENT_VERSION_POLL_SECONDS = int(os.getenv("CONTENT_VERSION_POLL_SECONDS", "15"))
+    # Content cache TTL while polling is on; eviction is driven by version bumps, not expiry.
+    CONTENT_CACHE_TTL_SECONDS = int(os.getenv("CONTENT_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+    # Keep serving an expired lesson, pathway list or image map this long while one background load refreshes it.
+    CACHE_STALE_WHILE_REVALIDATE_SECONDS = int(os.getenv("CACHE_STALE_WHILE_REVALIDATE_SECONDS", "600"))
+    # Reload the pathway lesson list in the background before it expires.
+    PATHWAY_LESSONS_REFRESH_ENABLED = os.getenv("PATHWAY_LESSONS_REFRESH_ENABLED", "true").strip().lower() not in ("0", "false", "no")
+    PATHWAY_LESSONS_REFRESH_SECONDS = int(os.getenv("PATHWAY_LESSONS_REFRESH_SECONDS", "60"))
+    # gzip/brotli JSON bodies at least this large when the client accepts it.
+    RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").strip().lower() not in ("0", "false", "no")
+    RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+    RESPONSE_COMPRESSION_CACHE_MAX_BYTES = int(
+        os.getenv("RESPONSE_COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+    )
+    RESOLVED_LESSON_CACHE_MAX_BYTES = int(
+        os.getenv("RESOLVED_LESSON_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+    RESOLVED_LESSON_CACHE_SHARED_PATH = os.getenv("RESOLVED_LESSON_CACHE_SHARED_PATH")
+    RESOLVED_LESSON_CACHE_SHARED_MAX_BYTES = int(
+        os.getenv("RESOLVED_LESSON_CACHE_SHARED_MAX_BYTES", str(256 * 1024 * 1024))
+    )
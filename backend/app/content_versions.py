@@ -0,0 +1,167 @@
+# app/content_versions.py
+import os
+import threading
+import time
+from collections import defaultdict
+
+from app.config import Config
+from app.supabase_client import supabase
+
+LESSON_SCOPE = "lesson"
+TOPIC_SCOPE = "topic"
+EXERCISE_BANK_SCOPE = "exercise_bank"
+GLOBAL_IMAGES_SCOPE = "global_images"
+AUDIO_SNIPPETS_SCOPE = "audio_snippets"
+CONTENT_VERSIONS_TABLE = "content_versions"
+# An empty key in content_versions (or an empty keys list here) means "the whole scope".
+ALL_KEYS = ""
+
+_invalidators = defaultdict(list)
+_poll_state = {"change_id": None, "pid": None, "last_poll": 0.0, "errors": 0}
+_poll_lock = threading.Lock()
+_poller_thread = None
+
+
+def content_cache_ttl(fallback_seconds):
+    """TTL for a content cache: long while version polling evicts it, short otherwise."""
+    if Config.CONTENT_VERSION_POLLING_ENABLED:
+        return max(fallback_seconds, Config.CONTENT_CACHE_TTL_SECONDS)
+    return fallback_seconds
+
+
+def register_invalidator(scope, invalidate):
+    """Call ``invalidate(keys)`` when ``scope`` is bumped; ``keys`` is None for the whole scope."""
+    _invalidators[scope].append(invalidate)
+
+
+def invalidate_scope(scope, keys=None):
+    keys = [key for key in (keys or []) if key] or None
+    for invalidate in _invalidators.get(scope, []):
+        try:
+            invalidate(keys)
+        except Exception as e:
+            print(f"[content-versions] invalidator failed scope={scope}: {e}", flush=True)
+
+
+def bump_content_versions(scope, keys=None):
+    """Record that content changed; every worker evicts the matching keys on its next poll.
+
+    Used by the import and backfill tools. Failures are logged rather than raised
+    so an import never fails because the registry is unavailable.
+    """
+    keys = [str(key) for key in (keys or []) if key] or [ALL_KEYS]
+    try:
+        result = supabase.rpc(
+            "bump_content_versions",
+            {"p_scope": scope, "p_keys": keys},
+        ).execute()
+    except Exception as e:
+        print(f"[WARN] Could not bump content version scope={scope}: {e}")
+        return None
+    print(f"[INFO] Bumped content version scope={scope} keys={len(keys)} change_id={result.data}")
+    return result.data
+
+
+def _fetch_changes(since_change_id):
+    result = (
+        supabase.table(CONTENT_VERSIONS_TABLE)
+        .select("scope, key, change_id")
+        .gt("change_id", since_change_id)
+        .order("change_id", desc=False)
+        .limit(1000)
+        .execute()
+    )
+    return result.data or []
+
+
+def _fetch_latest_change_id():
+    result = (
+        supabase.table(CONTENT_VERSIONS_TABLE)
+        .select("change_id")
+        .order("change_id", desc=True)
+        .limit(1)
+        .execute()
+    )
+    rows = result.data or []
+    return (rows[0].get("change_id") or 0) if rows else 0
+
+
+def poll_content_versions():
+    """Evict cache entries for content bumped since the last poll; returns the change count."""
+    with _poll_lock:
+        # A forked worker inherits the parent's watermark but not its caches' history.
+        if _poll_state["pid"] != os.getpid():
+            _poll_state["change_id"] = None
+            _poll_state["pid"] = os.getpid()
+
+        if _poll_state["change_id"] is None:
+            # Caches filled before the first poll were read after any earlier bump.
+            _poll_state["change_id"] = _fetch_latest_change_id()
+            _poll_state["last_poll"] = time.time()
+            return 0
+
+        changes = _fetch_changes(_poll_state["change_id"])
+        _poll_state["last_poll"] = time.time()
+        if not changes:
+            return 0
+        _poll_state["change_id"] = max(row.get("change_id") or 0 for row in changes)
+
+    keys_by_scope = defaultdict(set)
+    whole_scopes = set()
+    for row in changes:
+        scope = row.get("scope")
+        key = row.get("key") or ALL_KEYS
+        if key == ALL_KEYS:
+            whole_scopes.add(scope)
+        else:
+            keys_by_scope[scope].add(key)
+
+    for scope in whole_scopes:
+        invalidate_scope(scope)
+    for scope, keys in keys_by_scope.items():
+        if scope not in whole_scopes:
+            invalidate_scope(scope, sorted(keys))
+
+    print(
+        f"[content-versions] changes={len(changes)} change_id={_poll_state['change_id']} "
+        f"scopes={','.join(sorted(whole_scopes | set(keys_by_scope)))}",
+        flush=True,
+    )
+    return len(changes)
+
+
+def _poll_forever():
+    while True:
+        time.sleep(Config.CONTENT_VERSION_POLL_SECONDS)
+        try:
+            poll_content_versions()
+        except Exception as e:
+            _poll_state["errors"] += 1
+            # Log the first failure and then occasionally, not every interval.
+            if _poll_state["errors"] == 1 or _poll_state["errors"] % 100 == 0:
+                print(f"[content-versions] poll failed errors={_poll_state['errors']}: {e}", flush=True)
+
+
+def get_content_version_state():
+    return {
+        "enabled": Config.CONTENT_VERSION_POLLING_ENABLED,
+        "change_id": _poll_state["change_id"],
+        "last_poll": _poll_state["last_poll"],
+        "errors": _poll_state["errors"],
+        "poll_seconds": Config.CONTENT_VERSION_POLL_SECONDS,
+    }
+
+
+def start_content_version_poller():
+    global _poller_thread
+    if not Config.CONTENT_VERSION_POLLING_ENABLED:
+        return None
+    if _poller_thread is not None and _poller_thread.is_alive():
+        return _poller_thread
+    try:
+        poll_content_versions()
+    except Exception as e:
+        print(f"[content-versions] initial poll failed: {e}", flush=True)
+    _poller_thread = threading.Thread(target=_poll_forever, name="content-versions", daemon=True)
+    _poller_thread.start()
+    return _poller_thread
@@ -0,0 +1,180 @@
+# app/exercise_bank.py
+import re
+import time
+from collections import defaultdict
+
+from app.cache import TTLCache
+from app.content_versions import EXERCISE_BANK_SCOPE, content_cache_ttl, register_invalidator
+from app.supabase_client import run_concurrently, supabase
+
+CATEGORY_LABELS = {
+    "verbs_and_tenses": "Verbs and Tenses",
+    "nouns_and_articles": "Nouns and Articles",
+    "adjectives": "Adjectives",
+    "pronouns": "Pronouns",
+    "other_concepts": "Other Concepts",
+}
+CATEGORY_ORDER_INDEX = {key: index for index, key in enumerate(CATEGORY_LABELS)}
+
+EXERCISE_CATALOG_TTL_SECONDS = content_cache_ttl(5 * 60)
+# Unknown slugs trigger a reload, but no more often than this.
+EXERCISE_CATALOG_MIN_REFRESH_SECONDS = 30
+EXERCISE_CATALOG_CACHE_KEY = "catalog"
+_catalog_cache = TTLCache("exercise_catalog", ttl_seconds=EXERCISE_CATALOG_TTL_SECONDS)
+
+
+def slugify(value: str) -> str:
+    value = (value or "").lower()
+    value = re.sub(r"[^a-z0-9]+", "-", value)
+    value = re.sub(r"-+", "-", value)
+    return value.strip("-") or "section"
+
+
+def category_slug(key: str) -> str:
+    return slugify(key or "category")
+
+
+def section_slug(section: str) -> str:
+    return slugify(section or "section")
+
+
+def category_label(key: str) -> str:
+    if not key:
+        return "Uncategorized"
+    return CATEGORY_LABELS.get(key, key.replace("_", " ").title())
+
+
+def category_order_index(key: str) -> int:
+    return CATEGORY_ORDER_INDEX.get(key, len(CATEGORY_ORDER_INDEX))
+
+
+def build_exercise_catalog(featured_rows, bank_rows):
+    """Aggregate ``exercise_bank`` index rows into everything the listing routes serve."""
+    featured_sections = {
+        (row.get("section") or "").strip()
+        for row in featured_rows
+        if row.get("section")
+    }
+
+    sections_map = {}
+    for row in bank_rows:
+        category = row.get("category") or ""
+        section = row.get("section") or ""
+        key = (category, section)
+        is_featured = section in featured_sections
+
+        if key not in sections_map:
+            sections_map[key] = {
+                "category": category,
+                "category_label": category_label(category),
+                "category_slug": category_slug(category),
+                "section": section,
+                "section_th": row.get("section_th") or None,
+                "section_slug": section_slug(section),
+                "section_order": row.get("id"),
+                "exercise_count": 0,
+                "featured_count": 1 if is_featured else 0,
+                "is_featured": is_featured,
+            }
+
+        sections_map[key]["exercise_count"] += 1
+
+    sections = sorted(
+        sections_map.values(),
+        key=lambda item: (
+            category_order_index(item["category"]),
+            item.get("section_order") or 0,
+            item["section"],
+        ),
+    )
+
+    categories = defaultdict(lambda: {"section_count": 0, "exercise_count": 0})
+    for section in sections:
+        cat_entry = categories[section["category"]]
+        cat_entry["section_count"] += 1
+        cat_entry["exercise_count"] += section["exercise_count"]
+    category_list = sorted(
+        (
+            {
+                "category": key,
+                "category_label": category_label(key),
+                "category_slug": category_slug(key),
+                "section_count": value["section_count"],
+                "exercise_count": value["exercise_count"],
+            }
+            for key, value in categories.items()
+        ),
+        key=lambda item: item["category_label"],
+    )
+
+    featured = sorted(
+        (
+            {
+                field: section[field]
+                for field in (
+                    "category", "category_label", "category_slug",
+                    "section", "section_th", "section_slug", "exercise_count",
+                )
+            }
+            for section in sections
+            if section["is_featured"]
+        ),
+        key=lambda item: (item["category_label"], item["section"]),
+    )
+
+    section_keys = {}
+    for section in sections:
+        slugs = (section["category_slug"], section["section_slug"])
+        section_keys.setdefault(slugs, []).append((section["category"], section["section"]))
+
+    return {
+        "sections": sections,
+        "categories": category_list,
+        "featured": featured,
+        "section_keys": section_keys,
+    }
+
+
+def _load_exercise_catalog():
+    load_start = time.perf_counter()
+    results = run_concurrently({
+        "featured": lambda: supabase.table("featured_sections").select("section").execute(),
+        "bank": lambda: (
+            supabase.table("exercise_bank")
+            .select("id, category, section, section_th")
+            .order("id", desc=False)
+            .execute()
+        ),
+    })
+    catalog = build_exercise_catalog(results["featured"].data or [], results["bank"].data or [])
+    print(
+        f"[exercise-catalog] sections={len(catalog['sections'])} "
+        f"featured={len(catalog['featured'])} "
+        f"load_ms={int((time.perf_counter() - load_start) * 1000)}",
+        flush=True,
+    )
+    return catalog
+
+
+def get_exercise_catalog(force_refresh=False):
+    if force_refresh:
+        _catalog_cache.clear()
+    catalog, _ = _catalog_cache.get_or_load(EXERCISE_CATALOG_CACHE_KEY, _load_exercise_catalog)
+    return catalog
+
+
+def invalidate_exercise_catalog():
+    _catalog_cache.clear()
+
+
+register_invalidator(EXERCISE_BANK_SCOPE, lambda _keys: invalidate_exercise_catalog())
+
+
+def resolve_section_slugs(category_slug_value, section_slug_value):
+    """Return the raw pairs behind a slug pair, reloading for sections added since the last load."""
+    slugs = (category_slug_value, section_slug_value)
+    pairs = get_exercise_catalog()["section_keys"].get(slugs)
+    cache_age_seconds = _catalog_cache.age(EXERCISE_CATALOG_CACHE_KEY) or 0.0
+    if pairs is None and cache_age_seconds >= EXERCISE_CATALOG_MIN_REFRESH_SECONDS:
+        pairs = get_exercise_catalog(force_refresh=True)["section_keys"].get(slugs)
+    return pairs or []
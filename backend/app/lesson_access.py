@@ -0,0 +1,86 @@
+# app/lesson_access.py
+import time
+
+from app.cache import TTLCache
+from app.config import Config
+from app.pathway_lessons import is_first_lesson_in_level
+from app.supabase_client import supabase
+
+_entitlement_cache = TTLCache(
+    "entitlements",
+    ttl_seconds=Config.LESSON_ACCESS_ENTITLEMENT_TTL_SECONDS,
+    max_entries=Config.LESSON_ACCESS_ENTITLEMENT_MAX_ENTRIES,
+)
+
+
+def _elapsed_us(start):
+    return int((time.perf_counter() - start) * 1_000_000)
+
+
+def get_user_is_paid(user_id):
+    """Return ``(is_paid, cache_hit)`` for a user, cached for a short TTL per worker."""
+    return _entitlement_cache.get_or_load(user_id, lambda: _fetch_user_is_paid(user_id))
+
+
+def _fetch_user_is_paid(user_id):
+    user_result = supabase.table("users").select("is_paid").eq("id", user_id).single().execute()
+    return bool(user_result.data.get("is_paid", False)) if user_result.data else False
+
+
+def invalidate_user_entitlement(user_id=None):
+    """Drop one user's cached entitlement, or every entry when ``user_id`` is None."""
+    if user_id is None:
+        _entitlement_cache.clear()
+    else:
+        _entitlement_cache.pop(user_id)
+
+
+def _is_first_lesson_in_level_uncached(lesson_id):
+    lesson_result = (
+        supabase.table("lessons")
+        .select("stage, level")
+        .eq("id", lesson_id)
+        .single()
+        .execute()
+    )
+    lesson = lesson_result.data
+    if not lesson:
+        return False
+    level_lessons = (
+        supabase.table("lessons")
+        .select("id")
+        .eq("stage", lesson["stage"])
+        .eq("level", lesson["level"])
+        .order("lesson_order", desc=False)
+        .limit(1)
+        .execute()
+    )
+    return bool(level_lessons.data) and level_lessons.data[0]["id"] == lesson_id
+
+
+def resolve_lesson_access(lesson_id, user_id):
+    """Decide whether ``user_id`` may open ``lesson_id``.
+
+    Returns ``(unlocked, reason)`` where reason is ``paid``, ``first_in_level`` or
+    ``locked``. Public try lessons are decided by the caller before this runs.
+    """
+    start = time.perf_counter()
+    is_paid, entitlement_cache_hit = get_user_is_paid(user_id)
+    index_hit = True
+    if is_paid:
+        unlocked, reason = True, "paid"
+    else:
+        is_first = is_first_lesson_in_level(lesson_id)
+        if is_first is None:
+            # Lessons imported since the pathway list was cached are not indexed yet.
+            index_hit = False
+            is_first = _is_first_lesson_in_level_uncached(lesson_id)
+        unlocked, reason = (True, "first_in_level") if is_first else (False, "locked")
+
+    print(
+        f"[lesson-access] lesson_id={lesson_id} user_id={user_id} unlocked={unlocked} "
+        f"reason={reason} entitlement_cache_hit={entitlement_cache_hit} "
+        f"index_hit={index_hit} elapsed_us={_elapsed_us(start)}",
+        flush=True,
+    )
+    return unlocked, reason
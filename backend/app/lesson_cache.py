@@ -0,0 +1,255 @@
+# app/lesson_cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+SHARED_TABLE_SQL = """
+create table if not exists resolved_lessons (
+    cache_key text primary key,
+    payload blob not null,
+    size integer not null,
+    stored_at real not null,
+    accessed_at real not null
+)
+"""
+SHARED_INDEX_SQL = (
+    "create index if not exists resolved_lessons_accessed_at_idx "
+    "on resolved_lessons (accessed_at)"
+)
+
+
+def content_hash_for(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class ResolvedLessonCache:
+    """LRU of serialized resolved lessons, bounded by total payload bytes.
+
+    Entries are the encoded JSON bytes of a resolved lesson, so the memory budget
+    is measured on exactly what we keep. When ``shared_path`` is set, entries are
+    also written to a SQLite file that every worker on the machine reads, so a
+    lesson resolved by one gunicorn worker is a hit in the others. Each local entry
+    carries a content hash of its bytes, computed once when it is stored. Local
+    entries stay readable through ``get_stale_entry`` for ``stale_seconds`` after
+    they expire, so callers can serve them while refreshing.
+    """
+
+    def __init__(self, max_bytes, ttl_seconds, shared_path=None, shared_max_bytes=None, stale_seconds=0):
+        self.max_bytes = max(0, int(max_bytes or 0))
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.shared_path = shared_path or None
+        self.shared_max_bytes = max(0, int(shared_max_bytes or self.max_bytes))
+        self._entries: "OrderedDict[str, Tuple[bytes, float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {
+            "hits": 0,
+            "shared_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+            "oversized": 0,
+            "shared_evictions": 0,
+            "shared_errors": 0,
+        }
+
+    def _fresh(self, stored_at: float, now: float) -> bool:
+        return (now - stored_at) < self.ttl_seconds
+
+    def _remove_local(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def _store_local(self, key: str, payload: bytes, stored_at: float) -> str:
+        size = len(payload)
+        self._remove_local(key)
+        if size > self.max_bytes:
+            self._stats["oversized"] += 1
+            return content_hash_for(payload)
+        content_hash = content_hash_for(payload)
+        self._entries[key] = (payload, stored_at, content_hash)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            _, (evicted, _, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._stats["evictions"] += 1
+        return content_hash
+
+    def get_entry(self, key: str) -> Optional[Tuple[bytes, str]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, stored_at, content_hash = entry
+                if self._fresh(stored_at, now):
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return payload, content_hash
+                if now - stored_at >= self.ttl_seconds + self.stale_seconds:
+                    self._remove_local(key)
+                self._stats["expired"] += 1
+
+        shared_entry = self._shared_get(key, now)
+        with self._lock:
+            if shared_entry is not None:
+                payload, stored_at = shared_entry
+                content_hash = self._store_local(key, payload, stored_at)
+                self._stats["shared_hits"] += 1
+                return payload, content_hash
+            self._stats["misses"] += 1
+        return None
+
+    def get_stale_entry(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Return an expired local entry that is still inside the stale window."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, stored_at, content_hash = entry
+            if now - stored_at >= self.ttl_seconds + self.stale_seconds:
+                self._remove_local(key)
+                return None
+            self._entries.move_to_end(key)
+            self._stats["stale_hits"] += 1
+            return payload, content_hash
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: str, payload: bytes) -> str:
+        stored_at = time.time()
+        with self._lock:
+            content_hash = self._store_local(key, payload, stored_at)
+        self._shared_set(key, payload, stored_at)
+        return content_hash
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._remove_local(key)
+        self._shared_delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        self._shared_delete(None)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "entries": len(self._entries),
+                    "bytes": self._bytes,
+                    "max_bytes": self.max_bytes,
+                    "ttl_seconds": self.ttl_seconds,
+                    "stale_seconds": self.stale_seconds,
+                    "shared_path": self.shared_path,
+                }
+            )
+        return stats
+
+    # ---- shared SQLite tier ----
+
+    def _shared_connection(self) -> Optional[sqlite3.Connection]:
+        if not self.shared_path:
+            return None
+        # Connections must not cross a fork, so they are keyed by pid per thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "pid", None) == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.shared_path, timeout=1.0, isolation_level=None)
+        conn.execute("pragma journal_mode=wal")
+        conn.execute("pragma synchronous=normal")
+        conn.execute(SHARED_TABLE_SQL)
+        conn.execute(SHARED_INDEX_SQL)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _shared_failed(self, action: str, exc: Exception) -> None:
+        with self._lock:
+            self._stats["shared_errors"] += 1
+        self._local.conn = None
+        print(f"[lesson-cache] shared {action} failed: {exc}", flush=True)
+
+    def _shared_get(self, key: str, now: float) -> Optional[Tuple[bytes, float]]:
+        if not self.shared_path:
+            return None
+        try:
+            conn = self._shared_connection()
+            row = conn.execute(
+                "select payload, stored_at from resolved_lessons where cache_key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            payload, stored_at = bytes(row[0]), row[1]
+            if not self._fresh(stored_at, now):
+                conn.execute("delete from resolved_lessons where cache_key = ?", (key,))
+                return None
+            conn.execute(
+                "update resolved_lessons set accessed_at = ? where cache_key = ?",
+                (now, key),
+            )
+            return payload, stored_at
+        except sqlite3.Error as exc:
+            self._shared_failed("get", exc)
+            return None
+
+    def _shared_set(self, key: str, payload: bytes, stored_at: float) -> None:
+        if not self.shared_path or len(payload) > self.shared_max_bytes:
+            return
+        try:
+            conn = self._shared_connection()
+            conn.execute(
+                "insert or replace into resolved_lessons "
+                "(cache_key, payload, size, stored_at, accessed_at) values (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(payload), len(payload), stored_at, stored_at),
+            )
+            conn.execute(
+                "delete from resolved_lessons where stored_at < ?",
+                (stored_at - self.ttl_seconds,),
+            )
+            self._shared_prune(conn)
+        except sqlite3.Error as exc:
+            self._shared_failed("set", exc)
+
+    def _shared_prune(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("select coalesce(sum(size), 0) from resolved_lessons").fetchone()[0]
+        if total <= self.shared_max_bytes:
+            return
+        evict_keys = []
+        rows = conn.execute(
+            "select cache_key, size from resolved_lessons order by accessed_at asc"
+        ).fetchall()
+        for cache_key, size in rows:
+            if total <= self.shared_max_bytes:
+                break
+            evict_keys.append((cache_key,))
+            total -= size
+        conn.executemany("delete from resolved_lessons where cache_key = ?", evict_keys)
+        with self._lock:
+            self._stats["shared_evictions"] += len(evict_keys)
+
+    def _shared_delete(self, key: Optional[str]) -> None:
+        if not self.shared_path:
+            return
+        try:
+            conn = self._shared_connection()
+            if key is None:
+                conn.execute("delete from resolved_lessons")
+            else:
+                conn.execute("delete from resolved_lessons where cache_key = ?", (key,))
+        except sqlite3.Error as exc:
+            self._shared_failed("delete", exc)
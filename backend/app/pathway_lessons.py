@@ -0,0 +1,259 @@
+# app/pathway_lessons.py
+import threading
+import time
+
+from app.cache import SingleFlight, register_cache_stats, run_in_background
+from app.config import Config
+from app.content_versions import LESSON_SCOPE, content_cache_ttl, register_invalidator
+from app.supabase_client import supabase
+
+STAGE_ORDER = ["Beginner", "Intermediate", "Advanced", "Expert"]
+STAGE_RANK = {stage: index for index, stage in enumerate(STAGE_ORDER)}
+PATHWAY_LESSON_SELECT = (
+    "id, stage, level, lesson_order, lesson_external_id, "
+    "title, title_th, subtitle, subtitle_th, "
+    "focus, focus_th, image_url, header_img, conversation_audio_url"
+)
+PATHWAY_LESSONS_CACHE_TTL_SECONDS = content_cache_ttl(5 * 60)
+PATHWAY_SNAPSHOT_KEYS = (
+    "ordered_lessons",
+    "lesson_index_by_id",
+    "first_lesson_id_by_level",
+    "lesson_ids_by_level",
+    "lesson_ids_by_stage",
+    "next_lesson_id_by_id",
+)
+# The current snapshot. A reload builds a new dict and rebinds this name, so a
+# reader that took one reference never sees indexes from two different loads.
+_pathway_lessons_cache = {**{key: None for key in PATHWAY_SNAPSHOT_KEYS}, "timestamp": 0.0}
+PATHWAY_FLIGHT_KEY = "pathway_lessons"
+_pathway_flight = SingleFlight()
+_refresher_thread = None
+_pathway_generation = [0]
+
+
+def _invalidate_pathway_lessons(_lesson_ids):
+    # Any lesson edit can change titles or ordering, so drop the whole list.
+    _pathway_generation[0] += 1
+    _pathway_lessons_cache["timestamp"] = 0.0
+
+
+register_invalidator(LESSON_SCOPE, _invalidate_pathway_lessons)
+
+
+def get_pathway_cache_stats():
+    cache_entry = _pathway_lessons_cache
+    ordered_lessons = cache_entry["ordered_lessons"]
+    timestamp = cache_entry["timestamp"]
+    return {
+        "entries": len(ordered_lessons) if ordered_lessons is not None else 0,
+        "age_seconds": round(time.time() - timestamp, 1) if timestamp else None,
+        "ttl_seconds": PATHWAY_LESSONS_CACHE_TTL_SECONDS,
+        "refresh_seconds": Config.PATHWAY_LESSONS_REFRESH_SECONDS,
+        "refresher_running": _refresher_thread is not None and _refresher_thread.is_alive(),
+    }
+
+
+register_cache_stats("pathway_lessons", get_pathway_cache_stats)
+
+
+def lesson_sort_key(lesson):
+    return (
+        STAGE_RANK.get(lesson.get("stage"), len(STAGE_ORDER)),
+        lesson.get("level") or 0,
+        lesson.get("lesson_order") or 0,
+    )
+
+
+def _elapsed_ms(start):
+    return int((time.perf_counter() - start) * 1000)
+
+
+def _build_first_lesson_id_by_level(ordered_lessons):
+    first_lesson_id_by_level = {}
+    for lesson in ordered_lessons:
+        level_key = (lesson.get("stage"), lesson.get("level"))
+        if lesson.get("id") and level_key not in first_lesson_id_by_level:
+            first_lesson_id_by_level[level_key] = lesson["id"]
+    return first_lesson_id_by_level
+
+
+def _build_lesson_ids_by_level(ordered_lessons):
+    lesson_ids_by_level = {}
+    for lesson in ordered_lessons:
+        stage = lesson.get("stage")
+        level = lesson.get("level")
+        if lesson.get("id") and stage and level is not None:
+            lesson_ids_by_level.setdefault((stage, level), []).append(lesson["id"])
+    return lesson_ids_by_level
+
+
+def _build_lesson_ids_by_stage(ordered_lessons):
+    lesson_ids_by_stage = {}
+    for lesson in ordered_lessons:
+        if lesson.get("id") and lesson.get("stage"):
+            lesson_ids_by_stage.setdefault(lesson["stage"], []).append(lesson["id"])
+    return lesson_ids_by_stage
+
+
+def _build_next_lesson_id_by_id(ordered_lessons):
+    lesson_ids = [lesson["id"] for lesson in ordered_lessons if lesson.get("id")]
+    return {
+        lesson_id: lesson_ids[index + 1] if index + 1 < len(lesson_ids) else None
+        for index, lesson_id in enumerate(lesson_ids)
+    }
+
+
+def build_pathway_snapshot(lessons, timestamp=None):
+    """Sort ``lessons`` into pathway order and derive every lookup index from it."""
+    ordered_lessons = sorted(lessons, key=lesson_sort_key)
+    return {
+        "ordered_lessons": ordered_lessons,
+        "lesson_index_by_id": {
+            lesson.get("id"): index
+            for index, lesson in enumerate(ordered_lessons)
+            if lesson.get("id")
+        },
+        "first_lesson_id_by_level": _build_first_lesson_id_by_level(ordered_lessons),
+        "lesson_ids_by_level": _build_lesson_ids_by_level(ordered_lessons),
+        "lesson_ids_by_stage": _build_lesson_ids_by_stage(ordered_lessons),
+        "next_lesson_id_by_id": _build_next_lesson_id_by_id(ordered_lessons),
+        "timestamp": time.time() if timestamp is None else timestamp,
+    }
+
+
+def _pathway_lessons_view(cache_entry, cache_hit, query_ms):
+    view = {key: cache_entry[key] for key in PATHWAY_SNAPSHOT_KEYS}
+    view["cache_hit"] = cache_hit
+    view["query_ms"] = query_ms
+    return view
+
+
+def _load_pathway_lessons():
+    global _pathway_lessons_cache
+    generation = _pathway_generation[0]
+    lessons_start = time.perf_counter()
+    lessons_result = supabase.table("lessons").select(PATHWAY_LESSON_SELECT).execute()
+    lessons_query_ms = _elapsed_ms(lessons_start)
+    snapshot = build_pathway_snapshot(lessons_result.data or [])
+    if generation != _pathway_generation[0]:
+        # Invalidated mid-query: keep the rows for this caller but reload on the next request.
+        snapshot["timestamp"] = 0.0
+    _pathway_lessons_cache = snapshot
+    return snapshot, lessons_query_ms
+
+
+def refresh_pathway_lessons():
+    """Reload the pathway list now, sharing the query with any load already running."""
+    (snapshot, lessons_query_ms), shared = _pathway_flight.do(PATHWAY_FLIGHT_KEY, _load_pathway_lessons)
+    return snapshot, lessons_query_ms, shared
+
+
+def get_cached_pathway_lessons():
+    cache_entry = _pathway_lessons_cache
+    cache_age_seconds = time.time() - cache_entry["timestamp"]
+    cache_ready = (
+        cache_entry["ordered_lessons"] is not None
+        and cache_entry["lesson_index_by_id"] is not None
+    )
+    if cache_ready and cache_age_seconds < PATHWAY_LESSONS_CACHE_TTL_SECONDS:
+        return _pathway_lessons_view(cache_entry, cache_hit=True, query_ms=0)
+
+    if (
+        cache_ready
+        and cache_age_seconds < PATHWAY_LESSONS_CACHE_TTL_SECONDS + Config.CACHE_STALE_WHILE_REVALIDATE_SECONDS
+    ):
+        # Serve the expired list while one background load replaces it.
+        if not _pathway_flight.in_flight(PATHWAY_FLIGHT_KEY):
+            run_in_background("pathway_lessons", refresh_pathway_lessons)
+        return _pathway_lessons_view(cache_entry, cache_hit=True, query_ms=0)
+
+    # Concurrent misses share one lessons query.
+    snapshot, lessons_query_ms, shared = refresh_pathway_lessons()
+    return _pathway_lessons_view(snapshot, cache_hit=shared, query_ms=0 if shared else lessons_query_ms)
+
+
+def _refresh_forever():
+    interval = max(1, Config.PATHWAY_LESSONS_REFRESH_SECONDS)
+    while True:
+        time.sleep(interval)
+        cache_age_seconds = time.time() - _pathway_lessons_cache["timestamp"]
+        # Reload whenever the snapshot would expire before the next tick.
+        if cache_age_seconds + interval < PATHWAY_LESSONS_CACHE_TTL_SECONDS:
+            continue
+        refresh_start = time.perf_counter()
+        try:
+            snapshot, lessons_query_ms, shared = refresh_pathway_lessons()
+        except Exception as e:
+            print(f"[pathway-refresher] refresh failed: {e}", flush=True)
+            continue
+        print(
+            f"[pathway-refresher] lessons={len(snapshot['ordered_lessons'])} "
+            f"query_ms={lessons_query_ms} shared={shared} total_ms={_elapsed_ms(refresh_start)}",
+            flush=True,
+        )
+
+
+def start_pathway_refresher():
+    global _refresher_thread
+    if not Config.PATHWAY_LESSONS_REFRESH_ENABLED:
+        return None
+    if _refresher_thread is not None and _refresher_thread.is_alive():
+        return _refresher_thread
+    _refresher_thread = threading.Thread(target=_refresh_forever, name="pathway-refresher", daemon=True)
+    _refresher_thread.start()
+    return _refresher_thread
+
+
+def get_pathway_lesson(lesson_id, cached_lessons=None):
+    """Return the cached pathway row for ``lesson_id``, or None if it is not listed."""
+    cached_lessons = cached_lessons or get_cached_pathway_lessons()
+    index = cached_lessons["lesson_index_by_id"].get(lesson_id)
+    if index is None:
+        return None
+    return cached_lessons["ordered_lessons"][index]
+
+
+def get_level_lessons(stage, level, cached_lessons=None):
+    """Pathway rows of one (stage, level) in lesson order."""
+    cached_lessons = cached_lessons or get_cached_pathway_lessons()
+    lesson_ids = cached_lessons["lesson_ids_by_level"].get((stage, level)) or []
+    ordered_lessons = cached_lessons["ordered_lessons"]
+    lesson_index_by_id = cached_lessons["lesson_index_by_id"]
+    return [ordered_lessons[lesson_index_by_id[lesson_id]] for lesson_id in lesson_ids]
+
+
+def is_first_lesson_in_level(lesson_id):
+    """True/False from the cached index, or None when the lesson is not in it yet."""
+    cached_lessons = get_cached_pathway_lessons()
+    lesson = get_pathway_lesson(lesson_id, cached_lessons)
+    if lesson is None:
+        return None
+    first_lesson_id_by_level = cached_lessons["first_lesson_id_by_level"]
+    return first_lesson_id_by_level.get((lesson.get("stage"), lesson.get("level"))) == lesson_id
+
+
+def count_completed_levels(completed_lesson_ids, cached_lessons=None):
+    """Number of (stage, level) groups whose every pathway lesson is completed."""
+    completed_lesson_ids = set(completed_lesson_ids)
+    if not completed_lesson_ids:
+        return 0
+    lesson_ids_by_level = (cached_lessons or get_cached_pathway_lessons())["lesson_ids_by_level"]
+    return sum(
+        1 for lesson_ids in lesson_ids_by_level.values()
+        if lesson_ids and completed_lesson_ids.issuperset(lesson_ids)
+    )
+
+
+def next_pathway_index(completed_lesson_ids, cached_lessons=None):
+    """Index in the ordered pathway of the lesson after the furthest completed one.
+
+    Pass the ``cached_lessons`` the caller will index into, so a refresh between
+    the two lookups cannot pair this index with a different snapshot.
+    """
+    lesson_index_by_id = (cached_lessons or get_cached_pathway_lessons())["lesson_index_by_id"]
+    highest_completed_index = max(
+        (lesson_index_by_id.get(lesson_id, -1) for lesson_id in completed_lesson_ids if lesson_id),
+        default=-1,
+    )
+    return highest_completed_index + 1
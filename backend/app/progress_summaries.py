@@ -0,0 +1,313 @@
+import time
+
+from app.app_lesson_progress import (
+    _execute_with_retry,
+    derive_app_resume,
+    fetch_app_total_units_for_many,
+    is_app_unit_key,
+    summarize_app_lesson_progress_from_totals,
+)
+from app.config import Config
+from app.supabase_client import supabase
+from app.web_lesson_progress import fetch_web_lesson_expectations, summarize_web_lesson_progress
+
+SUMMARY_TABLE = "user_lesson_progress_summaries"
+SUMMARY_SELECT = (
+    "lesson_id, has_progress_row, manually_completed, last_unit_type, last_unit_key, "
+    "last_unit_section_key, unit_rows, web_manifest_ready, web_completed_units, "
+    "web_total_units, web_practice_completed, app_totals_ready, app_seen_units, "
+    "app_completed_units, app_total_units"
+)
+_summary_table_missing = False
+
+
+def _elapsed_ms(start):
+    return int((time.perf_counter() - start) * 1000)
+
+
+def _percent_complete(is_completed, completed_count, total_units):
+    if is_completed:
+        return 100
+    return round((completed_count / total_units) * 100) if total_units > 0 else 0
+
+
+def fetch_progress_summary_rows(user_id, lesson_ids):
+    """Return ``{lesson_id: row}`` from the summary table, or None when it cannot be used.
+
+    Lessons without a row have no progress for this user: the triggers delete a
+    summary once both of its source tables are empty.
+    """
+    global _summary_table_missing
+    if not Config.PROGRESS_SUMMARIES_ENABLED or _summary_table_missing:
+        return None
+    try:
+        result = _execute_with_retry(
+            lambda: (
+                supabase.table(SUMMARY_TABLE)
+                .select(SUMMARY_SELECT)
+                .eq("user_id", user_id)
+                .in_("lesson_id", lesson_ids)
+            ),
+            "lesson progress summary rows",
+        )
+    except Exception as exc:
+        if "PGRST205" in str(exc) or "42P01" in str(exc):
+            _summary_table_missing = True
+        print(f"[progress:summaries] summary table read failed, computing live: {exc}", flush=True)
+        return None
+    return {
+        row.get("lesson_id"): row
+        for row in (result.data or [])
+        if row.get("lesson_id")
+    }
+
+
+def _fetch_source_rows(user_id, lesson_ids, progress_select, unit_select, label):
+    progress_result = _execute_with_retry(
+        lambda: (
+            supabase.table("user_lesson_progress")
+            .select(progress_select)
+            .eq("user_id", user_id)
+            .in_("lesson_id", lesson_ids)
+        ),
+        f"{label} lesson progress",
+    )
+    unit_result = _execute_with_retry(
+        lambda: (
+            supabase.table("user_lesson_unit_progress")
+            .select(unit_select)
+            .eq("user_id", user_id)
+            .in_("lesson_id", lesson_ids)
+        ),
+        f"{label} unit progress",
+    )
+    return progress_result.data or [], unit_result.data or []
+
+
+def compute_web_summaries_live(user_id, lesson_ids):
+    progress_rows, unit_rows = _fetch_source_rows(
+        user_id,
+        lesson_ids,
+        "lesson_id, is_completed",
+        "lesson_id, unit_key, is_completed",
+        "web progress summaries",
+    )
+    return summarize_web_lesson_progress(
+        lesson_ids,
+        progress_rows,
+        unit_rows,
+        fetch_web_lesson_expectations(lesson_ids, fallback=True, persist_fallback=True),
+    )
+
+
+def compute_app_summaries_live(user_id, lesson_ids):
+    progress_rows, unit_rows = _fetch_source_rows(
+        user_id,
+        lesson_ids,
+        "lesson_id, is_completed, last_unit_type, last_unit_key",
+        "lesson_id, unit_key, unit_type, section_key, is_completed",
+        "app progress summaries",
+    )
+    total_units_by_lesson = fetch_app_total_units_for_many(
+        lesson_ids,
+        fallback=True,
+        persist_fallback=True,
+    )
+    return summarize_app_lesson_progress_from_totals(
+        lesson_ids,
+        progress_rows,
+        unit_rows,
+        total_units_by_lesson,
+    )
+
+
+def compute_web_summaries_unstarted(lesson_ids):
+    """Summaries for lessons with no progress, with totals from the stored manifests."""
+    return summarize_web_lesson_progress(
+        lesson_ids,
+        [],
+        [],
+        fetch_web_lesson_expectations(lesson_ids, fallback=True, persist_fallback=True),
+    )
+
+
+def compute_app_summaries_unstarted(lesson_ids):
+    """Summaries for lessons with no progress, with totals from ``lessons.app_total_units``."""
+    return summarize_app_lesson_progress_from_totals(
+        lesson_ids,
+        [],
+        [],
+        fetch_app_total_units_for_many(lesson_ids, fallback=True, persist_fallback=True),
+    )
+
+
+def web_summary_from_row(lesson_id, row):
+    """Build the ``summarize_web_lesson_progress`` shape from a summary row."""
+    row = row or {}
+    completed_count = int(row.get("web_completed_units") or 0)
+    total_units = int(row.get("web_total_units") or 0)
+    all_practice_exercises_completed = bool(row.get("web_practice_completed"))
+    manually_completed = bool(row.get("manually_completed"))
+    is_completed = manually_completed or all_practice_exercises_completed
+    return {
+        "lesson_id": lesson_id,
+        "has_started": (
+            bool(row.get("has_progress_row"))
+            or int(row.get("unit_rows") or 0) > 0
+            or completed_count > 0
+        ),
+        "percent_complete": _percent_complete(is_completed, completed_count, total_units),
+        "is_completed": is_completed,
+        "manually_completed": manually_completed,
+        "all_practice_exercises_completed": all_practice_exercises_completed,
+        "completed_units": completed_count,
+        "total_units": total_units,
+    }
+
+
+def app_summary_from_row(lesson_id, row):
+    """Build the ``summarize_app_lesson_progress_from_totals`` shape from a summary row."""
+    row = row or {}
+    completed_count = int(row.get("app_completed_units") or 0)
+    total_units = int(row.get("app_total_units") or 0)
+    manually_completed = bool(row.get("manually_completed"))
+    is_completed = manually_completed or (total_units > 0 and completed_count >= total_units)
+    last_unit_key = row.get("last_unit_key")
+    progress_row = {
+        "last_unit_type": row.get("last_unit_type"),
+        "last_unit_key": last_unit_key,
+    } if row.get("has_progress_row") else {}
+    return {
+        "lesson_id": lesson_id,
+        "has_started": int(row.get("app_seen_units") or 0) > 0 or is_app_unit_key(last_unit_key),
+        "percent_complete": _percent_complete(is_completed, completed_count, total_units),
+        "is_completed": is_completed,
+        "manually_completed": manually_completed,
+        "completed_units": completed_count,
+        "total_units": total_units,
+        "resume": derive_app_resume(
+            progress_row,
+            {last_unit_key: {"section_key": row.get("last_unit_section_key")}},
+        ),
+        "completed_unit_keys": [],
+        "expected_units": [],
+    }
+
+
+def _summaries_from_stored_rows(
+    user_id,
+    lesson_ids,
+    rows,
+    ready_column,
+    from_row,
+    compute_live,
+    compute_unstarted,
+):
+    """Return ``(summaries, live_lesson_ids, unstarted_lesson_ids)`` for rows read from the table."""
+    # Rows written before a lesson had its manifest or total are recomputed live.
+    live_lesson_ids = [
+        lesson_id for lesson_id in lesson_ids
+        if lesson_id in rows and not rows[lesson_id].get(ready_column)
+    ]
+    # Lessons without a row are not started but still report their real total.
+    unstarted_lesson_ids = [lesson_id for lesson_id in lesson_ids if lesson_id not in rows]
+    summaries = {
+        lesson_id: from_row(lesson_id, rows[lesson_id])
+        for lesson_id in lesson_ids
+        if lesson_id in rows
+    }
+    if unstarted_lesson_ids:
+        summaries.update(compute_unstarted(unstarted_lesson_ids))
+    if live_lesson_ids:
+        summaries.update(compute_live(user_id, live_lesson_ids))
+    return summaries, live_lesson_ids, unstarted_lesson_ids
+
+
+def web_summaries_from_rows(user_id, lesson_ids, rows):
+    """Web summaries exactly as the routes serve them for already fetched summary ``rows``."""
+    summaries, _, _ = _summaries_from_stored_rows(
+        user_id,
+        lesson_ids,
+        rows,
+        "web_manifest_ready",
+        web_summary_from_row,
+        compute_web_summaries_live,
+        compute_web_summaries_unstarted,
+    )
+    return summaries
+
+
+def app_summaries_from_rows(user_id, lesson_ids, rows):
+    """App summaries exactly as the routes serve them for already fetched summary ``rows``."""
+    summaries, _, _ = _summaries_from_stored_rows(
+        user_id,
+        lesson_ids,
+        rows,
+        "app_totals_ready",
+        app_summary_from_row,
+        compute_app_summaries_live,
+        compute_app_summaries_unstarted,
+    )
+    return summaries
+
+
+def _summaries_from_rows(
+    user_id,
+    lesson_ids,
+    kind,
+    ready_column,
+    from_row,
+    compute_live,
+    compute_unstarted,
+):
+    start = time.perf_counter()
+    rows = fetch_progress_summary_rows(user_id, lesson_ids)
+    if rows is None:
+        summaries = compute_live(user_id, lesson_ids)
+        source = "live"
+        live_lessons = len(lesson_ids)
+        unstarted_lessons = 0
+    else:
+        summaries, live_lesson_ids, unstarted_lesson_ids = _summaries_from_stored_rows(
+            user_id,
+            lesson_ids,
+            rows,
+            ready_column,
+            from_row,
+            compute_live,
+            compute_unstarted,
+        )
+        source = "table"
+        live_lessons = len(live_lesson_ids)
+        unstarted_lessons = len(unstarted_lesson_ids)
+    print(
+        f"[progress:summaries] kind={kind} source={source} lessons={len(lesson_ids)} "
+        f"rows={len(rows or {})} live_lessons={live_lessons} "
+        f"unstarted_lessons={unstarted_lessons} total_ms={_elapsed_ms(start)}",
+        flush=True,
+    )
+    return summaries
+
+
+def get_web_lesson_progress_summaries(user_id, lesson_ids):
+    return _summaries_from_rows(
+        user_id,
+        lesson_ids,
+        "web",
+        "web_manifest_ready",
+        web_summary_from_row,
+        compute_web_summaries_live,
+        compute_web_summaries_unstarted,
+    )
+
+
+def get_app_lesson_progress_summaries(user_id, lesson_ids):
+    return _summaries_from_rows(
+        user_id,
+        lesson_ids,
+        "app",
+        "app_totals_ready",
+        app_summary_from_row,
+        compute_app_summaries_live,
+        compute_app_summaries_unstarted,
+    )
@@ -1,25 +1,105 @@
 # app/resolver.py
-import copy
 import os
 import re
 import json
 import time
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List, Optional
-from app.supabase_client import supabase
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from app.supabase_client import run_concurrently, supabase
 from app.merge_jsonb import merge_content_nodes
 from app.config import Config
+from app.cache import SingleFlight, TTLCache, register_cache_stats, run_in_background
+from app.lesson_cache import ResolvedLessonCache, content_hash_for
+from app.content_versions import (
+    AUDIO_SNIPPETS_SCOPE,
+    GLOBAL_IMAGES_SCOPE,
+    LESSON_SCOPE,
+    bump_content_versions,
+    content_cache_ttl,
+    register_invalidator,
+)
 
 Lang = str  # "en" | "th"
 TEXT_KINDS = {"heading", "paragraph", "list_item", "misc_item"}
 AUDIO_TAG_RE = re.compile(r"\[audio:([^\]\s]+)\]", re.I)
-RESOLVED_LESSON_CACHE_TTL_SECONDS = 5 * 60
-GLOBAL_LESSON_IMAGES_CACHE_TTL_SECONDS = 10 * 60
-AUDIO_SNIPPETS_CACHE_TTL_SECONDS = 10 * 60
+RESOLVED_LESSON_CACHE_TTL_SECONDS = content_cache_ttl(5 * 60)
+GLOBAL_LESSON_IMAGES_CACHE_TTL_SECONDS = content_cache_ttl(10 * 60)
+AUDIO_SNIPPETS_CACHE_TTL_SECONDS = content_cache_ttl(10 * 60)
+COMPILED_LESSONS_TABLE = "compiled_lessons"
+COMPILED_LESSON_LANGS = ("en", "th")
+
+_resolved_lesson_cache = ResolvedLessonCache(
+    max_bytes=Config.RESOLVED_LESSON_CACHE_MAX_BYTES,
+    ttl_seconds=RESOLVED_LESSON_CACHE_TTL_SECONDS,
+    shared_path=Config.RESOLVED_LESSON_CACHE_SHARED_PATH,
+    shared_max_bytes=Config.RESOLVED_LESSON_CACHE_SHARED_MAX_BYTES,
+    stale_seconds=Config.CACHE_STALE_WHILE_REVALIDATE_SECONDS,
+)
+# One build per lesson and language at a time; concurrent misses wait for it.
+_resolve_flights = SingleFlight()
+register_cache_stats("resolved_lessons", lambda: {
+    **_resolved_lesson_cache.stats(),
+    "coalesced": _resolve_flights.coalesced,
+})
+GLOBAL_IMAGES_CACHE_KEY = "global"
+_global_images_cache = TTLCache(
+    "global_lesson_images",
+    ttl_seconds=GLOBAL_LESSON_IMAGES_CACHE_TTL_SECONDS,
+    stale_seconds=Config.CACHE_STALE_WHILE_REVALIDATE_SECONDS,
+)
+_audio_snippets_cache = TTLCache(
+    "audio_snippets",
+    ttl_seconds=AUDIO_SNIPPETS_CACHE_TTL_SECONDS,
+    max_entries=2048,
+)
+
+
+def _invalidate_resolved_lessons(lesson_ids):
+    if not lesson_ids:
+        _resolved_lesson_cache.clear()
+        return
+    for lesson_id in lesson_ids:
+        for lang in COMPILED_LESSON_LANGS:
+            _resolved_lesson_cache.invalidate(f"{lesson_id}:{lang}")
+
+
+def lesson_ids_for_external_ids(lesson_external_ids: Iterable[str]) -> List[str]:
+    lesson_external_ids = sorted({key for key in lesson_external_ids if key})
+    if not lesson_external_ids:
+        return []
+    rows = _exec(
+        supabase.table("lessons")
+        .select("id")
+        .in_("lesson_external_id", lesson_external_ids)
+    )
+    return [row.get("id") for row in (rows or []) if row.get("id")]
+
+
+def _invalidate_audio_snippets(lesson_external_ids):
+    _audio_snippets_cache.invalidate(lesson_external_ids)
+    # Resolved lessons embed their snippets' audio keys.
+    if not lesson_external_ids:
+        _resolved_lesson_cache.clear()
+        return
+    try:
+        lesson_ids = lesson_ids_for_external_ids(lesson_external_ids)
+    except Exception as exc:
+        print(f"[lesson-resolver] could not map audio snippet lessons, clearing all: {exc}", flush=True)
+        _resolved_lesson_cache.clear()
+        return
+    if lesson_ids:
+        _invalidate_resolved_lessons(lesson_ids)
+
+
+def _invalidate_global_images(_keys):
+    _global_images_cache.clear()
+    # Any lesson can reference a global image, so none of them can be kept.
+    _resolved_lesson_cache.clear()
 
-_resolved_lesson_cache = {}
-_global_images_cache = {"data": None, "timestamp": 0.0}
-_audio_snippets_cache = {}
+
+register_invalidator(LESSON_SCOPE, _invalidate_resolved_lessons)
+register_invalidator(AUDIO_SNIPPETS_SCOPE, _invalidate_audio_snippets)
+register_invalidator(GLOBAL_IMAGES_SCOPE, _invalidate_global_images)
 
 
 def _now():
@@ -30,8 +110,30 @@ def _elapsed_ms(start):
     return max(0, round((time.perf_counter() - start) * 1000))
 
 
-def _cache_fresh(timestamp: float, ttl_seconds: int) -> bool:
-    return (time.time() - timestamp) < ttl_seconds
+class ResolvedLessonPayload(NamedTuple):
+    """A resolved lesson as immutable, pre-encoded JSON bytes for one language."""
+
+    lesson_id: str
+    lang: Lang
+    body: bytes
+    content_hash: str
+
+    def etag(self, locked: bool) -> str:
+        return f"{self.content_hash}-{'locked' if locked else 'open'}"
+
+    def with_locked(self, locked: bool) -> bytes:
+        # Splice the per-request ``locked`` flag in front of the cached object
+        # instead of decoding, copying and re-encoding the whole tree.
+        flag = b"true" if locked else b"false"
+        return b'{"locked":' + flag + b"," + self.body[1:]
+
+
+def _encode_resolved_lesson(resolved: Dict[str, Any]) -> bytes:
+    return json.dumps(resolved, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def get_resolved_lesson_cache_stats() -> Dict[str, Any]:
+    return _resolved_lesson_cache.stats()
 
 
 def _exec(q):
@@ -54,44 +156,29 @@ def _exec_logged(label: str, q):
 
 
 def _get_cached_global_images():
-    if (
-        _global_images_cache["data"] is not None
-        and _cache_fresh(
-            _global_images_cache["timestamp"],
-            GLOBAL_LESSON_IMAGES_CACHE_TTL_SECONDS,
-        )
-    ):
-        return _global_images_cache["data"], True
-
-    data = _exec_logged(
-        "lesson_images_global",
-        supabase.table("lesson_images")
-        .select("image_key, url")
-        .is_("lesson_id", None)
+    return _global_images_cache.get_or_load(
+        GLOBAL_IMAGES_CACHE_KEY,
+        lambda: _exec_logged(
+            "lesson_images_global",
+            supabase.table("lesson_images")
+            .select("image_key, url")
+            .is_("lesson_id", None)
+        ),
     )
-    _global_images_cache["data"] = data
-    _global_images_cache["timestamp"] = time.time()
-    return data, False
 
 
 def _get_cached_audio_snippets(lesson_external_id: str):
     if not lesson_external_id:
         return [], False
 
-    entry = _audio_snippets_cache.get(lesson_external_id)
-    if entry and _cache_fresh(entry["timestamp"], AUDIO_SNIPPETS_CACHE_TTL_SECONDS):
-        return entry["data"], True
-
-    data = _exec(
-        supabase.table("audio_snippets")
-        .select("audio_key, section, seq")
-        .eq("lesson_external_id", lesson_external_id)
+    return _audio_snippets_cache.get_or_load(
+        lesson_external_id,
+        lambda: _exec(
+            supabase.table("audio_snippets")
+            .select("audio_key, section, seq")
+            .eq("lesson_external_id", lesson_external_id)
+        ),
     )
-    _audio_snippets_cache[lesson_external_id] = {
-        "data": data,
-        "timestamp": time.time(),
-    }
-    return data, False
 
 
 def _pick_lang(en: Optional[Any], th: Optional[Any], lang: Lang) -> Optional[str]:
@@ -247,9 +334,9 @@ def _inject_scm_labels_into_section_nodes(
     return out
 
 
-def _fetch_lesson_bundle(lesson_id: str) -> Dict[str, Any]:
+def _fetch_lesson_bundle_rest(lesson_id: str) -> Dict[str, Any]:
     bundle_start = _now()
-    print(f"[lesson-resolver] bundle_start lesson_id={lesson_id}", flush=True)
+    print(f"[lesson-resolver] bundle_start lesson_id={lesson_id} mode=rest", flush=True)
 
     lesson_start = _now()
     lesson = _exec_logged(
@@ -328,31 +415,31 @@ def _fetch_lesson_bundle(lesson_id: str) -> Dict[str, Any]:
         )
         return data, _elapsed_ms(start)
 
-    with ThreadPoolExecutor(max_workers=7) as executor:
-        futures = {
-            "sections": executor.submit(load_sections),
-            "transcript": executor.submit(load_transcript),
-            "questions": executor.submit(load_questions),
-            "exercises": executor.submit(load_exercises),
-            "phrase_links": executor.submit(load_phrase_links),
-            "images": executor.submit(load_images),
-            "common_mistakes": executor.submit(load_common_mistakes),
+    results = run_concurrently(
+        {
+            "sections": load_sections,
+            "transcript": load_transcript,
+            "questions": load_questions,
+            "exercises": load_exercises,
+            "phrase_links": load_phrase_links,
+            "images": load_images,
+            "common_mistakes": load_common_mistakes,
         }
-
-        sections, sections_ms = futures["sections"].result()
-        transcript, transcript_ms = futures["transcript"].result()
-        questions, questions_ms = futures["questions"].result()
-        exercises, exercises_ms = futures["exercises"].result()
-        phrase_links, phrase_links_ms = futures["phrase_links"].result()
-        images, images_ms = futures["images"].result()
-        common_mistakes, common_mistakes_ms = futures["common_mistakes"].result()
+    )
+    sections, sections_ms = results["sections"]
+    transcript, transcript_ms = results["transcript"]
+    questions, questions_ms = results["questions"]
+    exercises, exercises_ms = results["exercises"]
+    phrase_links, phrase_links_ms = results["phrase_links"]
+    images, images_ms = results["images"]
+    common_mistakes, common_mistakes_ms = results["common_mistakes"]
 
     global_images_start = _now()
     global_images, global_images_cache_hit = _get_cached_global_images()
     global_images_ms = _elapsed_ms(global_images_start)
 
     print(
-        f"[lesson-resolver] bundle_done lesson_id={lesson_id} "
+        f"[lesson-resolver] bundle_done lesson_id={lesson_id} mode=rest "
         f"lesson_ms={lesson_ms} sections_ms={sections_ms} transcript_ms={transcript_ms} "
         f"questions_ms={questions_ms} exercises_ms={exercises_ms} phrase_links_ms={phrase_links_ms} "
         f"images_ms={images_ms} common_mistakes_ms={common_mistakes_ms} global_images_ms={global_images_ms} "
@@ -373,20 +460,56 @@ def _fetch_lesson_bundle(lesson_id: str) -> Dict[str, Any]:
     }
 
 
-def resolve_lesson(lesson_id: str, lang: Lang) -> Dict[str, Any]:
-    route_start = _now()
-    cache_key = f"{lesson_id}:{lang}"
-    cached_entry = _resolved_lesson_cache.get(cache_key)
-    if cached_entry and _cache_fresh(
-        cached_entry["timestamp"], RESOLVED_LESSON_CACHE_TTL_SECONDS
-    ):
-        print(
-            f"[lesson-resolver] cache_hit lesson_id={lesson_id} lang={lang} "
-            f"elapsed_ms={_elapsed_ms(route_start)}",
-            flush=True,
-        )
-        return copy.deepcopy(cached_entry["data"])
+def _fetch_lesson_bundle_rpc(lesson_id: str) -> Dict[str, Any]:
+    bundle_start = _now()
+    print(f"[lesson-resolver] bundle_start lesson_id={lesson_id} mode=rpc", flush=True)
+
+    rpc_start = _now()
+    bundle = _exec_logged(
+        "get_lesson_bundle",
+        supabase.rpc("get_lesson_bundle", {"p_lesson_id": lesson_id}),
+    )
+    rpc_ms = _elapsed_ms(rpc_start)
+    if not bundle or not bundle.get("lesson"):
+        raise KeyError(lesson_id)
+
+    global_images_start = _now()
+    global_images, global_images_cache_hit = _get_cached_global_images()
+    global_images_ms = _elapsed_ms(global_images_start)
+
+    parts = ("sections", "transcript", "questions", "exercises", "phrase_links", "images", "common_mistakes")
+    counts = " ".join(f"{part}={len(bundle.get(part) or [])}" for part in parts)
+    print(
+        f"[lesson-resolver] bundle_done lesson_id={lesson_id} mode=rpc "
+        f"rpc_ms={rpc_ms} {counts} global_images_ms={global_images_ms} "
+        f"global_images_cache_hit={global_images_cache_hit} total_ms={_elapsed_ms(bundle_start)}",
+        flush=True,
+    )
+
+    return {
+        "lesson": bundle["lesson"],
+        **{part: bundle.get(part) or [] for part in parts},
+        "global_images": global_images,
+    }
+
 
+def _fetch_lesson_bundle(lesson_id: str) -> Dict[str, Any]:
+    if Config.LESSON_BUNDLE_MODE == "rpc":
+        try:
+            return _fetch_lesson_bundle_rpc(lesson_id)
+        except KeyError:
+            raise
+        except Exception as exc:
+            print(
+                f"[lesson-resolver] bundle rpc failed lesson_id={lesson_id}, "
+                f"falling back to rest: {exc}",
+                flush=True,
+            )
+    return _fetch_lesson_bundle_rest(lesson_id)
+
+
+def _build_resolved_lesson(lesson_id: str, lang: Lang) -> Dict[str, Any]:
+    route_start = _now()
     fetch_start = _now()
     raw = _fetch_lesson_bundle(lesson_id)
     fetch_ms = _elapsed_ms(fetch_start)
@@ -772,8 +895,159 @@ def resolve_lesson(lesson_id: str, lang: Lang) -> Dict[str, Any]:
         flush=True,
     )
 
-    _resolved_lesson_cache[cache_key] = {
-        "data": copy.deepcopy(resolved),
-        "timestamp": time.time(),
-    }
-    return copy.deepcopy(resolved)
+    return resolved
+
+
+def _fetch_compiled_lesson(lesson_id: str, lang: Lang) -> Optional[bytes]:
+    if not Config.COMPILED_LESSONS_ENABLED:
+        return None
+    try:
+        rows = _exec(
+            supabase.table(COMPILED_LESSONS_TABLE)
+            .select("payload")
+            .eq("lesson_id", lesson_id)
+            .eq("lang", lang)
+            .limit(1)
+        )
+    except Exception as exc:
+        print(
+            f"[lesson-resolver] compiled snapshot read failed lesson_id={lesson_id} "
+            f"lang={lang}: {exc}",
+            flush=True,
+        )
+        return None
+    payload = (rows[0].get("payload") if rows else None) or ""
+    return payload.encode("utf-8") if payload else None
+
+
+def compile_lesson_snapshots(
+    lesson_ids: Iterable[str],
+    langs: Iterable[Lang] = COMPILED_LESSON_LANGS,
+    persist: bool = True,
+) -> Dict[str, Dict[Lang, str]]:
+    """Resolve each lesson live and store the encoded result in compiled_lessons.
+
+    Returns ``{lesson_id: {lang: content_hash}}``.
+    """
+    hashes_by_lesson: Dict[str, Dict[Lang, str]] = {}
+    for lesson_id in [lesson_id for lesson_id in lesson_ids if lesson_id]:
+        for lang in langs:
+            payload = _encode_resolved_lesson(_build_resolved_lesson(lesson_id, lang))
+            content_hash = content_hash_for(payload)
+            if persist:
+                _exec(
+                    supabase.table(COMPILED_LESSONS_TABLE).upsert(
+                        {
+                            "lesson_id": lesson_id,
+                            "lang": lang,
+                            "payload": payload.decode("utf-8"),
+                            "content_hash": content_hash,
+                            "compiled_at": datetime.now(timezone.utc).isoformat(),
+                        },
+                        on_conflict="lesson_id,lang",
+                    )
+                )
+                _resolved_lesson_cache.invalidate(f"{lesson_id}:{lang}")
+            hashes_by_lesson.setdefault(lesson_id, {})[lang] = content_hash
+            print(
+                f"[lesson-compiler] compiled lesson_id={lesson_id} lang={lang} "
+                f"bytes={len(payload)} hash={content_hash} persisted={persist}",
+                flush=True,
+            )
+    return hashes_by_lesson
+
+
+def recompile_lessons(lesson_ids: Iterable[str]) -> List[str]:
+    """Recompile snapshots for ``lesson_ids`` and bump them so every worker reloads.
+
+    For tools that change resolved content outside import_lessons. Returns the
+    ids that failed to compile; those keep their previous snapshot.
+    """
+    lesson_ids = list(dict.fromkeys(lesson_id for lesson_id in lesson_ids if lesson_id))
+    failed = []
+    for lesson_id in lesson_ids:
+        try:
+            compile_lesson_snapshots([lesson_id])
+        except Exception as exc:
+            print(f"[WARN] Could not compile lesson snapshots for {lesson_id}: {exc}")
+            failed.append(lesson_id)
+    compiled = [lesson_id for lesson_id in lesson_ids if lesson_id not in failed]
+    if compiled:
+        bump_content_versions(LESSON_SCOPE, compiled)
+    return failed
+
+
+def resolve_lesson_payload(lesson_id: str, lang: Lang) -> ResolvedLessonPayload:
+    route_start = _now()
+    cache_key = f"{lesson_id}:{lang}"
+    cached_entry = _resolved_lesson_cache.get_entry(cache_key)
+    if cached_entry is not None:
+        cached_payload, content_hash = cached_entry
+        print(
+            f"[lesson-resolver] cache_hit lesson_id={lesson_id} lang={lang} "
+            f"bytes={len(cached_payload)} elapsed_ms={_elapsed_ms(route_start)}",
+            flush=True,
+        )
+        return ResolvedLessonPayload(lesson_id, lang, cached_payload, content_hash)
+
+    stale_entry = _resolved_lesson_cache.get_stale_entry(cache_key)
+    if stale_entry is not None:
+        stale_payload, content_hash = stale_entry
+        if not _resolve_flights.in_flight(cache_key):
+            run_in_background(
+                f"lesson:{cache_key}",
+                lambda: _resolve_flights.do(cache_key, lambda: _load_resolved_lesson(lesson_id, lang)),
+            )
+        print(
+            f"[lesson-resolver] stale_hit lesson_id={lesson_id} lang={lang} "
+            f"bytes={len(stale_payload)} elapsed_ms={_elapsed_ms(route_start)}",
+            flush=True,
+        )
+        return ResolvedLessonPayload(lesson_id, lang, stale_payload, content_hash)
+
+    resolved_payload, shared = _resolve_flights.do(
+        cache_key,
+        lambda: _load_resolved_lesson(lesson_id, lang),
+    )
+    if shared:
+        print(
+            f"[lesson-resolver] coalesced lesson_id={lesson_id} lang={lang} "
+            f"bytes={len(resolved_payload.body)} elapsed_ms={_elapsed_ms(route_start)}",
+            flush=True,
+        )
+    return resolved_payload
+
+
+def _load_resolved_lesson(lesson_id: str, lang: Lang) -> ResolvedLessonPayload:
+    """Fill the cache from the compiled snapshot, or by resolving live."""
+    route_start = _now()
+    cache_key = f"{lesson_id}:{lang}"
+    compiled_payload = _fetch_compiled_lesson(lesson_id, lang)
+    if compiled_payload is not None:
+        content_hash = _resolved_lesson_cache.set(cache_key, compiled_payload)
+        print(
+            f"[lesson-resolver] compiled_hit lesson_id={lesson_id} lang={lang} "
+            f"bytes={len(compiled_payload)} elapsed_ms={_elapsed_ms(route_start)}",
+            flush=True,
+        )
+        return ResolvedLessonPayload(lesson_id, lang, compiled_payload, content_hash)
+
+    resolved = _build_resolved_lesson(lesson_id, lang)
+    encode_start = _now()
+    payload = _encode_resolved_lesson(resolved)
+    encode_ms = _elapsed_ms(encode_start)
+    content_hash = _resolved_lesson_cache.set(cache_key, payload)
+    cache_stats = _resolved_lesson_cache.stats()
+    print(
+        f"[lesson-cache] stored lesson_id={lesson_id} lang={lang} bytes={len(payload)} "
+        f"encode_ms={encode_ms} entries={cache_stats['entries']} cache_bytes={cache_stats['bytes']} "
+        f"hits={cache_stats['hits']} shared_hits={cache_stats['shared_hits']} "
+        f"misses={cache_stats['misses']} evictions={cache_stats['evictions']}",
+        flush=True,
+    )
+    return ResolvedLessonPayload(lesson_id, lang, payload, content_hash)
+
+
+def resolve_lesson(lesson_id: str, lang: Lang) -> Dict[str, Any]:
+    # Decoding the cached bytes hands the caller its own mutable copy of the tree.
+    return json.loads(resolve_lesson_payload(lesson_id, lang).body)
@@ -5,6 +5,7 @@ from uuid import UUID
 import requests
 
 from app.config import Config
+from app.lesson_access import invalidate_user_entitlement
 from app.supabase_client import supabase_admin
 
 
@@ -400,6 +401,7 @@ def update_user_membership(user_id, membership_state, clear_missing_app_store_pr
             updates["revenuecat_environment"] = incoming_environment
 
     result = supabase_admin.table("users").update(updates).eq("id", user_id).execute()
+    invalidate_user_entitlement(user_id)
     access_sources = {
         "manual_active": manual_active,
         "stripe_active": stripe_active,
@@ -1,23 +1,42 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from functools import wraps
-from app.supabase_client import supabase, supabase_admin
-from app.resolver import resolve_lesson
+from app.supabase_client import run_concurrently, supabase, supabase_admin
+from app.auth import get_authenticated_user_id as _get_authenticated_user_id, get_user_for_token
+from app.resolver import resolve_lesson_payload
+from app.pathway_lessons import (
+    count_completed_levels,
+    get_cached_pathway_lessons,
+    get_level_lessons,
+    get_pathway_lesson,
+    next_pathway_index,
+)
+from app.lesson_access import resolve_lesson_access
+from app.exercise_bank import (
+    category_label as _category_label,
+    category_slug as _category_slug,
+    get_exercise_catalog,
+    resolve_section_slugs,
+    section_slug as _section_slug,
+)
+from app.topic_library import get_topic_index_payload, get_topic_payload, localize_topic
+from app.cache import TTLCache, get_cache_stats
+from app.content_versions import LESSON_SCOPE, get_content_version_state, register_invalidator
 from app.app_lesson_progress import (
     build_app_lesson_expectations,
-    fetch_app_total_units_for_many,
     summarize_app_lesson_progress,
-    summarize_app_lesson_progress_from_totals,
+)
+from app.progress_summaries import (
+    get_app_lesson_progress_summaries,
+    get_web_lesson_progress_summaries,
 )
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import smtplib
+import resource
 import re
 import os
 from datetime import datetime, timedelta, timezone, date
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from collections import defaultdict
-import copy
 import hashlib
 from zoneinfo import ZoneInfo
 from app.config import Config
@@ -40,41 +59,6 @@ SIGNUP_RATE_LIMIT_WINDOW_SECONDS = 15 * 60
 SIGNUP_RATE_LIMIT_PER_EMAIL = 3
 SIGNUP_RATE_LIMIT_PER_IP = 10
 
-STAGE_ORDER = ["Beginner", "Intermediate", "Advanced", "Expert"]
-STAGE_RANK = {stage: index for index, stage in enumerate(STAGE_ORDER)}
-WEB_SECTION_ORDER = [
-    "prepare",
-    "comprehension",
-    "transcript",
-    "apply",
-    "understand",
-    "extra_tip",
-    "common_mistake",
-    "phrases_verbs",
-    "culture_note",
-    "practice",
-]
-WEB_EXPECTATIONS_TTL_SECONDS = 900
-_web_expectations_cache = {}
-PATHWAY_LESSON_SELECT = (
-    "id, stage, level, lesson_order, lesson_external_id, "
-    "title, title_th, subtitle, subtitle_th, "
-    "focus, focus_th, image_url, header_img, conversation_audio_url"
-)
-PATHWAY_LESSONS_CACHE_TTL_SECONDS = 5 * 60
-_pathway_lessons_cache = {
-    "ordered_lessons": None,
-    "lesson_index_by_id": None,
-    "timestamp": 0.0,
-}
-
-CATEGORY_LABELS = {
-    "verbs_and_tenses": "Verbs and Tenses",
-    "nouns_and_articles": "Nouns and Articles",
-    "adjectives": "Adjectives",
-    "pronouns": "Pronouns",
-    "other_concepts": "Other Concepts",
-}
 
 PUBLIC_TRY_LESSON_IDS = [
     "a34f5a4b-0729-430e-9b92-900dcad2f977",
@@ -86,8 +70,8 @@ PUBLIC_TRY_LESSON_IDS = [
 LESSON_AUDIO_BUCKET = "lesson-audio"
 TRY_AUDIO_TTL_SECONDS = 2 * 60 * 60
 TRY_AUDIO_CACHE_TTL_SECONDS = 50 * 60
-TRY_AUDIO_MAX_WORKERS = 8
-_try_audio_cache = {}
+# Entries keep their short TTL because they hold signed URLs.
+_try_audio_cache = TTLCache("try_audio", ttl_seconds=TRY_AUDIO_CACHE_TTL_SECONDS)
 
 
 
@@ -105,44 +89,130 @@ def _sign_audio_path(path):
 
 
 def _get_try_audio_cache(lesson_id):
-    cached = _try_audio_cache.get(lesson_id)
-    if not cached:
-        return None
-    if time.time() - cached["ts"] > TRY_AUDIO_CACHE_TTL_SECONDS:
-        _try_audio_cache.pop(lesson_id, None)
-        return None
-    return cached["payload"]
+    return _try_audio_cache.get(lesson_id)
 
 
 def _set_try_audio_cache(lesson_id, payload):
-    _try_audio_cache[lesson_id] = {"ts": time.time(), "payload": payload}
+    _try_audio_cache.set(lesson_id, payload)
+
+
+register_invalidator(LESSON_SCOPE, _try_audio_cache.invalidate)
 
 
 def _sign_audio_batch(items):
-    results = []
-    with ThreadPoolExecutor(max_workers=TRY_AUDIO_MAX_WORKERS) as executor:
-        future_map = {
-            executor.submit(_sign_audio_path, item["path"]): item
-            for item in items
-            if item.get("path")
+    # _sign_audio_path swallows its own errors, so one bad path never fails the batch.
+    # run_concurrently also keeps this safe when called from the warm-up executor.
+    signable = [item for item in items if item.get("path")]
+    signed_urls = run_concurrently(
+        {
+            index: (lambda path=item["path"]: _sign_audio_path(path))
+            for index, item in enumerate(signable)
         }
-        for future in as_completed(future_map):
-            item = future_map[future]
-            signed_url = None
-            try:
-                signed_url = future.result()
-            except Exception as e:
-                print(f"Warning: signing failed for {item.get('path')}: {e}")
-            if signed_url:
-                results.append({**item, "signed_url": signed_url})
-    return results
+    )
+    return [
+        {**item, "signed_url": signed_urls[index]}
+        for index, item in enumerate(signable)
+        if signed_urls[index]
+    ]
+
+
+def _build_try_audio_payload(lesson_id):
+    cached = _get_try_audio_cache(lesson_id)
+    if cached:
+        return cached
+
+    lesson_result = (
+        supabase_admin
+        .table("lessons")
+        .select("id, lesson_external_id, conversation_audio_url")
+        .eq("id", lesson_id)
+        .limit(1)
+        .execute()
+    )
+    lesson_rows = lesson_result.data or []
+    if not lesson_rows:
+        return None
 
+    lesson_row = lesson_rows[0]
+    lesson_external_id = lesson_row.get("lesson_external_id")
+    conversation_path = lesson_row.get("conversation_audio_url")
 
-def _slugify(value: str) -> str:
-    value = (value or "").lower()
-    value = re.sub(r"[^a-z0-9]+", "-", value)
-    value = re.sub(r"-+", "-", value)
-    return value.strip("-") or "section"
+    conversation = {"path": conversation_path}
+
+    snippets_out = []
+    if lesson_external_id:
+        snippets_result = (
+            supabase_admin
+            .table("audio_snippets")
+            .select("section, seq, storage_path, audio_key")
+            .eq("lesson_external_id", lesson_external_id)
+            .execute()
+        )
+        for row in snippets_result.data or []:
+            audio_key = row.get("audio_key")
+            storage_path = row.get("storage_path")
+            if not audio_key or not storage_path:
+                continue
+            snippets_out.append({
+                "audio_key": audio_key,
+                "section": row.get("section"),
+                "seq": row.get("seq"),
+                "storage_path": storage_path,
+            })
+
+    phrase_ids = []
+    phrases_links = (
+        supabase_admin
+        .table("lesson_phrases")
+        .select("phrase_id")
+        .eq("lesson_id", lesson_id)
+        .execute()
+    )
+    for row in phrases_links.data or []:
+        phrase_id = row.get("phrase_id")
+        if phrase_id:
+            phrase_ids.append(phrase_id)
+
+    phrases_out = []
+    if phrase_ids:
+        phrases_result = (
+            supabase_admin
+            .table("phrases_audio_snippets")
+            .select("phrase_id, variant, seq, storage_path, audio_key")
+            .in_("phrase_id", phrase_ids)
+            .execute()
+        )
+        items = []
+        for row in phrases_result.data or []:
+            audio_key = row.get("audio_key")
+            storage_path = row.get("storage_path")
+            if not audio_key or not storage_path:
+                continue
+            items.append({
+                "audio_key": audio_key,
+                "phrase_id": row.get("phrase_id"),
+                "variant": row.get("variant") or 0,
+                "seq": row.get("seq"),
+                "path": storage_path,
+            })
+        signed_phrases = _sign_audio_batch(items)
+        for row in signed_phrases:
+            phrases_out.append({
+                "audio_key": row.get("audio_key"),
+                "phrase_id": row.get("phrase_id"),
+                "variant": row.get("variant") or 0,
+                "seq": row.get("seq"),
+                "signed_url": row.get("signed_url"),
+            })
+
+    payload = {
+        "conversation": conversation,
+        "snippets": snippets_out,
+        "phrases": phrases_out,
+        "expires_in": TRY_AUDIO_TTL_SECONDS,
+    }
+    _set_try_audio_cache(lesson_id, payload)
+    return payload
 
 
 def _normalize_email(value):
@@ -179,91 +249,10 @@ def _consume_signup_rate_limit(key, request_limit):
     return bool(result.data)
 
 
-def _category_label(key: str) -> str:
-    if not key:
-        return "Uncategorized"
-    return CATEGORY_LABELS.get(key, key.replace("_", " ").title())
-
-
-def _category_slug(key: str) -> str:
-    return _slugify(key or "category")
-
-
-def _section_slug(section: str) -> str:
-    return _slugify(section or "section")
-
-
-def _category_order_index(key: str) -> int:
-    ordered_keys = list(CATEGORY_LABELS.keys())
-    try:
-        return ordered_keys.index(key)
-    except ValueError:
-        return len(ordered_keys)
-
-
-def _lesson_sort_key(lesson):
-    return (
-        STAGE_RANK.get(lesson.get("stage"), len(STAGE_ORDER)),
-        lesson.get("level") or 0,
-        lesson.get("lesson_order") or 0,
-    )
-
-
 def _elapsed_ms(start):
     return int((time.perf_counter() - start) * 1000)
 
 
-def _get_cached_pathway_lessons():
-    cache_entry = _pathway_lessons_cache
-    cache_age_seconds = time.time() - cache_entry["timestamp"]
-    if (
-        cache_entry["ordered_lessons"] is not None
-        and cache_entry["lesson_index_by_id"] is not None
-        and cache_age_seconds < PATHWAY_LESSONS_CACHE_TTL_SECONDS
-    ):
-        return {
-            "ordered_lessons": cache_entry["ordered_lessons"],
-            "lesson_index_by_id": cache_entry["lesson_index_by_id"],
-            "cache_hit": True,
-            "query_ms": 0,
-        }
-
-    lessons_start = time.perf_counter()
-    lessons_result = supabase.table("lessons").select(PATHWAY_LESSON_SELECT).execute()
-    lessons_query_ms = _elapsed_ms(lessons_start)
-    ordered_lessons = sorted(lessons_result.data or [], key=_lesson_sort_key)
-    lesson_index_by_id = {
-        lesson.get("id"): index
-        for index, lesson in enumerate(ordered_lessons)
-        if lesson.get("id")
-    }
-
-    _pathway_lessons_cache["ordered_lessons"] = ordered_lessons
-    _pathway_lessons_cache["lesson_index_by_id"] = lesson_index_by_id
-    _pathway_lessons_cache["timestamp"] = time.time()
-
-    return {
-        "ordered_lessons": ordered_lessons,
-        "lesson_index_by_id": lesson_index_by_id,
-        "cache_hit": False,
-        "query_ms": lessons_query_ms,
-    }
-
-
-def _get_authenticated_user_id():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return None, (jsonify({"error": "Authorization token required"}), 401)
-
-    access_token = auth_header.split(" ")[1]
-    user_response = supabase.auth.get_user(access_token)
-
-    if not user_response.user:
-        return None, (jsonify({"error": "Invalid token"}), 401)
-
-    return user_response.user.id, None
-
-
 def _get_guest_revenuecat_user_id():
     candidate = (request.headers.get("X-Guest-RevenueCat-User-Id") or "").strip()
     if not candidate:
@@ -411,280 +400,6 @@ def _execute_with_retry(build_query, label, retries=2, base_delay=0.2):
     raise last_error
 
 
-def _build_section_unit_key(raw_id):
-    return f"section:{raw_id}"
-
-
-def _build_exercise_unit_key(raw_id):
-    return f"exercise:{raw_id}"
-
-
-def _get_cached_web_expectation(lesson_id):
-    cached = _web_expectations_cache.get(lesson_id)
-    if not cached:
-        return None
-    if time.time() - cached["ts"] > WEB_EXPECTATIONS_TTL_SECONDS:
-        _web_expectations_cache.pop(lesson_id, None)
-        return None
-    return copy.deepcopy(cached["value"])
-
-
-def _set_cached_web_expectation(lesson_id, expectation):
-    _web_expectations_cache[lesson_id] = {
-        "ts": time.time(),
-        "value": copy.deepcopy(expectation),
-    }
-
-
-def _build_web_lesson_expectations(lesson_ids):
-    lesson_ids = [lesson_id for lesson_id in lesson_ids if lesson_id]
-    if not lesson_ids:
-        return {}
-
-    build_start = time.perf_counter()
-    expectations = {}
-    uncached_lesson_ids = []
-    for lesson_id in lesson_ids:
-        cached = _get_cached_web_expectation(lesson_id)
-        if cached is not None:
-            expectations[lesson_id] = cached
-        else:
-            uncached_lesson_ids.append(lesson_id)
-
-    if not uncached_lesson_ids:
-        return expectations
-
-    query_start = time.perf_counter()
-    sections_result = _execute_with_retry(
-        lambda: (
-            supabase.table("lesson_sections")
-            .select("lesson_id, id, type, sort_order")
-            .in_("lesson_id", uncached_lesson_ids)
-            .order("sort_order", desc=False)
-        ),
-        "lesson_sections progress expectations",
-    )
-    transcript_result = _execute_with_retry(
-        lambda: (
-            supabase.table("transcript_lines")
-            .select("lesson_id")
-            .in_("lesson_id", uncached_lesson_ids)
-        ),
-        "transcript_lines progress expectations",
-    )
-    comprehension_result = _execute_with_retry(
-        lambda: (
-            supabase.table("comprehension_questions")
-            .select("lesson_id, id")
-            .in_("lesson_id", uncached_lesson_ids)
-        ),
-        "comprehension_questions progress expectations",
-    )
-    exercises_result = _execute_with_retry(
-        lambda: (
-            supabase.table("practice_exercises")
-            .select("lesson_id, id, title, title_th, sort_order")
-            .in_("lesson_id", uncached_lesson_ids)
-            .order("sort_order", desc=False)
-        ),
-        "practice_exercises progress expectations",
-    )
-    lesson_phrases_result = _execute_with_retry(
-        lambda: (
-            supabase.table("lesson_phrases")
-            .select("lesson_id, phrase_id")
-            .in_("lesson_id", uncached_lesson_ids)
-        ),
-        "lesson_phrases progress expectations",
-    )
-
-    lesson_phrase_links = lesson_phrases_result.data or []
-    phrase_ids = sorted({
-        row.get("phrase_id")
-        for row in lesson_phrase_links
-        if row.get("phrase_id")
-    })
-    phrases_by_id = {}
-    if phrase_ids:
-        phrases_result = _execute_with_retry(
-            lambda: (
-                supabase.table("phrases")
-                .select("id, content, content_th, content_jsonb, content_jsonb_th")
-                .in_("id", phrase_ids)
-            ),
-            "phrases progress expectations",
-        )
-        phrases_by_id = {
-            phrase.get("id"): phrase
-            for phrase in (phrases_result.data or [])
-            if phrase.get("id")
-        }
-    query_ms = _elapsed_ms(query_start)
-
-    sections_by_lesson = defaultdict(list)
-    for row in sections_result.data or []:
-        sections_by_lesson[row.get("lesson_id")].append(row)
-
-    transcript_counts = defaultdict(int)
-    for row in transcript_result.data or []:
-        transcript_counts[row.get("lesson_id")] += 1
-
-    comprehension_counts = defaultdict(int)
-    for row in comprehension_result.data or []:
-        comprehension_counts[row.get("lesson_id")] += 1
-
-    exercises_by_lesson = defaultdict(list)
-    for row in exercises_result.data or []:
-        exercises_by_lesson[row.get("lesson_id")].append(row)
-
-    has_phrase_content = defaultdict(bool)
-    for link in lesson_phrase_links:
-        lesson_id = link.get("lesson_id")
-        phrase = phrases_by_id.get(link.get("phrase_id")) or {}
-        content = (phrase.get("content") or "").strip()
-        content_th = (phrase.get("content_th") or "").strip()
-        content_jsonb = phrase.get("content_jsonb")
-        content_jsonb_th = phrase.get("content_jsonb_th")
-        if content or content_th or content_jsonb or content_jsonb_th:
-            has_phrase_content[lesson_id] = True
-
-    expectations = {}
-    for lesson_id in uncached_lesson_ids:
-        lesson_sections = sections_by_lesson.get(lesson_id, [])
-        section_by_type = {}
-        allow_inline_quick = False
-        for section in lesson_sections:
-            section_type = (section.get("type") or "").lower()
-            if section_type and section_type not in section_by_type:
-                section_by_type[section_type] = section
-            if section_type in {"understand", "extra_tip"}:
-                allow_inline_quick = True
-
-        exercise_rows = exercises_by_lesson.get(lesson_id, [])
-        visible_exercise_keys = []
-        practice_exercise_keys = []
-        for exercise in exercise_rows:
-            title = (exercise.get("title") or "").strip().lower()
-            title_th = (exercise.get("title_th") or "").strip()
-            is_quick = title.startswith("quick practice") or "แบบฝึกหัด" in title_th
-            if is_quick and not allow_inline_quick:
-                continue
-            unit_key = _build_exercise_unit_key(exercise.get("id"))
-            visible_exercise_keys.append(unit_key)
-            practice_exercise_keys.append(unit_key)
-
-        visible_section_keys = []
-        for section_type in WEB_SECTION_ORDER:
-            if section_type == "prepare":
-                if section_by_type.get("prepare"):
-                    visible_section_keys.append(_build_section_unit_key("prepare"))
-                continue
-            if section_type == "comprehension":
-                if comprehension_counts.get(lesson_id, 0) > 0:
-                    visible_section_keys.append(_build_section_unit_key("comprehension"))
-                continue
-            if section_type == "transcript":
-                if transcript_counts.get(lesson_id, 0) > 0:
-                    visible_section_keys.append(_build_section_unit_key("transcript"))
-                continue
-            if section_type == "practice":
-                if visible_exercise_keys:
-                    visible_section_keys.append(_build_section_unit_key("practice"))
-                continue
-            if section_type == "phrases_verbs":
-                if has_phrase_content.get(lesson_id):
-                    visible_section_keys.append(_build_section_unit_key("phrases_verbs"))
-                continue
-            section = section_by_type.get(section_type)
-            if section and section.get("id"):
-                visible_section_keys.append(_build_section_unit_key(section.get("id")))
-
-        comprehension_unit_keys = []
-        if comprehension_counts.get(lesson_id, 0) > 0:
-            comprehension_unit_keys.append(_build_exercise_unit_key("comprehension_quiz"))
-
-        all_visible_unit_keys = [
-            *visible_section_keys,
-            *visible_exercise_keys,
-            *comprehension_unit_keys,
-        ]
-
-        expectation = {
-            "section_unit_keys": visible_section_keys,
-            "exercise_unit_keys": visible_exercise_keys,
-            "comprehension_unit_keys": comprehension_unit_keys,
-            "all_visible_unit_keys": all_visible_unit_keys,
-        }
-        _set_cached_web_expectation(lesson_id, expectation)
-        expectations[lesson_id] = expectation
-
-    total_ms = _elapsed_ms(build_start)
-    print(
-        f"[progress:web-expectations] requested={len(lesson_ids)} uncached={len(uncached_lesson_ids)} "
-        f"cached={len(lesson_ids) - len(uncached_lesson_ids)} query_ms={query_ms} total_ms={total_ms}",
-        flush=True,
-    )
-
-    return expectations
-
-
-def _summarize_web_lesson_progress(lesson_ids, progress_rows, unit_rows):
-    expectations = _build_web_lesson_expectations(lesson_ids)
-    progress_by_lesson = {
-        row.get("lesson_id"): row
-        for row in (progress_rows or [])
-        if row.get("lesson_id")
-    }
-    seen_units_by_lesson = defaultdict(set)
-    completed_units_by_lesson = defaultdict(set)
-    for row in unit_rows or []:
-        lesson_id = row.get("lesson_id")
-        unit_key = row.get("unit_key")
-        if lesson_id and unit_key:
-            seen_units_by_lesson[lesson_id].add(unit_key)
-        if row.get("is_completed") and lesson_id and unit_key:
-            completed_units_by_lesson[lesson_id].add(unit_key)
-
-    summaries = {}
-    for lesson_id in lesson_ids:
-        progress_row = progress_by_lesson.get(lesson_id) or {}
-        expected = expectations.get(lesson_id) or {
-            "section_unit_keys": [],
-            "exercise_unit_keys": [],
-            "comprehension_unit_keys": [],
-            "all_visible_unit_keys": [],
-        }
-        completed_units = completed_units_by_lesson.get(lesson_id, set())
-        visible_units = expected["all_visible_unit_keys"]
-        total_units = len(visible_units)
-        completed_count = sum(1 for key in visible_units if key in completed_units)
-
-        practice_exercise_keys = expected["exercise_unit_keys"]
-        all_practice_exercises_completed = (
-            len(practice_exercise_keys) > 0
-            and all(key in completed_units for key in practice_exercise_keys)
-        )
-        manually_completed = bool(progress_row.get("is_completed"))
-        is_completed = manually_completed or all_practice_exercises_completed
-        has_started = bool(progress_row) or bool(seen_units_by_lesson.get(lesson_id)) or completed_count > 0
-        percent_complete = 100 if is_completed else (
-            round((completed_count / total_units) * 100) if total_units > 0 else 0
-        )
-
-        summaries[lesson_id] = {
-            "lesson_id": lesson_id,
-            "has_started": has_started,
-            "percent_complete": percent_complete,
-            "is_completed": is_completed,
-            "manually_completed": manually_completed,
-            "all_practice_exercises_completed": all_practice_exercises_completed,
-            "completed_units": completed_count,
-            "total_units": total_units,
-        }
-
-    return summaries
-
-
 def handle_options(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -773,6 +488,29 @@ def home():
     return jsonify({}), 204
 
 
+@routes.route("/internal/cache-stats", methods=["GET"])
+@handle_options
+def get_internal_cache_stats():
+    """Per-worker cache sizes and hit rates, for admins sizing the VM."""
+    user_id, auth_error = _get_authenticated_user_id()
+    if auth_error:
+        return auth_error
+    user_result = supabase.table("users").select("is_admin").eq("id", user_id).execute()
+    if not (user_result.data and user_result.data[0].get("is_admin")):
+        return jsonify({"error": "Forbidden"}), 403
+
+    caches = get_cache_stats()
+    response = {
+        "pid": os.getpid(),
+        # Linux reports ru_maxrss in KiB.
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "cached_bytes": sum(stats.get("bytes") or 0 for stats in caches.values()),
+        "content_versions": get_content_version_state(),
+        "caches": caches,
+    }
+    return jsonify(response), 200
+
+
 @routes.route("/api/pricing", methods=["GET"])
 @handle_options
 def get_pricing():
@@ -815,101 +553,9 @@ def get_try_lesson_audio(lesson_id):
         return jsonify({"error": "Not allowed"}), 403
 
     try:
-        cached = _get_try_audio_cache(lesson_id)
-        if cached:
-            return jsonify(cached), 200
-
-        lesson_result = (
-            supabase_admin
-            .table("lessons")
-            .select("id, lesson_external_id, conversation_audio_url")
-            .eq("id", lesson_id)
-            .limit(1)
-            .execute()
-        )
-        lesson_rows = lesson_result.data or []
-        if not lesson_rows:
+        payload = _build_try_audio_payload(lesson_id)
+        if payload is None:
             return jsonify({"error": "Lesson not found"}), 404
-
-        lesson_row = lesson_rows[0]
-        lesson_external_id = lesson_row.get("lesson_external_id")
-        conversation_path = lesson_row.get("conversation_audio_url")
-
-        conversation = {"path": conversation_path}
-
-        snippets_out = []
-        if lesson_external_id:
-            snippets_result = (
-                supabase_admin
-                .table("audio_snippets")
-                .select("section, seq, storage_path, audio_key")
-                .eq("lesson_external_id", lesson_external_id)
-                .execute()
-            )
-            for row in snippets_result.data or []:
-                audio_key = row.get("audio_key")
-                storage_path = row.get("storage_path")
-                if not audio_key or not storage_path:
-                    continue
-                snippets_out.append({
-                    "audio_key": audio_key,
-                    "section": row.get("section"),
-                    "seq": row.get("seq"),
-                    "storage_path": storage_path,
-                })
-
-        phrase_ids = []
-        phrases_links = (
-            supabase_admin
-            .table("lesson_phrases")
-            .select("phrase_id")
-            .eq("lesson_id", lesson_id)
-            .execute()
-        )
-        for row in phrases_links.data or []:
-            phrase_id = row.get("phrase_id")
-            if phrase_id:
-                phrase_ids.append(phrase_id)
-
-        phrases_out = []
-        if phrase_ids:
-            phrases_result = (
-                supabase_admin
-                .table("phrases_audio_snippets")
-                .select("phrase_id, variant, seq, storage_path, audio_key")
-                .in_("phrase_id", phrase_ids)
-                .execute()
-            )
-            items = []
-            for row in phrases_result.data or []:
-                audio_key = row.get("audio_key")
-                storage_path = row.get("storage_path")
-                if not audio_key or not storage_path:
-                    continue
-                items.append({
-                    "audio_key": audio_key,
-                    "phrase_id": row.get("phrase_id"),
-                    "variant": row.get("variant") or 0,
-                    "seq": row.get("seq"),
-                    "path": storage_path,
-                })
-            signed_phrases = _sign_audio_batch(items)
-            for row in signed_phrases:
-                phrases_out.append({
-                    "audio_key": row.get("audio_key"),
-                    "phrase_id": row.get("phrase_id"),
-                    "variant": row.get("variant") or 0,
-                    "seq": row.get("seq"),
-                    "signed_url": row.get("signed_url"),
-                })
-
-        payload = {
-            "conversation": conversation,
-            "snippets": snippets_out,
-            "phrases": phrases_out,
-            "expires_in": TRY_AUDIO_TTL_SECONDS,
-        }
-        _set_try_audio_cache(lesson_id, payload)
         return jsonify(payload), 200
 
     except Exception as e:
@@ -985,7 +631,7 @@ def get_user_profile():
 
         # Get the authenticated user
         auth_start = time.perf_counter()
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
         auth_ms = _elapsed_ms(auth_start)
 
         if not user_response.user:
@@ -1083,7 +729,7 @@ def update_user_profile():
 
         # Get the authenticated user - handle potential session issues from OTP flow
         try:
-            user_response = supabase.auth.get_user(access_token)
+            user_response = get_user_for_token(access_token)
 
             if not user_response.user:
                 return jsonify({"error": "Invalid token"}), 401
@@ -1145,6 +791,21 @@ def update_user_profile():
         return jsonify({"error": "Internal server error"}), 500
 
 
+COMPLETED_LESSON_PROGRESS_SELECT = 'id, lesson_id, is_completed, started_at, completed_at'
+COMPLETED_LESSON_METADATA_FIELDS = (
+    'id', 'stage', 'level', 'lesson_order', 'lesson_external_id',
+    'title', 'title_th', 'focus', 'focus_th',
+)
+COMPLETED_LESSONS_MAX_PAGE_SIZE = 500
+
+
+def _completed_lesson_metadata(lesson_id, cached_lessons):
+    lesson = get_pathway_lesson(lesson_id, cached_lessons)
+    if lesson is None:
+        return None
+    return {field: lesson.get(field) for field in COMPLETED_LESSON_METADATA_FIELDS}
+
+
 @routes.route('/api/user/completed-lessons', methods=['GET'])
 @handle_options
 def get_completed_lessons():
@@ -1163,7 +824,7 @@ def get_completed_lessons():
 
         # Get the authenticated user
         auth_start = time.perf_counter()
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
         auth_ms = _elapsed_ms(auth_start)
 
         if not user_response.user:
@@ -1176,13 +837,39 @@ def get_completed_lessons():
 
         user_id = user_response.user.id
 
+        ids_only = (request.args.get('ids_only') or '').strip().lower() in ('1', 'true', 'yes')
+        limit = request.args.get('limit', type=int)
+        if limit is not None:
+            limit = max(1, min(limit, COMPLETED_LESSONS_MAX_PAGE_SIZE))
+        cursor = request.args.get('cursor')
+
         # Fetch completed lessons from user_lesson_progress table
         completed_lessons = []
+        next_cursor = None
         try:
             progress_query_start = time.perf_counter()
-            progress_result = supabase.table('user_lesson_progress').select('*, lessons(*)').eq('user_id', user_id).eq('is_completed', True).execute()
+
+            def build_progress_query():
+                query = (
+                    supabase.table('user_lesson_progress')
+                    .select('lesson_id' if ids_only else COMPLETED_LESSON_PROGRESS_SELECT)
+                    .eq('user_id', user_id)
+                    .eq('is_completed', True)
+                    .order('lesson_id')
+                )
+                if cursor:
+                    query = query.gt('lesson_id', cursor)
+                if limit is not None:
+                    # One extra row tells us whether another page exists.
+                    query = query.limit(limit + 1)
+                return query
+
+            progress_result = _execute_with_retry(build_progress_query, "completed lessons")
             progress_query_ms = _elapsed_ms(progress_query_start)
             completed_lessons = progress_result.data if progress_result.data else []
+            if limit is not None and len(completed_lessons) > limit:
+                completed_lessons = completed_lessons[:limit]
+                next_cursor = completed_lessons[-1].get('lesson_id')
         except Exception as e:
             progress_query_ms = _elapsed_ms(progress_query_start)
             print(
@@ -1195,10 +882,24 @@ def get_completed_lessons():
         print(
             f"[completed-lessons] request_id={request_id} auth_ms={auth_ms} "
             f"progress_query_ms={progress_query_ms} completed_count={len(completed_lessons)} "
-            f"total_ms={_elapsed_ms(request_start)}",
+            f"ids_only={ids_only} limit={limit} total_ms={_elapsed_ms(request_start)}",
             flush=True,
         )
-        return jsonify({"completed_lessons": completed_lessons}), 200
+        if ids_only:
+            response = {
+                "completed_lesson_ids": [
+                    row.get('lesson_id') for row in completed_lessons if row.get('lesson_id')
+                ]
+            }
+        else:
+            # One snapshot for the whole page, even if a refresh swaps it meanwhile.
+            cached_lessons = get_cached_pathway_lessons()
+            for row in completed_lessons:
+                row['lessons'] = _completed_lesson_metadata(row.get('lesson_id'), cached_lessons)
+            response = {"completed_lessons": completed_lessons}
+        if limit is not None:
+            response["next_cursor"] = next_cursor
+        return jsonify(response), 200
 
     except Exception as e:
         print(
@@ -1222,92 +923,44 @@ def get_next_lesson():
         access_token = auth_header.split(' ')[1]
 
         # Get the authenticated user
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
 
         if not user_response.user:
             return jsonify({"error": "Invalid token"}), 401
 
         user_id = user_response.user.id
 
-        # Find the highest completed lesson (by level and lesson_order)
+        # One narrow progress query; ordering comes from the cached pathway index.
         try:
-            completed_result = supabase.table('user_lesson_progress').select('*, lessons(level, lesson_order, stage, title, title_th)').eq('user_id', user_id).eq('is_completed', True).execute()
-            completed_lessons = completed_result.data if completed_result.data else []
+            completed_start = time.perf_counter()
+            completed_result = _execute_with_retry(
+                lambda: (
+                    supabase.table('user_lesson_progress')
+                    .select('lesson_id')
+                    .eq('user_id', user_id)
+                    .eq('is_completed', True)
+                ),
+                "next lesson completed lessons",
+            )
+            completed_query_ms = _elapsed_ms(completed_start)
+            completed_lesson_ids = [
+                row.get('lesson_id') for row in (completed_result.data or [])
+            ]
 
-            if not completed_lessons:
-                # No completed lessons, find the very first lesson (Beginner Level 1 Lesson 1)
-                first_lesson_result = supabase.table('lessons').select('*').eq('stage', 'Beginner').eq('level', 1).eq('lesson_order', 1).limit(1).execute()
-                if first_lesson_result.data:
-                    first_lesson = first_lesson_result.data[0]
-                    return jsonify({
-                        "next_lesson": {
-                            "level": first_lesson.get("level"),
-                            "lesson_order": first_lesson.get("lesson_order"),
-                            "title": first_lesson.get("title"),
-                            "stage": first_lesson.get("stage"),
-                            "formatted": f"Level {first_lesson.get('level')} • Lesson {first_lesson.get('lesson_order')}"
-                        }
-                    }), 200
-                else:
-                    # Fallback: try to find the first lesson in Beginner stage, level 1
-                    fallback_result = supabase.table('lessons').select('*').eq('stage', 'Beginner').order('level, lesson_order').limit(1).execute()
-                    if fallback_result.data:
-                        first_lesson = fallback_result.data[0]
-                        return jsonify({
-                            "next_lesson": {
-                                "level": first_lesson.get("level"),
-                                "lesson_order": first_lesson.get("lesson_order"),
-                                "title": first_lesson.get("title"),
-                                "stage": first_lesson.get("stage"),
-                                "formatted": f"Level {first_lesson.get('level')} • Lesson {first_lesson.get('lesson_order')}"
-                            }
-                        }), 200
-                    else:
-                        return jsonify({"next_lesson": None}), 200
-
-            # Find the highest level and lesson_order among completed lessons
-            highest_level = 0
-            highest_lesson_order = 0
-            highest_stage = "Beginner"
-
-            for progress in completed_lessons:
-                lesson = progress.get('lessons', {})
-                level = lesson.get('level', 0)
-                lesson_order = lesson.get('lesson_order', 0)
-                stage = lesson.get('stage', 'Beginner')
-
-                if level > highest_level or (level == highest_level and lesson_order > highest_lesson_order):
-                    highest_level = level
-                    highest_lesson_order = lesson_order
-                    highest_stage = stage
-
-            # Find the next lesson after the highest completed one
-            # First try to find the next lesson in the same level
-            next_lesson_result = supabase.table('lessons').select('*').eq('level', highest_level).eq('stage', highest_stage).gt('lesson_order', highest_lesson_order).order('lesson_order').limit(1).execute()
-
-            if next_lesson_result.data:
-                next_lesson = next_lesson_result.data[0]
-            else:
-                # No more lessons in this level, try the next level in the same stage
-                next_level_result = supabase.table('lessons').select('*').eq('stage', highest_stage).gt('level', highest_level).order('level, lesson_order').limit(1).execute()
-
-                if next_level_result.data:
-                    next_lesson = next_level_result.data[0]
-                else:
-                    # No more lessons in this stage, try the next stage
-                    stage_order = ['Beginner', 'Intermediate', 'Advanced', 'Expert']
-                    current_stage_index = stage_order.index(highest_stage) if highest_stage in stage_order else 0
-
-                    if current_stage_index < len(stage_order) - 1:
-                        next_stage = stage_order[current_stage_index + 1]
-                        next_stage_result = supabase.table('lessons').select('*').eq('stage', next_stage).order('level, lesson_order').limit(1).execute()
-
-                        if next_stage_result.data:
-                            next_lesson = next_stage_result.data[0]
-                        else:
-                            return jsonify({"next_lesson": None}), 200
-                    else:
-                        return jsonify({"next_lesson": None}), 200
+            cached_lessons = get_cached_pathway_lessons()
+            ordered_lessons = cached_lessons["ordered_lessons"]
+            next_index = next_pathway_index(completed_lesson_ids, cached_lessons)
+            next_lesson = ordered_lessons[next_index] if next_index < len(ordered_lessons) else None
+
+            print(
+                f"[next-lesson] completed_count={len(completed_lesson_ids)} "
+                f"completed_query_ms={completed_query_ms} lessons_cache_hit={cached_lessons['cache_hit']} "
+                f"next_index={next_index} lesson_count={len(ordered_lessons)}",
+                flush=True,
+            )
+
+            if next_lesson is None:
+                return jsonify({"next_lesson": None}), 200
 
             return jsonify({
                 "next_lesson": {
@@ -1344,7 +997,7 @@ def get_pathway_lessons():
 
         # Get the authenticated user
         auth_start = time.perf_counter()
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
         auth_ms = _elapsed_ms(auth_start)
 
         if not user_response.user:
@@ -1370,23 +1023,15 @@ def get_pathway_lessons():
             completed_lessons = completed_result.data if completed_result.data else []
 
             compute_start = time.perf_counter()
-            cached_lessons = _get_cached_pathway_lessons()
+            cached_lessons = get_cached_pathway_lessons()
             ordered_lessons = cached_lessons["ordered_lessons"]
-            lesson_index_by_id = cached_lessons["lesson_index_by_id"]
             lessons_query_ms = cached_lessons["query_ms"]
             lessons_cache_hit = cached_lessons["cache_hit"]
 
-            start_index = 0
-            if completed_lessons:
-                highest_completed_index = max(
-                    (
-                        lesson_index_by_id.get(progress.get('lesson_id'), -1)
-                        for progress in completed_lessons
-                        if progress.get('lesson_id')
-                    ),
-                    default=-1,
-                )
-                start_index = highest_completed_index + 1
+            start_index = next_pathway_index(
+                (progress.get('lesson_id') for progress in completed_lessons),
+                cached_lessons,
+            )
 
             pathway_lessons = ordered_lessons[start_index:start_index + 5]
             compute_ms = _elapsed_ms(compute_start)
@@ -1511,7 +1156,7 @@ def confirm_email():
 
     try:
         # Get user info from Supabase using the access token
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
 
         if not user_response.user:
             return jsonify({"error": "Invalid access token"}), 400
@@ -1586,7 +1231,7 @@ def set_password():
 
     try:
         # Get the authenticated user
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
 
         if not user_response.user:
             return jsonify({"error": "Invalid access token"}), 401
@@ -1762,7 +1407,7 @@ def delete_account():
             return jsonify({"error": "Access token is required"}), 400
 
         # Fetch the user's details using the access token
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
 
         if user_response.user is None:
             return jsonify({"error": "Unable to retrieve user details. User may not exist."}), 401
@@ -1879,7 +1524,7 @@ def notify_comment():
     print(f"[notify-comment] Request for comment_id={comment_id}")
 
     access_token = auth_header.split(" ")[1]
-    user_response = supabase.auth.get_user(access_token)
+    user_response = get_user_for_token(access_token)
     if not user_response.user:
         return jsonify({"error": "Invalid token"}), 401
 
@@ -1983,6 +1628,13 @@ def notify_comment():
         return jsonify({"error": "Failed to send email"}), 500
 
 
+def _set_lesson_response_headers(resp, etag=None):
+    resp.headers["Cache-Control"] = "private, max-age=60"
+    resp.headers["Vary"] = "Accept-Encoding, lang, Authorization, X-Guest-RevenueCat-User-Id"
+    if etag:
+        resp.set_etag(etag)
+
+
 @routes.route("/api/lessons/<lesson_id>/resolved", methods=["GET"])
 @handle_options
 def get_lesson_resolved(lesson_id):
@@ -1995,7 +1647,6 @@ def get_lesson_resolved(lesson_id):
     is_public_try_lesson = lesson_id in PUBLIC_TRY_LESSON_IDS
     is_locked = not is_public_try_lesson
     user_id = None
-    lesson_row = None
     guest_revenuecat_user_id = _get_guest_revenuecat_user_id()
 
     auth_header = request.headers.get('Authorization')
@@ -2004,37 +1655,15 @@ def get_lesson_resolved(lesson_id):
         try:
             auth_start = time.perf_counter()
             access_token = auth_header.split(' ')[1]
-            user_response = supabase.auth.get_user(access_token)
+            user_response = get_user_for_token(access_token)
 
             if user_response.user:
                 user_id = user_response.user.id
 
-                # Check if user has paid access
-                user_result = supabase.table('users').select('is_paid').eq('id', user_id).single().execute()
-                is_paid = user_result.data.get('is_paid', False) if user_result.data else False
-
-                if is_paid:
-                    is_locked = False
-                elif is_locked:
-                    # For free users, check if this is a first lesson of any level
-                    lesson_result = supabase.table('lessons').select(
-                        'id, stage, level, lesson_order, lesson_external_id, '
-                        'title, title_th, subtitle, subtitle_th, focus, focus_th, backstory, backstory_th, '
-                        'image_url, conversation_audio_url, header_img'
-                    ).eq('id', lesson_id).single().execute()
-                    lesson_row = lesson_result.data
-                    if lesson_row:
-                        lesson = lesson_row
-
-                        # Get all lessons for this stage-level combination, ordered by lesson_order
-                        level_lessons = supabase.table('lessons').select('id, lesson_order').eq('stage', lesson['stage']).eq('level', lesson['level']).order('lesson_order', desc=False).execute()
-
-                        if level_lessons.data and len(level_lessons.data) > 0:
-                            # Check if this is the first lesson (lowest lesson_order)
-                            first_lesson = level_lessons.data[0]
-                            first_lesson_id = first_lesson['id']
-                            if lesson_id == first_lesson_id:
-                                is_locked = False
+                # Paid users and the first lesson of each level are unlocked
+                if is_locked:
+                    unlocked, _reason = resolve_lesson_access(lesson_id, user_id)
+                    is_locked = not unlocked
             auth_ms = max(0, round((time.perf_counter() - auth_start) * 1000))
         except Exception as e:
             print(f"Auth check error: {e}")
@@ -2059,13 +1688,12 @@ def get_lesson_resolved(lesson_id):
             print(f"Guest access check error for lesson {lesson_id}: {e}", flush=True)
 
     if is_locked:
-        if not lesson_row:
-            lesson_result = supabase.table('lessons').select(
-                'id, stage, level, lesson_order, lesson_external_id, '
-                'title, title_th, subtitle, subtitle_th, focus, focus_th, backstory, backstory_th, '
-                'image_url, conversation_audio_url, header_img'
-            ).eq('id', lesson_id).single().execute()
-            lesson_row = lesson_result.data
+        lesson_result = supabase.table('lessons').select(
+            'id, stage, level, lesson_order, lesson_external_id, '
+            'title, title_th, subtitle, subtitle_th, focus, focus_th, backstory, backstory_th, '
+            'image_url, conversation_audio_url, header_img'
+        ).eq('id', lesson_id).single().execute()
+        lesson_row = lesson_result.data
 
         if not lesson_row:
             return jsonify({"error": "Lesson not found"}), 404
@@ -2129,8 +1757,7 @@ def get_lesson_resolved(lesson_id):
             'phrases': [],
         }
         resp = jsonify(safe_payload)
-        resp.headers["Cache-Control"] = "private, max-age=60"
-        resp.headers["Vary"] = "Accept-Encoding, lang, Authorization, X-Guest-RevenueCat-User-Id"
+        _set_lesson_response_headers(resp)
         print(
             f"[lesson-route] lesson_id={lesson_id} lang={lang} "
             f"locked={is_locked} auth_ms={auth_ms} resolve_ms=0 "
@@ -2141,26 +1768,38 @@ def get_lesson_resolved(lesson_id):
 
     try:
         resolve_start = time.perf_counter()
-        payload = copy.deepcopy(resolve_lesson(lesson_id, lang))
+        payload = resolve_lesson_payload(lesson_id, lang)
         resolve_ms = max(0, round((time.perf_counter() - resolve_start) * 1000))
     except KeyError:
         return jsonify({"error": "Lesson not found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    # Add locked status to payload
-    payload['locked'] = is_locked
+    etag = payload.etag(is_locked)
+    # Compressed responses carry the weak form of the ETag, so compare weakly.
+    if request.if_none_match.contains_weak(etag):
+        print(
+            f"[lesson-route] lesson_id={lesson_id} lang={lang} "
+            f"locked={is_locked} auth_ms={auth_ms} resolve_ms={resolve_ms} not_modified=true "
+            f"total_ms={max(0, round((time.perf_counter() - route_start) * 1000))}",
+            flush=True,
+        )
+        resp = Response(status=304)
+        _set_lesson_response_headers(resp, etag)
+        return resp
+
+    # Add locked status to the pre-encoded payload without re-serializing it
+    body = payload.with_locked(is_locked)
 
     print(
         f"[lesson-route] lesson_id={lesson_id} lang={lang} "
-        f"locked={is_locked} auth_ms={auth_ms} resolve_ms={resolve_ms} "
+        f"locked={is_locked} auth_ms={auth_ms} resolve_ms={resolve_ms} bytes={len(body)} "
         f"total_ms={max(0, round((time.perf_counter() - route_start) * 1000))}",
         flush=True,
     )
 
-    resp = jsonify(payload)
-    resp.headers["Cache-Control"] = "private, max-age=60"
-    resp.headers["Vary"] = "Accept-Encoding, lang, Authorization, X-Guest-RevenueCat-User-Id"
+    resp = Response(body, mimetype="application/json")
+    _set_lesson_response_headers(resp, etag)
     return resp, 200
 
 
@@ -2178,7 +1817,7 @@ def get_level_completion_status(stage, level):
         access_token = auth_header.split(' ')[1]
 
         # Get the authenticated user
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
 
         if not user_response.user:
             return jsonify({"error": "Invalid token"}), 401
@@ -2186,14 +1825,10 @@ def get_level_completion_status(stage, level):
         user_id = user_response.user.id
         auth_ms = _elapsed_ms(auth_start)
 
-        # Get all lessons for this stage and level
+        # Get all lessons for this stage and level from the cached pathway list
         lessons_query_start = time.perf_counter()
-        lessons_result = _execute_with_retry(
-            lambda: supabase.table('lessons').select('id').eq('stage', stage).eq('level', level),
-            "level completion lessons",
-        )
+        all_lessons = get_level_lessons(stage, level)
         lessons_query_ms = _elapsed_ms(lessons_query_start)
-        all_lessons = lessons_result.data if lessons_result.data else []
 
         if not all_lessons:
             return jsonify({"is_completed": False, "total_lessons": 0, "completed_lessons": 0}), 200
@@ -2201,35 +1836,9 @@ def get_level_completion_status(stage, level):
         lesson_ids = [lesson['id'] for lesson in all_lessons]
 
         total_lessons = len(all_lessons)
-        progress_query_start = time.perf_counter()
-        progress_result = _execute_with_retry(
-            lambda: (
-                supabase.table('user_lesson_progress')
-                .select('lesson_id, is_completed')
-                .eq('user_id', user_id)
-                .in_('lesson_id', lesson_ids)
-            ),
-            "level completion lesson progress",
-        )
-        progress_query_ms = _elapsed_ms(progress_query_start)
-        unit_query_start = time.perf_counter()
-        unit_result = _execute_with_retry(
-            lambda: (
-                supabase.table('user_lesson_unit_progress')
-                .select('lesson_id, unit_key, is_completed')
-                .eq('user_id', user_id)
-                .in_('lesson_id', lesson_ids)
-            ),
-            "level completion unit progress",
-        )
-        unit_query_ms = _elapsed_ms(unit_query_start)
-        summarize_start = time.perf_counter()
-        summaries = _summarize_web_lesson_progress(
-            lesson_ids,
-            progress_result.data or [],
-            unit_result.data or [],
-        )
-        summarize_ms = _elapsed_ms(summarize_start)
+        summaries_start = time.perf_counter()
+        summaries = get_web_lesson_progress_summaries(user_id, lesson_ids)
+        summaries_ms = _elapsed_ms(summaries_start)
         completed_count = sum(
             1 for lesson_id in lesson_ids
             if (summaries.get(lesson_id) or {}).get("is_completed")
@@ -2240,8 +1849,7 @@ def get_level_completion_status(stage, level):
         print(
             f"[progress:level-completion] stage={stage} level={level} lessons={len(lesson_ids)} "
             f"auth_ms={auth_ms} lessons_query_ms={lessons_query_ms} "
-            f"progress_query_ms={progress_query_ms} unit_query_ms={unit_query_ms} "
-            f"summarize_ms={summarize_ms} total_ms={total_ms}",
+            f"summaries_ms={summaries_ms} total_ms={total_ms}",
             flush=True,
         )
 
@@ -2267,7 +1875,7 @@ def get_lesson_progress_summaries():
             return jsonify({"error": "Authorization token required"}), 401
 
         access_token = auth_header.split(' ')[1]
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
 
         if not user_response.user:
             return jsonify({"error": "Invalid token"}), 401
@@ -2283,44 +1891,13 @@ def get_lesson_progress_summaries():
         if not lesson_ids:
             return jsonify({"progress_by_lesson": {}}), 200
 
-        progress_query_start = time.perf_counter()
-        progress_result = _execute_with_retry(
-            lambda: (
-                supabase.table('user_lesson_progress')
-                .select('lesson_id, is_completed')
-                .eq('user_id', user_id)
-                .in_('lesson_id', lesson_ids)
-            ),
-            "lesson progress summaries lesson progress",
-        )
-        progress_query_ms = _elapsed_ms(progress_query_start)
-        unit_query_start = time.perf_counter()
-        unit_result = _execute_with_retry(
-            lambda: (
-                supabase.table('user_lesson_unit_progress')
-                .select('lesson_id, unit_key, is_completed')
-                .eq('user_id', user_id)
-                .in_('lesson_id', lesson_ids)
-            ),
-            "lesson progress summaries unit progress",
-        )
-        unit_query_ms = _elapsed_ms(unit_query_start)
-        db_ms = progress_query_ms + unit_query_ms
-
-        expectations_start = time.perf_counter()
-        summaries = _summarize_web_lesson_progress(
-            lesson_ids,
-            progress_result.data or [],
-            unit_result.data or [],
-        )
-        expectations_ms = _elapsed_ms(expectations_start)
+        summaries_start = time.perf_counter()
+        summaries = get_web_lesson_progress_summaries(user_id, lesson_ids)
+        summaries_ms = _elapsed_ms(summaries_start)
         total_ms = _elapsed_ms(route_start)
         print(
             f"[progress:web-summary] lessons={len(lesson_ids)} auth_ms={auth_ms} "
-            f"progress_query_ms={progress_query_ms} unit_query_ms={unit_query_ms} "
-            f"db_ms={db_ms} summarize_ms={expectations_ms} "
-            f"progress_rows={len(progress_result.data or [])} unit_rows={len(unit_result.data or [])} "
-            f"total_ms={total_ms}",
+            f"summaries_ms={summaries_ms} total_ms={total_ms}",
             flush=True,
         )
 
@@ -2340,7 +1917,7 @@ def get_app_lesson_progress_summaries():
             return jsonify({"error": "Authorization token required"}), 401
 
         access_token = auth_header.split(' ')[1]
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
 
         if not user_response.user:
             return jsonify({"error": "Invalid token"}), 401
@@ -2355,43 +1932,13 @@ def get_app_lesson_progress_summaries():
         if not lesson_ids:
             return jsonify({"progress_by_lesson": {}}), 200
 
-        db_start = time.perf_counter()
-        progress_result = _execute_with_retry(
-            lambda: (
-                supabase.table('user_lesson_progress')
-                .select('lesson_id, is_completed, last_unit_type, last_unit_key')
-                .eq('user_id', user_id)
-                .in_('lesson_id', lesson_ids)
-            ),
-            "app lesson progress summaries lesson progress",
-        )
-        unit_result = _execute_with_retry(
-            lambda: (
-                supabase.table('user_lesson_unit_progress')
-                .select('lesson_id, unit_key, unit_type, section_key, is_completed')
-                .eq('user_id', user_id)
-                .in_('lesson_id', lesson_ids)
-            ),
-            "app lesson progress summaries unit progress",
-        )
-        db_ms = _elapsed_ms(db_start)
-        expectations_start = time.perf_counter()
-        total_units_by_lesson = fetch_app_total_units_for_many(
-            lesson_ids,
-            fallback=True,
-            persist_fallback=True,
-        )
-        summaries = summarize_app_lesson_progress_from_totals(
-            lesson_ids,
-            progress_result.data or [],
-            unit_result.data or [],
-            total_units_by_lesson,
-        )
-        expectations_ms = _elapsed_ms(expectations_start)
+        summaries_start = time.perf_counter()
+        summaries = get_app_lesson_progress_summaries(user_id, lesson_ids)
+        summaries_ms = _elapsed_ms(summaries_start)
         total_ms = _elapsed_ms(route_start)
         print(
-            f"[progress:app-summary] lessons={len(lesson_ids)} db_ms={db_ms} "
-            f"summarize_ms={expectations_ms} total_ms={total_ms}",
+            f"[progress:app-summary] lessons={len(lesson_ids)} "
+            f"summaries_ms={summaries_ms} total_ms={total_ms}",
             flush=True,
         )
 
@@ -2426,7 +1973,7 @@ def get_app_lesson_progress_detail(lesson_id):
             return jsonify({"error": "Authorization token required"}), 401
 
         access_token = auth_header.split(' ')[1]
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
 
         if not user_response.user:
             return jsonify({"error": "Invalid token"}), 401
@@ -2604,49 +2151,33 @@ def get_user_stats():
         if auth_error:
             return auth_error
 
-        # Get total completed lessons count (simple query first)
+        stats_start = time.perf_counter()
+        # One progress query; level totals come from the cached pathway index.
+        completed_lesson_ids = []
         try:
-            completed_lessons_result = supabase.table('user_lesson_progress').select('*', count='exact').eq('user_id', user_id).eq('is_completed', True).execute()
-            lessons_completed = completed_lessons_result.count if completed_lessons_result.count else 0
+            completed_result = _execute_with_retry(
+                lambda: (
+                    supabase.table('user_lesson_progress')
+                    .select('lesson_id')
+                    .eq('user_id', user_id)
+                    .eq('is_completed', True)
+                ),
+                "user stats completed lessons",
+            )
+            completed_lesson_ids = [
+                row.get('lesson_id') for row in (completed_result.data or [])
+                if row.get('lesson_id')
+            ]
         except Exception as e:
             print(f"Error counting completed lessons: {e}")
-            lessons_completed = 0
+        lessons_completed = len(completed_lesson_ids)
 
-        # Try to get levels completed (with error handling)
         levels_completed = 0
         try:
-            # Get completed lessons with lesson details
-            completed_with_lessons = supabase.table('user_lesson_progress').select('lesson_id, lessons!inner(stage, level)').eq('user_id', user_id).eq('is_completed', True).execute()
-
-            if completed_with_lessons.data:
-                # Group by stage and level
-                level_groups = {}
-                for progress in completed_with_lessons.data:
-                    lesson = progress.get('lessons', {})
-                    stage = lesson.get('stage')
-                    level = lesson.get('level')
-
-                    if stage and level is not None:
-                        key = f"{stage}_{level}"
-                        if key not in level_groups:
-                            level_groups[key] = []
-                        level_groups[key].append(progress['lesson_id'])
-
-                # Count completed levels
-                for level_key, completed_lesson_ids in level_groups.items():
-                    stage, level = level_key.split('_')
-                    level = int(level)
-
-                    # Get total lessons for this level
-                    total_lessons_result = supabase.table('lessons').select('id', count='exact').eq('stage', stage).eq('level', level).execute()
-                    total_count = total_lessons_result.count if total_lessons_result.count else 0
-
-                    if len(completed_lesson_ids) == total_count and total_count > 0:
-                        levels_completed += 1
-
+            levels_completed = count_completed_levels(completed_lesson_ids)
         except Exception as e:
             print(f"Error calculating levels completed: {e}")
-            # Fallback to 0 if level calculation fails
+        stats_ms = _elapsed_ms(stats_start)
 
         try:
             tzinfo, timezone_name = _resolve_streak_timezone()
@@ -2661,6 +2192,12 @@ def get_user_stats():
                 "last_checkin_date": None,
             }
 
+        print(
+            f"[user-stats] lessons_completed={lessons_completed} "
+            f"levels_completed={levels_completed} stats_ms={stats_ms}",
+            flush=True,
+        )
+
         return jsonify({
             "lessons_completed": lessons_completed,
             "levels_completed": levels_completed,
@@ -2688,7 +2225,7 @@ def get_user_comments():
         access_token = auth_header.split(' ')[1]
 
         # Get the authenticated user
-        user_response = supabase.auth.get_user(access_token)
+        user_response = get_user_for_token(access_token)
 
         if not user_response.user:
             return jsonify({"error": "Invalid token"}), 401
@@ -2801,51 +2338,9 @@ def get_exercise_sections():
     """Return sections grouped by category for the exercise bank."""
     try:
         category_filter = (request.args.get("category") or "").strip().lower()
-        featured_result = (
-            supabase.table("featured_sections")
-            .select("section")
-            .execute()
-        )
-        featured_sections = {
-            (row.get("section") or "").strip()
-            for row in (featured_result.data or [])
-            if row.get("section")
-        }
+        catalog = get_exercise_catalog()
 
-        result = (
-            supabase.table("exercise_bank")
-            .select("id, category, section, section_th")
-            .order("id", desc=False)
-            .execute()
-        )
-
-        rows = result.data or []
-        sections_map = {}
-
-        for row in rows:
-            category = row.get("category") or ""
-            section = row.get("section") or ""
-            key = (category, section)
-            is_featured = section in featured_sections
-
-            if key not in sections_map:
-                section_th = row.get("section_th") or None
-                sections_map[key] = {
-                    "category": category,
-                    "category_label": _category_label(category),
-                    "category_slug": _category_slug(category),
-                    "section": section,
-                    "section_th": section_th,
-                    "section_slug": _section_slug(section),
-                    "section_order": row.get("id"),
-                    "exercise_count": 0,
-                    "featured_count": 1 if is_featured else 0,
-                    "is_featured": is_featured,
-                }
-
-            sections_map[key]["exercise_count"] += 1
-
-        sections = list(sections_map.values())
+        sections = catalog["sections"]
         if category_filter:
             sections = [
                 section
@@ -2854,39 +2349,7 @@ def get_exercise_sections():
                 or section["category"].lower() == category_filter
             ]
 
-        sections.sort(
-            key=lambda item: (
-                _category_order_index(item["category"]),
-                item.get("section_order") or 0,
-                item["section"],
-            )
-        )
-
-        # Build the category list with aggregated data
-        categories = defaultdict(
-            lambda: {"label": "", "slug": "", "section_count": 0, "exercise_count": 0}
-        )
-        for section in sections_map.values():
-            key = section["category"]
-            cat_entry = categories[key]
-            cat_entry["label"] = _category_label(key)
-            cat_entry["slug"] = _category_slug(key)
-            cat_entry["section_count"] += 1
-            cat_entry["exercise_count"] += section["exercise_count"]
-
-        category_list = [
-            {
-                "category": key,
-                "category_label": value["label"],
-                "category_slug": value["slug"],
-                "section_count": value["section_count"],
-                "exercise_count": value["exercise_count"],
-            }
-            for key, value in categories.items()
-        ]
-        category_list.sort(key=lambda item: item["category_label"])
-
-        return jsonify({"sections": sections, "categories": category_list}), 200
+        return jsonify({"sections": sections, "categories": catalog["categories"]}), 200
 
     except Exception as exc:
         print(f"Error fetching exercise sections: {exc}")
@@ -2898,48 +2361,7 @@ def get_exercise_sections():
 def get_featured_exercises():
     """Return featured exercises across the exercise bank."""
     try:
-        featured_result = (
-            supabase.table("featured_sections")
-            .select("section")
-            .execute()
-        )
-        featured_sections = [
-            (row.get("section") or "").strip()
-            for row in (featured_result.data or [])
-            if row.get("section")
-        ]
-        if not featured_sections:
-            return jsonify({"featured": []}), 200
-
-        result = (
-            supabase.table("exercise_bank")
-            .select("category, section, section_th")
-            .in_("section", featured_sections)
-            .execute()
-        )
-
-        rows = result.data or []
-        sections_map = {}
-        for row in rows:
-            category = row.get("category") or ""
-            section = row.get("section") or ""
-            key = (category, section)
-            if key not in sections_map:
-                sections_map[key] = {
-                    "category": category,
-                    "category_label": _category_label(category),
-                    "category_slug": _category_slug(category),
-                    "section": section,
-                    "section_th": row.get("section_th") or None,
-                    "section_slug": _section_slug(section),
-                    "exercise_count": 0,
-                }
-            sections_map[key]["exercise_count"] += 1
-
-        featured = list(sections_map.values())
-        featured.sort(key=lambda item: (item["category_label"], item["section"]))
-
-        return jsonify({"featured": featured}), 200
+        return jsonify({"featured": get_exercise_catalog()["featured"]}), 200
 
     except Exception as exc:
         print(f"Error fetching featured exercises: {exc}")
@@ -2951,12 +2373,19 @@ def get_featured_exercises():
 def get_exercise_section(category_slug, section_slug):
     """Return all exercises for a specific section."""
     try:
+        section_pairs = resolve_section_slugs(category_slug, section_slug)
+        if not section_pairs:
+            return jsonify({"error": "Section not found"}), 404
+
+        # Only the requested section's rows; slugs are resolved from the cached map.
         result = (
             supabase.table("exercise_bank")
             .select(
                 "id, category, section, section_th, title, title_th, prompt, prompt_th, "
                 "exercise_type, items, items_th, sort_order, is_featured"
             )
+            .in_("category", sorted({category for category, _ in section_pairs}))
+            .in_("section", sorted({section for _, section in section_pairs}))
             .order("sort_order", desc=False)
             .execute()
         )
@@ -3008,6 +2437,16 @@ def get_exercise_section(category_slug, section_slug):
         return jsonify({"error": "Failed to fetch exercise section"}), 500
 
 
+def _cached_json_response(body, etag):
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype="application/json")
+    resp.headers["Cache-Control"] = "public, max-age=60"
+    resp.set_etag(etag)
+    return resp
+
+
 @routes.route('/api/topic-library', methods=['GET'])
 @handle_options
 def get_topic_library():
@@ -3017,35 +2456,21 @@ def get_topic_library():
         if lang not in ("en", "th"):
             lang = "en"
 
+        # view=index lists topics without their article bodies, from the worker cache
+        if request.args.get("view") == "index":
+            body, etag = get_topic_index_payload(lang)
+            return _cached_json_response(body, etag)
+
         # Fetch all topics ordered by idx
         result = supabase.table('topic_library').select('*').order('idx', desc=False).execute()
 
         if not result.data:
             return jsonify({"topics": []}), 200
 
-        topics = []
-        for topic in result.data:
-            # Choose the appropriate content based on language
-            if lang == "th" and topic.get('content_jsonb_th'):
-                content_jsonb = topic['content_jsonb_th']
-                name = topic.get('name_th') or topic['name']
-                subtitle = topic.get('subtitle_th') or topic.get('subtitle')
-            else:
-                content_jsonb = topic['content_jsonb']
-                name = topic['name']
-                subtitle = topic.get('subtitle')
-
-            topics.append({
-                "id": topic['id'],
-                "name": name,
-                "subtitle": subtitle,
-                "slug": topic['slug'],
-                "tags": topic.get('tags', []),
-                "is_featured": bool(topic.get('is_featured')),
-                "content_jsonb": content_jsonb,
-                "created_at": topic.get('created_at'),
-                "updated_at": topic.get('updated_at')
-            })
+        topics = [
+            localize_topic(topic, lang, bool(topic.get('content_jsonb_th')))
+            for topic in result.data
+        ]
 
         return jsonify({"topics": topics}), 200
 
@@ -3063,37 +2488,12 @@ def get_topic_by_slug(slug):
         if lang not in ("en", "th"):
             lang = "en"
 
-        # Fetch topic by slug
-        result = supabase.table('topic_library').select('*').eq('slug', slug).execute()
-
-        if not result.data:
+        payload = get_topic_payload(slug, lang)
+        if payload is None:
             return jsonify({"error": "Topic not found"}), 404
 
-        topic = result.data[0]
-
-        # Choose the appropriate content based on language
-        if lang == "th" and topic.get('content_jsonb_th'):
-            content_jsonb = topic['content_jsonb_th']
-            name = topic.get('name_th') or topic['name']
-            subtitle = topic.get('subtitle_th') or topic.get('subtitle')
-        else:
-            content_jsonb = topic['content_jsonb']
-            name = topic['name']
-            subtitle = topic.get('subtitle')
-
-        response_topic = {
-            "id": topic['id'],
-            "name": name,
-            "subtitle": subtitle,
-            "slug": topic['slug'],
-            "tags": topic.get('tags', []),
-            "is_featured": bool(topic.get('is_featured')),
-            "content_jsonb": content_jsonb,
-            "created_at": topic.get('created_at'),
-            "updated_at": topic.get('updated_at')
-        }
-
-        return jsonify({"topic": response_topic}), 200
+        body, etag = payload
+        return _cached_json_response(body, etag)
 
     except Exception as e:
         print(f"Error fetching topic {slug}: {e}")
@@ -3,6 +3,7 @@ import stripe
 from datetime import datetime, timezone
 import time
 from flask import Blueprint, request, jsonify, send_file
+from app.auth import get_authenticated_user_id
 from app.supabase_client import supabase
 from app.config import Config
 from app.pricing_utils import resolve_region_key
@@ -129,19 +130,10 @@ def create_portal_session():
     Create a Stripe Customer Portal session for subscription management.
     """
     try:
-        # Get authorization header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({"error": "Authorization token required"}), 401
-
-        access_token = auth_header.split(' ')[1]
-
         # Get the authenticated user
-        user_response = supabase.auth.get_user(access_token)
-        if not user_response.user:
-            return jsonify({"error": "Invalid token"}), 401
-
-        user_id = user_response.user.id
+        user_id, auth_error = get_authenticated_user_id()
+        if auth_error:
+            return auth_error
 
         # Get user's Stripe customer ID from database
         result = supabase.table('users').select('stripe_customer_id').eq('id', user_id).single().execute()
@@ -174,19 +166,10 @@ def get_payment_method():
     Get the customer's default payment method details.
     """
     try:
-        # Get authorization header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({"error": "Authorization token required"}), 401
-
-        access_token = auth_header.split(' ')[1]
-
         # Get the authenticated user
-        user_response = supabase.auth.get_user(access_token)
-        if not user_response.user:
-            return jsonify({"error": "Invalid token"}), 401
-
-        user_id = user_response.user.id
+        user_id, auth_error = get_authenticated_user_id()
+        if auth_error:
+            return auth_error
 
         # Get user's Stripe customer ID
         result = supabase.table('users').select('stripe_customer_id').eq('id', user_id).single().execute()
@@ -243,19 +226,10 @@ def get_invoices():
     Get the customer's recent invoices.
     """
     try:
-        # Get authorization header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({"error": "Authorization token required"}), 401
-
-        access_token = auth_header.split(' ')[1]
-
         # Get the authenticated user
-        user_response = supabase.auth.get_user(access_token)
-        if not user_response.user:
-            return jsonify({"error": "Invalid token"}), 401
-
-        user_id = user_response.user.id
+        user_id, auth_error = get_authenticated_user_id()
+        if auth_error:
+            return auth_error
 
         # Get user's Stripe customer ID
         result = supabase.table('users').select('stripe_customer_id').eq('id', user_id).single().execute()
@@ -298,19 +272,10 @@ def get_subscription_summary():
     Get the customer's current subscription price details.
     """
     try:
-        # Get authorization header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({"error": "Authorization token required"}), 401
-
-        access_token = auth_header.split(' ')[1]
-
         # Get the authenticated user
-        user_response = supabase.auth.get_user(access_token)
-        if not user_response.user:
-            return jsonify({"error": "Invalid token"}), 401
-
-        user_id = user_response.user.id
+        user_id, auth_error = get_authenticated_user_id()
+        if auth_error:
+            return auth_error
 
         # Get user's Stripe subscription ID
         result = supabase.table('users').select('stripe_subscription_id').eq('id', user_id).single().execute()
@@ -406,19 +371,10 @@ def download_invoice(invoice_id):
     Download a specific invoice PDF.
     """
     try:
-        # Get authorization header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({"error": "Authorization token required"}), 401
-
-        access_token = auth_header.split(' ')[1]
-
         # Get the authenticated user
-        user_response = supabase.auth.get_user(access_token)
-        if not user_response.user:
-            return jsonify({"error": "Invalid token"}), 401
-
-        user_id = user_response.user.id
+        user_id, auth_error = get_authenticated_user_id()
+        if auth_error:
+            return auth_error
 
         # Get user's Stripe customer ID
         result = supabase.table('users').select('stripe_customer_id').eq('id', user_id).single().execute()
@@ -454,19 +410,10 @@ def cancel_subscription():
     Cancel the customer's active subscription.
     """
     try:
-        # Get authorization header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({"error": "Authorization token required"}), 401
-
-        access_token = auth_header.split(' ')[1]
-
         # Get the authenticated user
-        user_response = supabase.auth.get_user(access_token)
-        if not user_response.user:
-            return jsonify({"error": "Invalid token"}), 401
-
-        user_id = user_response.user.id
+        user_id, auth_error = get_authenticated_user_id()
+        if auth_error:
+            return auth_error
 
         # Get user's Stripe subscription ID
         result = supabase.table('users').select('stripe_subscription_id, stripe_customer_id').eq('id', user_id).single().execute()
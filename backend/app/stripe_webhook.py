@@ -2,11 +2,18 @@ import os
 import stripe
 from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify
+from app.lesson_access import invalidate_user_entitlement
 from app.supabase_client import supabase
 
 stripe_webhook = Blueprint('stripe_webhook', __name__)
 
 
+def _invalidate_updated_users(result):
+    """Drop cached lesson entitlements for every user row an update touched."""
+    for row in getattr(result, 'data', None) or []:
+        invalidate_user_entitlement(row.get('id'))
+
+
 def get_current_period_end(subscription):
     """
     Universal-safe extractor for current_period_end.
@@ -120,6 +127,7 @@ def stripe_webhook_handler():
 
             if not result.data:
                 print(f"⚠️ No user found with email: {customer_email}")
+            _invalidate_updated_users(result)
 
         except Exception as e:
             print(f"❌ Error updating user: {e}")
@@ -153,7 +161,7 @@ def stripe_webhook_handler():
                     except Exception as pm_error:
                         print(f"⚠️ Error setting default payment method: {pm_error}")
 
-                supabase.table('users').update({
+                result = supabase.table('users').update({
                     'is_paid': True,
                     'membership_source': 'stripe',
                     'billing_provider': 'stripe',
@@ -162,6 +170,7 @@ def stripe_webhook_handler():
                     'cancel_at_period_end': getattr(subscription, 'cancel_at_period_end', False),
                     'cancel_at': to_iso_date(getattr(subscription, 'cancel_at', None))
                 }).eq('stripe_customer_id', customer_id).execute()
+                _invalidate_updated_users(result)
 
             except Exception as e:
                 print(f"❌ Error updating renewal: {e}")
@@ -177,7 +186,7 @@ def stripe_webhook_handler():
         try:
             current_period_end_value = get_current_period_end(subscription)
 
-            supabase.table('users').update({
+            result = supabase.table('users').update({
                 'membership_source': 'stripe',
                 'billing_provider': 'stripe',
                 'subscription_status': status,
@@ -186,6 +195,7 @@ def stripe_webhook_handler():
                 'cancel_at_period_end': subscription.get('cancel_at_period_end', False),
                 'cancel_at': to_iso_date(subscription.get('cancel_at'))
             }).eq('stripe_customer_id', customer_id).execute()
+            _invalidate_updated_users(result)
 
         except Exception as e:
             print(f"❌ Error updating subscription: {e}")
@@ -196,12 +206,13 @@ def stripe_webhook_handler():
         customer_id = subscription.get('customer')
 
         try:
-            supabase.table('users').update({
+            result = supabase.table('users').update({
                 'is_paid': False,
                 'membership_source': 'stripe',
                 'billing_provider': 'stripe',
                 'subscription_status': 'cancelled'
             }).eq('stripe_customer_id', customer_id).execute()
+            _invalidate_updated_users(result)
 
         except Exception as e:
             print(f"❌ Error cancelling subscription: {e}")
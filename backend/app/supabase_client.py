@@ -1,7 +1,148 @@
-from supabase import create_client
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from supabase import ClientOptions, create_client
 from app.config import Config
 
+SUPABASE_THREAD_NAME_PREFIX = "supabase-io"
+
+_metrics_lock = threading.Lock()
+_executor_metrics = {
+    "submitted": 0,
+    "completed": 0,
+    "failed": 0,
+    "active": 0,
+    "peak_active": 0,
+    "inline_runs": 0,
+}
+_http_metrics = {
+    "requests": 0,
+    "responses": 0,
+    "http_versions": {},
+}
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _count_request(_request):
+    with _metrics_lock:
+        _http_metrics["requests"] += 1
+
+
+def _count_response(response):
+    with _metrics_lock:
+        _http_metrics["responses"] += 1
+        versions = _http_metrics["http_versions"]
+        versions[response.http_version] = versions.get(response.http_version, 0) + 1
+
 
-supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+def _build_http_client():
+    # One bounded, keep-alive pool per Supabase client. Idle connections are
+    # closed before the server's idle timeout so we do not reuse half-dead
+    # HTTP/2 connections (the source of ConnectionTerminated retries).
+    return httpx.Client(
+        http2=Config.SUPABASE_HTTP2,
+        follow_redirects=True,
+        timeout=httpx.Timeout(Config.SUPABASE_HTTP_TIMEOUT_SECONDS, connect=5.0),
+        limits=httpx.Limits(
+            max_connections=Config.SUPABASE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.SUPABASE_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=Config.SUPABASE_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        event_hooks={"request": [_count_request], "response": [_count_response]},
+    )
+
+
+def _create_supabase_client(key):
+    return create_client(
+        Config.SUPABASE_URL,
+        key,
+        options=ClientOptions(httpx_client=_build_http_client()),
+    )
+
+
+supabase = _create_supabase_client(Config.SUPABASE_KEY)
 service_key = Config.SUPABASE_SERVICE_ROLE_KEY or Config.SUPABASE_KEY
-supabase_admin = create_client(Config.SUPABASE_URL, service_key)
+supabase_admin = _create_supabase_client(service_key)
+
+
+def get_supabase_executor():
+    """Return this worker's shared executor for fan-out Supabase queries."""
+    global _executor, _executor_pid
+    # Thread pools do not survive a fork, so each gunicorn worker builds its own.
+    if _executor is not None and _executor_pid == os.getpid():
+        return _executor
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=Config.SUPABASE_EXECUTOR_MAX_WORKERS,
+                thread_name_prefix=SUPABASE_THREAD_NAME_PREFIX,
+            )
+            _executor_pid = os.getpid()
+    return _executor
+
+
+def _in_supabase_executor():
+    return threading.current_thread().name.startswith(SUPABASE_THREAD_NAME_PREFIX)
+
+
+def _track_call(fn, *args, **kwargs):
+    with _metrics_lock:
+        _executor_metrics["active"] += 1
+        _executor_metrics["peak_active"] = max(
+            _executor_metrics["peak_active"], _executor_metrics["active"]
+        )
+    try:
+        result = fn(*args, **kwargs)
+    except Exception:
+        with _metrics_lock:
+            _executor_metrics["failed"] += 1
+        raise
+    finally:
+        with _metrics_lock:
+            _executor_metrics["active"] -= 1
+            _executor_metrics["completed"] += 1
+    return result
+
+
+def submit_supabase_call(fn, *args, **kwargs):
+    with _metrics_lock:
+        _executor_metrics["submitted"] += 1
+    return get_supabase_executor().submit(_track_call, fn, *args, **kwargs)
+
+
+def run_concurrently(calls):
+    """Run ``{name: fn}`` on the shared executor and return ``{name: result}``.
+
+    Calls made from inside the executor run inline, so nested fan-outs cannot
+    deadlock a bounded pool by waiting on their own queued work.
+    """
+    if _in_supabase_executor():
+        with _metrics_lock:
+            _executor_metrics["inline_runs"] += len(calls)
+        return {name: fn() for name, fn in calls.items()}
+
+    futures = {name: submit_supabase_call(fn) for name, fn in calls.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def get_supabase_pool_metrics():
+    executor = _executor if _executor_pid == os.getpid() else None
+    with _metrics_lock:
+        executor_metrics = dict(_executor_metrics)
+        http_metrics = dict(_http_metrics)
+        http_metrics["http_versions"] = dict(_http_metrics["http_versions"])
+    executor_metrics["max_workers"] = Config.SUPABASE_EXECUTOR_MAX_WORKERS
+    executor_metrics["queued"] = executor._work_queue.qsize() if executor else 0
+    http_metrics.update(
+        {
+            "http2": Config.SUPABASE_HTTP2,
+            "max_connections": Config.SUPABASE_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": Config.SUPABASE_HTTP_MAX_KEEPALIVE,
+            "keepalive_expiry_seconds": Config.SUPABASE_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        }
+    )
+    return {"executor": executor_metrics, "http": http_metrics}
@@ -13,6 +13,7 @@ from __future__ import annotations
 import argparse
 
 from app.app_lesson_progress import refresh_app_total_units_for_lessons
+from app.content_versions import LESSON_SCOPE, bump_content_versions
 from app.supabase_client import supabase
 
 
@@ -48,6 +49,8 @@ def main() -> None:
     )
 
     print(f"[INFO] Computed app_total_units for {len(totals_by_lesson)} lessons.")
+    if not args.dry_run:
+        bump_content_versions(LESSON_SCOPE, lesson_ids)
     for lesson_id in lesson_ids[:10]:
         print(f"  {lesson_id}: {totals_by_lesson.get(lesson_id, 0)}")
     if len(lesson_ids) > 10:
@@ -32,6 +32,9 @@ import os, re, sys
 from collections import defaultdict
 from supabase import create_client, Client
 
+from app.content_versions import AUDIO_SNIPPETS_SCOPE, bump_content_versions
+from app.resolver import lesson_ids_for_external_ids, recompile_lessons
+
 # ─── 1. Config ─────────────────────────────────────────────────────────────
 STAGES = {
     "Beginner",
@@ -250,8 +253,11 @@ def list_objects_recursive(prefix: str = "") -> list[str]:
     return objects
 
 # ─── 5. Update content_jsonb with audio_key ─────────────────────────────────
-def update_lesson_sections_with_audio_keys(level: int | None = None, stage: str | None = None):
-    """Update content_jsonb in lesson_sections to include audio_key for nodes with audio_seq"""
+def update_lesson_sections_with_audio_keys(level: int | None = None, stage: str | None = None) -> set[str]:
+    """Update content_jsonb in lesson_sections to include audio_key for nodes with audio_seq.
+
+    Returns the ids of lessons whose sections changed.
+    """
     print("\nUpdating lesson_sections content_jsonb with audio_key values...")
 
     # First, build an index of audio snippets by lesson_external_id, section, and seq
@@ -281,6 +287,7 @@ def update_lesson_sections_with_audio_keys(level: int | None = None, stage: str
     sections = sb.table("lesson_sections").select("id,lesson_id,type,content_jsonb").execute()
 
     updated_count = 0
+    updated_lesson_ids = set()
     for section in sections.data:
         section_id = section.get("id")
         lesson_id_uuid = section.get("lesson_id")
@@ -336,11 +343,13 @@ def update_lesson_sections_with_audio_keys(level: int | None = None, stage: str
                 try:
                     sb.table("lesson_sections").update({"content_jsonb": content_jsonb}).eq("id", section_id).execute()
                     updated_count += 1
+                    updated_lesson_ids.add(lesson_id_uuid)
                     print(f"Updated section {section_id} for lesson {lesson_external_id} ({section_type})")
                 except Exception as e:
                     print(f"Error updating section {section_id}: {e}")
 
     print(f"Updated {updated_count} lesson sections with audio_key values")
+    return updated_lesson_ids
 
 # ─── 6. Main ───────────────────────────────────────────────────────────────
 def main() -> None:
@@ -523,7 +532,18 @@ def main() -> None:
         print("Nothing to do.")
     else:
         # After upserting audio snippets, update content_jsonb in lesson_sections
-        update_lesson_sections_with_audio_keys(level=args.level, stage=stage_filter)
+        updated_lesson_ids = update_lesson_sections_with_audio_keys(level=args.level, stage=stage_filter)
+        # Resolved lessons embed snippet audio keys, so their snapshots are rebuilt
+        # before workers are told to drop them.
+        lesson_external_ids = sorted({row["lesson_external_id"] for row in audio_snippets_rows})
+        updated_lesson_ids.update(lesson_ids_for_external_ids(lesson_external_ids))
+        if updated_lesson_ids:
+            print(f"\nRecompiling {len(updated_lesson_ids)} lesson snapshots …")
+            failed = recompile_lessons(sorted(updated_lesson_ids))
+            for lesson_id in failed:
+                print(f"  still serving the previous snapshot: {lesson_id} (run compile_lessons)")
+        if lesson_external_ids:
+            bump_content_versions(AUDIO_SNIPPETS_SCOPE, lesson_external_ids)
 
 if __name__ == "__main__":
     main()
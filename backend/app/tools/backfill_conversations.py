@@ -12,6 +12,7 @@ import re
 import argparse
 from pathlib import PurePosixPath
 from app.config import Config
+from app.resolver import recompile_lessons
 from supabase import create_client
 
 # ── 1.  CONNECT ────────────────────────────────────────────────────────────
@@ -72,6 +73,7 @@ def find_and_update_for_scan_path(scan_path: str, dry_run: bool = False):
         return
 
     updated = skipped = missing = 0
+    updated_lesson_ids = set()
 
     for obj in all_objects:
         key = obj["name"]  # full bucket path like: Beginner/L2/Conversations/2.3_conversation.mp3
@@ -161,12 +163,18 @@ def find_and_update_for_scan_path(scan_path: str, dry_run: bool = False):
             supabase.table("lessons").update({col: key}).eq("id", lesson_data["id"]).execute()
             print(f"OK    Updated lesson {lesson_data['id']} [{col}]: {key}")
             updated += 1
+            updated_lesson_ids.add(lesson_data["id"])
         except Exception as e:
             print(f"ERROR  failed to update lesson: {e}")
             missing += 1
             continue
 
     print(f"\nDONE  updated={updated}  skipped={skipped}  missing={missing}")
+    if updated_lesson_ids:
+        # Resolved lessons embed conversation_audio_url, so rebuild their snapshots.
+        failed = recompile_lessons(sorted(updated_lesson_ids))
+        for lesson_id in failed:
+            print(f"ERROR  lesson {lesson_id} still serves its previous snapshot; run compile_lessons")
 
 # ── 4.  MAIN ───────────────────────────────────────────────────────────────
 def main():
@@ -19,6 +19,9 @@ Run:
 import os, sys
 from supabase import create_client, Client
 
+from app.content_versions import GLOBAL_IMAGES_SCOPE, bump_content_versions
+from app.resolver import recompile_lessons
+
 # ─── 1. Config ─────────────────────────────────────────────────────────────
 SUPABASE_URL  = os.getenv("SUPABASE_URL")
 SERVICE_ROLE  = os.getenv("SUPABASE_KEY")
@@ -127,6 +130,22 @@ def main() -> None:
         print(f"✅ Success – {len(res.data)} rows upserted/updated.")
     except Exception as e:
         print(f"ERROR: Failed to upsert lesson images: {e}")
+        return
+
+    # Resolved lessons embed image URLs. A global image can appear in any lesson,
+    # so a run that touched one rebuilds every snapshot.
+    has_global_images = any(row["lesson_id"] is None for row in rows)
+    if has_global_images:
+        lessons = sb.table("lessons").select("id").execute()
+        lesson_ids = [row["id"] for row in (lessons.data or []) if row.get("id")]
+    else:
+        lesson_ids = sorted({row["lesson_id"] for row in rows})
+    print(f"Recompiling {len(lesson_ids)} lesson snapshots …")
+    failed = recompile_lessons(lesson_ids)
+    for lesson_id in failed:
+        print(f"  still serving the previous snapshot: {lesson_id} (run compile_lessons)")
+    if has_global_images:
+        bump_content_versions(GLOBAL_IMAGES_SCOPE)
 
 
 if __name__ == "__main__":
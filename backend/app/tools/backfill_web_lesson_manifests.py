@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Backfill lessons.web_unit_manifest and lessons.web_total_units using the web
+lesson expectation builder.
+
+Usage:
+  python -m app.tools.backfill_web_lesson_manifests
+  python -m app.tools.backfill_web_lesson_manifests --lesson-id <uuid>
+  python -m app.tools.backfill_web_lesson_manifests --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from app.content_versions import LESSON_SCOPE, bump_content_versions
+from app.supabase_client import supabase
+from app.web_lesson_progress import refresh_web_unit_manifests_for_lessons
+
+
+def _fetch_lesson_ids(target_lesson_ids=None):
+    if target_lesson_ids:
+        return [lesson_id for lesson_id in target_lesson_ids if lesson_id]
+
+    result = (
+        supabase.table("lessons")
+        .select("id")
+        .order("stage", desc=False)
+        .order("level", desc=False)
+        .order("lesson_order", desc=False)
+        .execute()
+    )
+    return [row.get("id") for row in (result.data or []) if row.get("id")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill lessons.web_unit_manifest.")
+    parser.add_argument("--lesson-id", action="append", dest="lesson_ids", help="Specific lesson id to backfill. Repeatable.")
+    parser.add_argument("--dry-run", action="store_true", help="Compute manifests without writing them.")
+    args = parser.parse_args()
+
+    lesson_ids = _fetch_lesson_ids(args.lesson_ids)
+    if not lesson_ids:
+        print("[INFO] No lessons found.")
+        return
+
+    manifests_by_lesson = refresh_web_unit_manifests_for_lessons(
+        lesson_ids,
+        persist=not args.dry_run,
+    )
+
+    print(f"[INFO] Computed web_unit_manifest for {len(manifests_by_lesson)} lessons.")
+    if not args.dry_run:
+        bump_content_versions(LESSON_SCOPE, lesson_ids)
+    for lesson_id in lesson_ids[:10]:
+        manifest = manifests_by_lesson.get(lesson_id) or {}
+        print(f"  {lesson_id}: {len(manifest.get('all_visible_unit_keys') or [])} units")
+    if len(lesson_ids) > 10:
+        print(f"  ... {len(lesson_ids) - 10} more lessons omitted.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Compare local JWT verification with the GoTrue auth.get_user round trip.
+
+Usage:
+  python -m app.tools.benchmark_auth --token <access_token>
+  SUPABASE_ACCESS_TOKEN=<access_token> python -m app.tools.benchmark_auth --iterations 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+
+from app.auth import verify_access_token_locally
+from app.supabase_client import supabase
+
+
+def _time_calls(fn, token, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(token)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _summary(label, timings):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"  {label:<6} p50={statistics.median(ordered):.3f}ms "
+        f"p95={p95:.3f}ms max={ordered[-1]:.3f}ms n={len(ordered)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark access token verification.")
+    parser.add_argument("--token", default=os.getenv("SUPABASE_ACCESS_TOKEN"), help="A live Supabase access token.")
+    parser.add_argument("--iterations", type=int, default=20, help="Calls per strategy.")
+    args = parser.parse_args()
+
+    if not args.token:
+        print("[ERROR] Pass --token or set SUPABASE_ACCESS_TOKEN.")
+        return
+
+    # The first local call may fetch the JWKS; keep it out of the steady-state numbers.
+    claims = verify_access_token_locally(args.token)
+    print(f"[INFO] Token for sub={claims.get('sub')} verified locally.")
+
+    local = _time_calls(verify_access_token_locally, args.token, args.iterations)
+    remote = _time_calls(supabase.auth.get_user, args.token, args.iterations)
+
+    print("[INFO] Verification latency:")
+    _summary("local", local)
+    _summary("remote", remote)
+    print(f"[INFO] Local is {statistics.median(remote) / max(statistics.median(local), 1e-6):.0f}x faster at p50.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Rebuild the compiled_lessons snapshots served by the lesson resolver.
+
+The import and backfill tools recompile the lessons they change. Run this
+after editing content any other way, or to retry lessons that failed there.
+
+Usage:
+  python -m app.tools.compile_lessons
+  python -m app.tools.compile_lessons --lesson-id <uuid> --lang th
+  python -m app.tools.compile_lessons --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from app.content_versions import LESSON_SCOPE, bump_content_versions
+from app.resolver import COMPILED_LESSON_LANGS, compile_lesson_snapshots
+from app.supabase_client import supabase
+
+
+def _fetch_lesson_ids(target_lesson_ids=None):
+    if target_lesson_ids:
+        return [lesson_id for lesson_id in target_lesson_ids if lesson_id]
+
+    result = (
+        supabase.table("lessons")
+        .select("id")
+        .order("stage", desc=False)
+        .order("level", desc=False)
+        .order("lesson_order", desc=False)
+        .execute()
+    )
+    return [row.get("id") for row in (result.data or []) if row.get("id")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile resolved lesson snapshots.")
+    parser.add_argument("--lesson-id", action="append", dest="lesson_ids", help="Specific lesson id to compile. Repeatable.")
+    parser.add_argument("--lang", action="append", dest="langs", choices=COMPILED_LESSON_LANGS, help="Language to compile. Repeatable; defaults to all.")
+    parser.add_argument("--dry-run", action="store_true", help="Resolve lessons without writing snapshots.")
+    args = parser.parse_args()
+
+    lesson_ids = _fetch_lesson_ids(args.lesson_ids)
+    if not lesson_ids:
+        print("[INFO] No lessons found.")
+        return
+
+    failed = []
+    for lesson_id in lesson_ids:
+        try:
+            compile_lesson_snapshots(
+                [lesson_id],
+                langs=args.langs or COMPILED_LESSON_LANGS,
+                persist=not args.dry_run,
+            )
+        except Exception as e:
+            print(f"[WARN] Could not compile {lesson_id}: {e}")
+            failed.append(lesson_id)
+
+    print(f"[INFO] Compiled {len(lesson_ids) - len(failed)} of {len(lesson_ids)} lessons.")
+    if not args.dry_run:
+        bump_content_versions(LESSON_SCOPE, [lesson_id for lesson_id in lesson_ids if lesson_id not in failed])
+    for lesson_id in failed[:10]:
+        print(f"  failed: {lesson_id}")
+
+
+if __name__ == "__main__":
+    main()
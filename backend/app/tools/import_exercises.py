@@ -19,6 +19,7 @@ from collections import defaultdict
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Tuple
 
+from app.content_versions import EXERCISE_BANK_SCOPE, bump_content_versions
 from app.supabase_client import supabase
 
 
@@ -370,6 +371,8 @@ def import_exercises_from_file(path: Path, lang: str = "en", dry_run: bool = Fal
             return True
 
         _update_rows_th(updates, dry_run=dry_run)
+        if not dry_run:
+            bump_content_versions(EXERCISE_BANK_SCOPE)
         return True
 
     # English path
@@ -386,6 +389,8 @@ def import_exercises_from_file(path: Path, lang: str = "en", dry_run: bool = Fal
 
     _delete_existing(rows, dry_run=dry_run)
     _insert_rows(rows, dry_run=dry_run)
+    if not dry_run:
+        bump_content_versions(EXERCISE_BANK_SCOPE)
     return True
 
 
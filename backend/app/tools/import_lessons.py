@@ -20,6 +20,9 @@ import time
 import httpx
 from postgrest.exceptions import APIError
 from app.app_lesson_progress import refresh_app_total_units_for_lessons
+from app.content_versions import LESSON_SCOPE, bump_content_versions
+from app.resolver import recompile_lessons
+from app.web_lesson_progress import refresh_web_unit_manifests_for_lessons
 from app.supabase_client import supabase
 
 
@@ -723,8 +726,13 @@ def upsert_sections(lesson_id, sections, lang="en", dry_run=False):
 
 
 def upsert_phrases(lesson_id, sections, lang="en", dry_run=False):
+    """Upsert and link this lesson's phrases; returns ids of existing phrases it updated.
+
+    Phrases are shared, so other lessons linked to those ids changed too.
+    """
     saw_phrases_section = False
     desired_phrase_ids = []
+    updated_phrase_ids = set()
     for sec in sections:
         if sec.get("type") != "phrases_verbs":
             continue
@@ -779,6 +787,7 @@ def upsert_phrases(lesson_id, sections, lang="en", dry_run=False):
                             print("[DRY RUN] Update phrases(id=%s): %r" % (row["id"], updates))
                         else:
                             supabase.table("phrases").update(updates).eq("id", row["id"]).execute()
+                            updated_phrase_ids.add(row["id"])
                     phrase_id = row["id"]
                 else:
                     insert_payload = {"phrase": _normalize_phrase(phrase_raw), "variant": variant}
@@ -855,6 +864,20 @@ def upsert_phrases(lesson_id, sections, lang="en", dry_run=False):
                 q.execute()
             except Exception as e:
                 print(f"[WARN] Could not prune stale phrases for lesson {lesson_id}: {e}")
+    return updated_phrase_ids
+
+
+def _lesson_ids_linked_to_phrases(phrase_ids):
+    phrase_ids = sorted(phrase_id for phrase_id in (phrase_ids or []) if phrase_id)
+    if not phrase_ids:
+        return []
+    result = (
+        supabase.table("lesson_phrases")
+        .select("lesson_id")
+        .in_("phrase_id", phrase_ids)
+        .execute()
+    )
+    return sorted({row["lesson_id"] for row in (result.data or []) if row.get("lesson_id")})
 
 
 def upsert_common_mistakes(lesson_id, lesson_external_id, sections, lang="en", dry_run=False):
@@ -1028,14 +1051,32 @@ def process_lesson(data, lang="en", dry_run=False):
         lang=lang,
         dry_run=dry_run,
     )
-    upsert_phrases(lesson_id, data.get("sections", []), lang=lang, dry_run=dry_run)
+    updated_phrase_ids = upsert_phrases(lesson_id, data.get("sections", []), lang=lang, dry_run=dry_run)
     upsert_practice_exercises(lesson_id, data.get("practice_exercises", []), lang=lang, dry_run=dry_run)
     upsert_tags(lesson_id, data.get("tags", []), dry_run=dry_run)
     pinned_comment = data.get("pinned_comment")
     if pinned_comment:
         upsert_pinned_comment(lesson_id, pinned_comment, lang=lang, dry_run=dry_run)
-    if lang == "en" and not dry_run:
-        refresh_app_total_units_for_lessons([lesson_id], persist=True)
+    if dry_run:
+        return
+    # Lessons that link a phrase this import updated embed the new content too.
+    try:
+        linked_lesson_ids = _lesson_ids_linked_to_phrases(updated_phrase_ids)
+    except Exception as e:
+        print(f"[WARN] Could not look up lessons sharing updated phrases: {e}")
+        linked_lesson_ids = []
+    lesson_ids = [lesson_id] + [linked for linked in linked_lesson_ids if linked != lesson_id]
+    if len(lesson_ids) > 1:
+        print(f"[INFO] Phrases shared with {len(lesson_ids) - 1} other lessons; recompiling them too.")
+    if lang == "en":
+        refresh_app_total_units_for_lessons(lesson_ids, persist=True)
+    # Quick-practice detection and phrase visibility read TH columns too.
+    refresh_web_unit_manifests_for_lessons(lesson_ids, persist=True)
+    # Both languages merge EN and TH rows, so either import changes both snapshots.
+    failed = recompile_lessons(lesson_ids)
+    if failed:
+        # Manifests and totals changed even where the snapshot did not compile.
+        bump_content_versions(LESSON_SCOPE, failed)
 
 
 def import_lessons_from_folder(folder_path, lang="en", dry_run=False):
@@ -23,6 +23,7 @@ import os
 import json
 import argparse
 import glob
+from app.content_versions import TOPIC_SCOPE, bump_content_versions
 from app.supabase_client import supabase
 
 
@@ -231,6 +232,7 @@ def upsert_topic(data, lang="en", dry_run=False):
             if result.data:
                 topic_id = result.data[0].get("id")
                 print(f"[SUCCESS] Upserted topic (EN): {record['name']} (id: {topic_id}, slug: {record['slug']})")
+                bump_content_versions(TOPIC_SCOPE, [slug])
                 return True
             else:
                 print(f"[ERROR] EN upsert returned no data for: {record['name']}")
@@ -285,6 +287,7 @@ def upsert_topic(data, lang="en", dry_run=False):
             return False
 
         print(f"[SUCCESS] Updated topic (TH): {th_update['name_th']} (slug: {slug})")
+        bump_content_versions(TOPIC_SCOPE, [slug])
         return True
 
     except Exception as e:
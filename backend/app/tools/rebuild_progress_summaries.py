@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Rebuild user_lesson_progress_summaries from the unit progress tables, or check
+the stored summaries against a live recomputation.
+
+Usage:
+  python -m app.tools.rebuild_progress_summaries
+  python -m app.tools.rebuild_progress_summaries --user-id <uuid>
+  python -m app.tools.rebuild_progress_summaries --check
+  python -m app.tools.rebuild_progress_summaries --check --user-id <uuid>
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app.progress_summaries import (
+    app_summaries_from_rows,
+    compute_app_summaries_live,
+    compute_web_summaries_live,
+    fetch_progress_summary_rows,
+    web_summaries_from_rows,
+)
+from app.supabase_client import supabase
+
+PAGE_SIZE = 1000
+# Lesson ids travel in the query string, so check them in batches.
+LESSON_BATCH_SIZE = 100
+WEB_COMPARED_FIELDS = ("has_started", "is_completed", "completed_units", "total_units")
+APP_COMPARED_FIELDS = ("has_started", "is_completed", "completed_units", "total_units", "resume")
+
+
+def _fetch_user_ids(target_user_ids=None, limit=None):
+    if target_user_ids:
+        return [user_id for user_id in target_user_ids if user_id]
+
+    user_ids = []
+    seen = set()
+    for table in ("user_lesson_progress", "user_lesson_unit_progress"):
+        offset = 0
+        while True:
+            result = (
+                supabase.table(table)
+                .select("user_id")
+                .order("user_id", desc=False)
+                .range(offset, offset + PAGE_SIZE - 1)
+                .execute()
+            )
+            rows = result.data or []
+            for row in rows:
+                user_id = row.get("user_id")
+                if user_id and user_id not in seen:
+                    seen.add(user_id)
+                    user_ids.append(user_id)
+            if len(rows) < PAGE_SIZE:
+                break
+            offset += PAGE_SIZE
+    return user_ids[:limit] if limit else user_ids
+
+
+def _fetch_lesson_ids():
+    result = supabase.table("lessons").select("id").execute()
+    return [row.get("id") for row in (result.data or []) if row.get("id")]
+
+
+def _diff(kind, user_id, lesson_id, stored, live, fields):
+    mismatches = []
+    for field in fields:
+        if stored.get(field) != live.get(field):
+            mismatches.append(
+                f"  {kind} user={user_id} lesson={lesson_id} {field}: "
+                f"stored={stored.get(field)!r} live={live.get(field)!r}"
+            )
+    return mismatches
+
+
+def _check_batch(user_id, lesson_ids):
+    rows = fetch_progress_summary_rows(user_id, lesson_ids)
+    if rows is None:
+        raise RuntimeError("user_lesson_progress_summaries is not readable")
+
+    # Build the stored side the way the routes do: lessons without a row report
+    # their real totals and rows that are not ready yet are computed live.
+    web_stored = web_summaries_from_rows(user_id, lesson_ids, rows)
+    app_stored = app_summaries_from_rows(user_id, lesson_ids, rows)
+    web_live = compute_web_summaries_live(user_id, lesson_ids)
+    app_live = compute_app_summaries_live(user_id, lesson_ids)
+    mismatches = []
+    for lesson_id in lesson_ids:
+        mismatches.extend(_diff(
+            "web", user_id, lesson_id,
+            web_stored.get(lesson_id) or {},
+            web_live.get(lesson_id) or {},
+            WEB_COMPARED_FIELDS,
+        ))
+        mismatches.extend(_diff(
+            "app", user_id, lesson_id,
+            app_stored.get(lesson_id) or {},
+            app_live.get(lesson_id) or {},
+            APP_COMPARED_FIELDS,
+        ))
+    return mismatches
+
+
+def check_user(user_id, lesson_ids):
+    mismatches = []
+    for start in range(0, len(lesson_ids), LESSON_BATCH_SIZE):
+        mismatches.extend(_check_batch(user_id, lesson_ids[start:start + LESSON_BATCH_SIZE]))
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild or check user_lesson_progress_summaries.")
+    parser.add_argument("--user-id", action="append", dest="user_ids", help="Specific user id. Repeatable.")
+    parser.add_argument("--check", action="store_true", help="Compare stored summaries with a live recomputation instead of rebuilding.")
+    parser.add_argument("--limit", type=int, help="Only check the first N users.")
+    args = parser.parse_args()
+
+    if not args.check:
+        targets = args.user_ids or [None]
+        for user_id in targets:
+            result = supabase.rpc(
+                "rebuild_user_lesson_progress_summaries",
+                {"p_user_id": user_id},
+            ).execute()
+            label = user_id or "all users"
+            print(f"[INFO] Rebuilt {result.data} progress summaries for {label}.")
+        return
+
+    user_ids = _fetch_user_ids(args.user_ids, args.limit)
+    if not user_ids:
+        print("[INFO] No users with lesson progress found.")
+        return
+
+    lesson_ids = _fetch_lesson_ids()
+    mismatched_users = 0
+    for user_id in user_ids:
+        mismatches = check_user(user_id, lesson_ids)
+        if mismatches:
+            mismatched_users += 1
+            print(f"[WARN] {len(mismatches)} mismatches for user {user_id}:")
+            for line in mismatches[:20]:
+                print(line)
+
+    print(f"[INFO] Checked {len(user_ids)} users across {len(lesson_ids)} lessons; {mismatched_users} with mismatches.")
+    if mismatched_users:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
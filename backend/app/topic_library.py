@@ -0,0 +1,107 @@
+# app/topic_library.py
+import json
+import time
+
+from app.cache import TTLCache
+from app.content_versions import TOPIC_SCOPE, content_cache_ttl, register_invalidator
+from app.lesson_cache import content_hash_for
+from app.supabase_client import supabase
+
+TOPIC_CACHE_TTL_SECONDS = content_cache_ttl(5 * 60)
+# Index rows only need to know whether a Thai body exists (it decides which
+# name and subtitle to show), so take its first node instead of the whole blob.
+TOPIC_INDEX_SELECT = (
+    "id, idx, slug, name, name_th, subtitle, subtitle_th, tags, is_featured, "
+    "created_at, updated_at, content_jsonb_th_head:content_jsonb_th->0"
+)
+TOPIC_INDEX_FIELDS = ("id", "name", "subtitle", "slug", "tags", "is_featured")
+
+# Values are ``(body, etag)`` tuples of pre-encoded JSON.
+_topic_index_cache = TTLCache("topic_index", ttl_seconds=TOPIC_CACHE_TTL_SECONDS)
+_topic_body_cache = TTLCache("topic_bodies", ttl_seconds=TOPIC_CACHE_TTL_SECONDS, max_entries=1024)
+
+
+def _encode(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _with_etag(body):
+    return body, content_hash_for(body)
+
+
+def localize_topic(topic, lang, has_th_content):
+    if lang == "th" and has_th_content:
+        content_jsonb = topic.get("content_jsonb_th")
+        name = topic.get("name_th") or topic["name"]
+        subtitle = topic.get("subtitle_th") or topic.get("subtitle")
+    else:
+        content_jsonb = topic.get("content_jsonb")
+        name = topic["name"]
+        subtitle = topic.get("subtitle")
+
+    return {
+        "id": topic["id"],
+        "name": name,
+        "subtitle": subtitle,
+        "slug": topic["slug"],
+        "tags": topic.get("tags", []),
+        "is_featured": bool(topic.get("is_featured")),
+        "content_jsonb": content_jsonb,
+        "created_at": topic.get("created_at"),
+        "updated_at": topic.get("updated_at"),
+    }
+
+
+def get_topic_index_payload(lang):
+    """Return ``(body, etag)`` for the topic list without article bodies."""
+    payload, _ = _topic_index_cache.get_or_load(lang, lambda: _load_topic_index(lang))
+    return payload
+
+
+def _load_topic_index(lang):
+    query_start = time.perf_counter()
+    result = supabase.table("topic_library").select(TOPIC_INDEX_SELECT).order("idx", desc=False).execute()
+    topics = []
+    for topic in result.data or []:
+        localized = localize_topic(topic, lang, topic.get("content_jsonb_th_head") is not None)
+        topics.append({field: localized[field] for field in TOPIC_INDEX_FIELDS})
+    print(
+        f"[topic-library] index lang={lang} topics={len(topics)} "
+        f"query_ms={int((time.perf_counter() - query_start) * 1000)}",
+        flush=True,
+    )
+    return _with_etag(_encode({"topics": topics}))
+
+
+def get_topic_payload(slug, lang):
+    """Return ``(body, etag)`` for one localized topic, or None if the slug is unknown."""
+    cached = _topic_body_cache.get((slug, lang))
+    if cached is not None:
+        return cached
+
+    result = supabase.table("topic_library").select("*").eq("slug", slug).execute()
+    if not result.data:
+        return None
+    topic = result.data[0]
+    response_topic = localize_topic(topic, lang, bool(topic.get("content_jsonb_th")))
+    payload = _with_etag(_encode({"topic": response_topic}))
+    _topic_body_cache.set((slug, lang), payload)
+    return payload
+
+
+def invalidate_topic_cache():
+    _topic_index_cache.clear()
+    _topic_body_cache.clear()
+
+
+def _invalidate_topics(slugs):
+    if not slugs:
+        invalidate_topic_cache()
+        return
+    slugs = set(slugs)
+    # Names and subtitles appear in the index too.
+    _topic_index_cache.clear()
+    _topic_body_cache.invalidate([key for key in _topic_body_cache.keys() if key[0] in slugs])
+
+
+register_invalidator(TOPIC_SCOPE, _invalidate_topics)
@@ -0,0 +1,68 @@
+# app/warmup.py
+import threading
+import time
+from concurrent.futures import as_completed
+
+from app.config import Config
+from app.resolver import COMPILED_LESSON_LANGS, _get_cached_global_images, resolve_lesson_payload
+from app.pathway_lessons import get_cached_pathway_lessons
+from app.routes import PUBLIC_TRY_LESSON_IDS, _build_try_audio_payload
+from app.supabase_client import submit_supabase_call
+
+
+def _elapsed_ms(start):
+    return int((time.perf_counter() - start) * 1000)
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return _elapsed_ms(start)
+
+
+def _warmup_tasks():
+    tasks = {
+        "pathway_lessons": (get_cached_pathway_lessons,),
+        "global_images": (_get_cached_global_images,),
+    }
+    for lesson_id in PUBLIC_TRY_LESSON_IDS:
+        for lang in COMPILED_LESSON_LANGS:
+            tasks[f"try_lesson:{lesson_id}:{lang}"] = (resolve_lesson_payload, lesson_id, lang)
+        tasks[f"try_audio:{lesson_id}"] = (_build_try_audio_payload, lesson_id)
+    return tasks
+
+
+def warm_caches():
+    """Prefetch the datasets every cold worker needs first; returns per-task timings."""
+    start = time.perf_counter()
+    tasks = _warmup_tasks()
+    futures = {
+        submit_supabase_call(_timed, *task): name
+        for name, task in tasks.items()
+    }
+    timings = {}
+    failed = 0
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            timings[name] = future.result()
+        except Exception as e:
+            failed += 1
+            print(f"[warmup] task failed name={name}: {e}", flush=True)
+
+    slowest = max(timings.items(), key=lambda item: item[1]) if timings else (None, 0)
+    print(
+        f"[warmup] done tasks={len(tasks)} failed={failed} total_ms={_elapsed_ms(start)} "
+        f"slowest={slowest[0]} slowest_ms={slowest[1]}",
+        flush=True,
+    )
+    return timings
+
+
+def start_cache_warmup():
+    if not Config.CACHE_WARMUP_ENABLED:
+        return None
+    # Run beside the worker so boot and the first requests are never blocked on it.
+    thread = threading.Thread(target=warm_caches, name="cache-warmup", daemon=True)
+    thread.start()
+    return thread
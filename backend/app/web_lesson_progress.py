@@ -0,0 +1,391 @@
+import time
+from collections import defaultdict
+
+from app.app_lesson_progress import (
+    PHRASE_CONTENT_PRESENCE_SELECT,
+    _execute_with_retry,
+    fetch_lesson_content_counts,
+    timed_query,
+    format_query_timings,
+    phrase_has_content,
+    run_source_queries,
+)
+from app.cache import TTLCache
+from app.content_versions import LESSON_SCOPE, content_cache_ttl, register_invalidator
+from app.supabase_client import supabase
+
+WEB_SECTION_ORDER = [
+    "prepare",
+    "comprehension",
+    "transcript",
+    "apply",
+    "understand",
+    "extra_tip",
+    "common_mistake",
+    "phrases_verbs",
+    "culture_note",
+    "practice",
+]
+WEB_MANIFEST_KEYS = (
+    "section_unit_keys",
+    "exercise_unit_keys",
+    "comprehension_unit_keys",
+    "all_visible_unit_keys",
+)
+WEB_EXPECTATIONS_TTL_SECONDS = content_cache_ttl(900)
+_web_expectations_cache = TTLCache(
+    "web_expectations",
+    ttl_seconds=WEB_EXPECTATIONS_TTL_SECONDS,
+    copy_values=True,
+)
+
+
+def _elapsed_ms(start):
+    return int((time.perf_counter() - start) * 1000)
+
+
+def _empty_web_expectation():
+    return {key: [] for key in WEB_MANIFEST_KEYS}
+
+
+def _build_section_unit_key(raw_id):
+    return f"section:{raw_id}"
+
+
+def _build_exercise_unit_key(raw_id):
+    return f"exercise:{raw_id}"
+
+
+def _get_cached_web_expectation(lesson_id):
+    return _web_expectations_cache.get(lesson_id)
+
+
+def _set_cached_web_expectation(lesson_id, expectation):
+    _web_expectations_cache.set(lesson_id, expectation)
+
+
+register_invalidator(LESSON_SCOPE, _web_expectations_cache.invalidate)
+
+
+def build_web_lesson_expectations_for_many(lesson_ids):
+    lesson_ids = [lesson_id for lesson_id in lesson_ids if lesson_id]
+    if not lesson_ids:
+        return {}
+
+    build_start = time.perf_counter()
+    expectations = {}
+    uncached_lesson_ids = []
+    for lesson_id in lesson_ids:
+        cached = _get_cached_web_expectation(lesson_id)
+        if cached is not None:
+            expectations[lesson_id] = cached
+        else:
+            uncached_lesson_ids.append(lesson_id)
+
+    if not uncached_lesson_ids:
+        return expectations
+
+    query_start = time.perf_counter()
+    results, timings = run_source_queries({
+        "sections": (
+            lambda: (
+                supabase.table("lesson_sections")
+                .select("lesson_id, id, type, sort_order")
+                .in_("lesson_id", uncached_lesson_ids)
+                .order("sort_order", desc=False)
+            ),
+            "lesson_sections progress expectations",
+        ),
+        "content_counts": lambda: fetch_lesson_content_counts(uncached_lesson_ids),
+        "exercises": (
+            lambda: (
+                supabase.table("practice_exercises")
+                .select("lesson_id, id, title, title_th, sort_order")
+                .in_("lesson_id", uncached_lesson_ids)
+                .order("sort_order", desc=False)
+            ),
+            "practice_exercises progress expectations",
+        ),
+        "lesson_phrases": (
+            lambda: (
+                supabase.table("lesson_phrases")
+                .select("lesson_id, phrase_id")
+                .in_("lesson_id", uncached_lesson_ids)
+            ),
+            "lesson_phrases progress expectations",
+        ),
+    })
+    sections_result = results["sections"]
+    content_counts = results["content_counts"]
+    exercises_result = results["exercises"]
+    lesson_phrases_result = results["lesson_phrases"]
+
+    lesson_phrase_links = lesson_phrases_result.data or []
+    phrase_ids = sorted({
+        row.get("phrase_id")
+        for row in lesson_phrase_links
+        if row.get("phrase_id")
+    })
+    phrases_by_id = {}
+    if phrase_ids:
+        phrases_result, timings["phrases"] = timed_query(
+            lambda: (
+                supabase.table("phrases")
+                .select(PHRASE_CONTENT_PRESENCE_SELECT)
+                .in_("id", phrase_ids)
+            ),
+            "phrases progress expectations",
+        )
+        phrases_by_id = {
+            phrase.get("id"): phrase
+            for phrase in (phrases_result.data or [])
+            if phrase.get("id")
+        }
+    query_ms = _elapsed_ms(query_start)
+
+    sections_by_lesson = defaultdict(list)
+    for row in sections_result.data or []:
+        sections_by_lesson[row.get("lesson_id")].append(row)
+
+    transcript_counts = {
+        lesson_id: counts["transcript"] for lesson_id, counts in content_counts.items()
+    }
+    comprehension_counts = {
+        lesson_id: counts["questions"] for lesson_id, counts in content_counts.items()
+    }
+
+    exercises_by_lesson = defaultdict(list)
+    for row in exercises_result.data or []:
+        exercises_by_lesson[row.get("lesson_id")].append(row)
+
+    has_phrase_content = defaultdict(bool)
+    for link in lesson_phrase_links:
+        lesson_id = link.get("lesson_id")
+        phrase = phrases_by_id.get(link.get("phrase_id")) or {}
+        if phrase_has_content(phrase):
+            has_phrase_content[lesson_id] = True
+
+    expectations = {}
+    for lesson_id in uncached_lesson_ids:
+        lesson_sections = sections_by_lesson.get(lesson_id, [])
+        section_by_type = {}
+        allow_inline_quick = False
+        for section in lesson_sections:
+            section_type = (section.get("type") or "").lower()
+            if section_type and section_type not in section_by_type:
+                section_by_type[section_type] = section
+            if section_type in {"understand", "extra_tip"}:
+                allow_inline_quick = True
+
+        exercise_rows = exercises_by_lesson.get(lesson_id, [])
+        visible_exercise_keys = []
+        practice_exercise_keys = []
+        for exercise in exercise_rows:
+            title = (exercise.get("title") or "").strip().lower()
+            title_th = (exercise.get("title_th") or "").strip()
+            is_quick = title.startswith("quick practice") or "แบบฝึกหัด" in title_th
+            if is_quick and not allow_inline_quick:
+                continue
+            unit_key = _build_exercise_unit_key(exercise.get("id"))
+            visible_exercise_keys.append(unit_key)
+            practice_exercise_keys.append(unit_key)
+
+        visible_section_keys = []
+        for section_type in WEB_SECTION_ORDER:
+            if section_type == "prepare":
+                if section_by_type.get("prepare"):
+                    visible_section_keys.append(_build_section_unit_key("prepare"))
+                continue
+            if section_type == "comprehension":
+                if comprehension_counts.get(lesson_id, 0) > 0:
+                    visible_section_keys.append(_build_section_unit_key("comprehension"))
+                continue
+            if section_type == "transcript":
+                if transcript_counts.get(lesson_id, 0) > 0:
+                    visible_section_keys.append(_build_section_unit_key("transcript"))
+                continue
+            if section_type == "practice":
+                if visible_exercise_keys:
+                    visible_section_keys.append(_build_section_unit_key("practice"))
+                continue
+            if section_type == "phrases_verbs":
+                if has_phrase_content.get(lesson_id):
+                    visible_section_keys.append(_build_section_unit_key("phrases_verbs"))
+                continue
+            section = section_by_type.get(section_type)
+            if section and section.get("id"):
+                visible_section_keys.append(_build_section_unit_key(section.get("id")))
+
+        comprehension_unit_keys = []
+        if comprehension_counts.get(lesson_id, 0) > 0:
+            comprehension_unit_keys.append(_build_exercise_unit_key("comprehension_quiz"))
+
+        all_visible_unit_keys = [
+            *visible_section_keys,
+            *visible_exercise_keys,
+            *comprehension_unit_keys,
+        ]
+
+        expectation = {
+            "section_unit_keys": visible_section_keys,
+            "exercise_unit_keys": visible_exercise_keys,
+            "comprehension_unit_keys": comprehension_unit_keys,
+            "all_visible_unit_keys": all_visible_unit_keys,
+        }
+        _set_cached_web_expectation(lesson_id, expectation)
+        expectations[lesson_id] = expectation
+
+    total_ms = _elapsed_ms(build_start)
+    print(
+        f"[progress:web-expectations] requested={len(lesson_ids)} uncached={len(uncached_lesson_ids)} "
+        f"cached={len(lesson_ids) - len(uncached_lesson_ids)} query_ms={query_ms} "
+        f"{format_query_timings(timings)} total_ms={total_ms}",
+        flush=True,
+    )
+
+    return expectations
+
+
+def summarize_web_lesson_progress(lesson_ids, progress_rows, unit_rows, expectations_by_lesson):
+    progress_by_lesson = {
+        row.get("lesson_id"): row
+        for row in (progress_rows or [])
+        if row.get("lesson_id")
+    }
+    seen_units_by_lesson = defaultdict(set)
+    completed_units_by_lesson = defaultdict(set)
+    for row in unit_rows or []:
+        lesson_id = row.get("lesson_id")
+        unit_key = row.get("unit_key")
+        if lesson_id and unit_key:
+            seen_units_by_lesson[lesson_id].add(unit_key)
+        if row.get("is_completed") and lesson_id and unit_key:
+            completed_units_by_lesson[lesson_id].add(unit_key)
+
+    summaries = {}
+    for lesson_id in lesson_ids:
+        progress_row = progress_by_lesson.get(lesson_id) or {}
+        expected = expectations_by_lesson.get(lesson_id) or _empty_web_expectation()
+        completed_units = completed_units_by_lesson.get(lesson_id, set())
+        visible_units = expected["all_visible_unit_keys"]
+        total_units = len(visible_units)
+        completed_count = sum(1 for key in visible_units if key in completed_units)
+
+        practice_exercise_keys = expected["exercise_unit_keys"]
+        all_practice_exercises_completed = (
+            len(practice_exercise_keys) > 0
+            and all(key in completed_units for key in practice_exercise_keys)
+        )
+        manually_completed = bool(progress_row.get("is_completed"))
+        is_completed = manually_completed or all_practice_exercises_completed
+        has_started = bool(progress_row) or bool(seen_units_by_lesson.get(lesson_id)) or completed_count > 0
+        percent_complete = 100 if is_completed else (
+            round((completed_count / total_units) * 100) if total_units > 0 else 0
+        )
+
+        summaries[lesson_id] = {
+            "lesson_id": lesson_id,
+            "has_started": has_started,
+            "percent_complete": percent_complete,
+            "is_completed": is_completed,
+            "manually_completed": manually_completed,
+            "all_practice_exercises_completed": all_practice_exercises_completed,
+            "completed_units": completed_count,
+            "total_units": total_units,
+        }
+
+    return summaries
+
+
+def refresh_web_unit_manifests_for_lessons(lesson_ids, persist=False):
+    lesson_ids = [lesson_id for lesson_id in lesson_ids if lesson_id]
+    if not lesson_ids:
+        return {}
+
+    # Import-time refreshes must see the new rows, not this worker's cached manifest.
+    _web_expectations_cache.invalidate(lesson_ids)
+    expectations_by_lesson = build_web_lesson_expectations_for_many(lesson_ids)
+
+    if persist:
+        for lesson_id in lesson_ids:
+            manifest = expectations_by_lesson.get(lesson_id) or _empty_web_expectation()
+            _execute_with_retry(
+                lambda lesson_id=lesson_id, manifest=manifest: (
+                    supabase.table("lessons")
+                    .update({
+                        "web_unit_manifest": manifest,
+                        "web_total_units": len(manifest["all_visible_unit_keys"]),
+                    })
+                    .eq("id", lesson_id)
+                ),
+                f"persist web_unit_manifest for lesson {lesson_id}",
+            )
+
+    return expectations_by_lesson
+
+
+def _is_valid_web_manifest(manifest):
+    return isinstance(manifest, dict) and all(
+        isinstance(manifest.get(key), list) for key in WEB_MANIFEST_KEYS
+    )
+
+
+def fetch_web_lesson_expectations(lesson_ids, fallback=True, persist_fallback=False):
+    """Return web expectations from the worker cache, then the persisted manifests.
+
+    Lessons imported before manifests existed are built live when ``fallback``
+    is set, and written back when ``persist_fallback`` is set.
+    """
+    lesson_ids = [lesson_id for lesson_id in lesson_ids if lesson_id]
+    if not lesson_ids:
+        return {}
+
+    fetch_start = time.perf_counter()
+    expectations = {}
+    uncached_lesson_ids = []
+    for lesson_id in lesson_ids:
+        cached = _get_cached_web_expectation(lesson_id)
+        if cached is not None:
+            expectations[lesson_id] = cached
+        else:
+            uncached_lesson_ids.append(lesson_id)
+
+    missing_lesson_ids = []
+    if uncached_lesson_ids:
+        result = _execute_with_retry(
+            lambda: (
+                supabase.table("lessons")
+                .select("id, web_unit_manifest")
+                .in_("id", uncached_lesson_ids)
+            ),
+            "fetch lessons web_unit_manifest",
+        )
+        stored = {
+            row.get("id"): row.get("web_unit_manifest")
+            for row in (result.data or [])
+            if row.get("id")
+        }
+        for lesson_id in uncached_lesson_ids:
+            manifest = stored.get(lesson_id)
+            if _is_valid_web_manifest(manifest):
+                _set_cached_web_expectation(lesson_id, manifest)
+                expectations[lesson_id] = manifest
+            else:
+                missing_lesson_ids.append(lesson_id)
+
+    if missing_lesson_ids and fallback:
+        expectations.update(
+            refresh_web_unit_manifests_for_lessons(
+                missing_lesson_ids,
+                persist=persist_fallback,
+            )
+        )
+
+    print(
+        f"[progress:web-manifest] requested={len(lesson_ids)} "
+        f"cached={len(lesson_ids) - len(uncached_lesson_ids)} "
+        f"stored={len(uncached_lesson_ids) - len(missing_lesson_ids)} missing={len(missing_lesson_ids)} "
+        f"fallback={fallback} persist_fallback={persist_fallback} total_ms={_elapsed_ms(fetch_start)}",
+        flush=True,
+    )
+    return expectations
@@ -0,0 +1,11 @@
+import pytest
+
+from app.auth import clear_token_cache
+
+
+@pytest.fixture(autouse=True)
+def _isolate_token_cache():
+    # Verified tokens are cached per worker; tests reuse token strings with different fakes.
+    clear_token_cache()
+    yield
+    clear_token_cache()
@@ -0,0 +1,102 @@
+import time
+from importlib import import_module
+from types import SimpleNamespace
+
+import jwt
+import pytest
+
+auth_module = import_module("app.auth")
+
+SECRET = "test-jwt-secret-with-enough-bytes-for-hs256"
+
+
+def make_token(**overrides):
+    claims = {
+        "sub": "user-123",
+        "email": "pailin@example.com",
+        "aud": "authenticated",
+        "iss": f"{auth_module.Config.SUPABASE_URL.rstrip('/')}/auth/v1",
+        "exp": int(time.time()) + 300,
+        "role": "authenticated",
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, SECRET, algorithm="HS256")
+
+
+@pytest.fixture
+def remote_calls(monkeypatch):
+    calls = []
+
+    def fake_get_user(token):
+        calls.append(token)
+        return SimpleNamespace(user=SimpleNamespace(id="remote-user", email=None))
+
+    monkeypatch.setattr(auth_module, "supabase", SimpleNamespace(auth=SimpleNamespace(get_user=fake_get_user)))
+    monkeypatch.setattr(auth_module.Config, "AUTH_LOCAL_JWT_VERIFY", True)
+    monkeypatch.setattr(auth_module.Config, "SUPABASE_JWT_SECRET", SECRET)
+    return calls
+
+
+def test_valid_token_is_verified_without_remote_call(remote_calls):
+    user_response = auth_module.get_user_for_token(make_token())
+
+    assert user_response.user.id == "user-123"
+    assert user_response.user.email == "pailin@example.com"
+    assert remote_calls == []
+
+
+def test_expired_or_forged_tokens_are_rejected_locally(remote_calls):
+    expired = make_token(exp=int(time.time()) - 3600)
+    forged = jwt.encode(
+        jwt.decode(make_token(), options={"verify_signature": False}),
+        "another-secret-with-enough-bytes-for-hs256",
+        algorithm="HS256",
+    )
+
+    assert auth_module.get_user_for_token(expired).user is None
+    assert auth_module.get_user_for_token(forged).user is None
+    assert remote_calls == []
+
+
+def test_falls_back_to_remote_when_token_cannot_be_checked_locally(remote_calls, monkeypatch):
+    monkeypatch.setattr(auth_module.Config, "SUPABASE_JWT_SECRET", None)
+    token = make_token()
+
+    assert auth_module.get_user_for_token(token).user.id == "remote-user"
+    assert auth_module.get_user_for_token("not-a-jwt").user.id == "remote-user"
+    assert remote_calls == [token, "not-a-jwt"]
+
+
+def test_token_burst_verifies_once_and_caches_rejections(remote_calls, monkeypatch):
+    monkeypatch.setattr(auth_module.Config, "AUTH_LOCAL_JWT_VERIFY", False)
+
+    for _ in range(3):
+        assert auth_module.get_user_for_token("opaque-token").user.id == "remote-user"
+
+    def rejecting_get_user(token):
+        remote_calls.append(token)
+        raise auth_module.AuthApiError("invalid JWT", 401, None)
+
+    monkeypatch.setattr(
+        auth_module, "supabase", SimpleNamespace(auth=SimpleNamespace(get_user=rejecting_get_user))
+    )
+    assert auth_module.get_user_for_token("bad-token").user is None
+    assert auth_module.get_user_for_token("bad-token").user is None
+
+    assert remote_calls == ["opaque-token", "bad-token"]
+
+
+def test_token_cache_expires_with_jwt_and_evicts_least_recent(remote_calls, monkeypatch):
+    monkeypatch.setattr(auth_module.Config, "AUTH_TOKEN_CACHE_MAX_ENTRIES", 2)
+    exp = int(time.time()) + 5
+    short_lived = make_token(exp=exp)
+    auth_module.get_user_for_token(short_lived)
+
+    key = auth_module._token_key(short_lived)
+    assert auth_module._token_cache[key][1] == exp
+
+    auth_module.get_user_for_token(make_token(sub="user-2"))
+    auth_module.get_user_for_token(make_token(sub="user-3"))
+
+    assert key not in auth_module._token_cache
+    assert auth_module.get_auth_metrics()["token_cache_entries"] == 2
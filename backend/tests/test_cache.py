@@ -0,0 +1,116 @@
+import threading
+import time
+from importlib import import_module
+from types import SimpleNamespace
+
+from flask import Flask
+
+cache_module = import_module("app.cache")
+routes_module = import_module("app.routes")
+
+
+def test_entries_expire_and_are_evicted_by_count_and_bytes(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = cache_module.TTLCache("test_bounds", ttl_seconds=60, max_entries=2, max_bytes=10)
+
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.set("c", b"1234")
+    assert cache.keys() == ["a", "c"]
+    cache.set("d", b"12345678")
+    assert cache.keys() == ["d"]
+
+    now[0] += 61
+    assert cache.get("d") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"], stats["evictions"]) == (1, 1, 1, 3)
+
+
+def test_concurrent_misses_share_one_load():
+    cache = cache_module.TTLCache("test_single_flight", ttl_seconds=60, copy_values=True)
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def loader():
+        calls.append(1)
+        release.wait(timeout=5)
+        return {"rows": [1, 2]}
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load("key", loader)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + 5
+    while cache.stats()["coalesced"] < 3 and time.time() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert [value for value, _ in results] == [{"rows": [1, 2]}] * 4
+    assert cache.get_or_load("key", loader) == ({"rows": [1, 2]}, True)
+    results[0][0]["rows"].append(3)
+    assert cache.get("key") == {"rows": [1, 2]}
+
+
+def test_invalidation_during_a_load_discards_its_result():
+    cache = cache_module.TTLCache("test_generation", ttl_seconds=60)
+
+    def loader():
+        cache.invalidate(["key"])
+        return "stale"
+
+    assert cache.get_or_load("key", loader) == ("stale", False)
+    assert "key" not in cache
+
+
+def test_expired_entries_are_served_stale_while_refreshing(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    refreshes = []
+    monkeypatch.setattr(cache_module, "run_in_background", lambda name, fn: refreshes.append(fn))
+    cache = cache_module.TTLCache("test_stale", ttl_seconds=60, stale_seconds=30)
+    versions = iter(["v1", "v2"])
+
+    assert cache.get_or_load("key", lambda: next(versions)) == ("v1", False)
+    now[0] += 70
+    assert cache.get("key") is None
+    assert cache.get_or_load("key", lambda: next(versions)) == ("v1", True)
+    refreshes[0]()
+    assert cache.get_or_load("key", lambda: next(versions)) == ("v2", True)
+
+    now[0] += 100
+    assert cache.get_or_load("key", lambda: "v3") == ("v3", False)
+    assert cache.stats()["stale_hits"] == 1
+
+
+def make_client(monkeypatch, is_admin):
+    monkeypatch.setattr(routes_module, "_get_authenticated_user_id", lambda: ("user-1", None))
+    users = SimpleNamespace(data=[{"is_admin": is_admin}])
+    query = SimpleNamespace(
+        select=lambda columns: query,
+        eq=lambda column, value: query,
+        execute=lambda: users,
+    )
+    monkeypatch.setattr(routes_module, "supabase", SimpleNamespace(table=lambda name: query))
+    app = Flask(__name__)
+    app.register_blueprint(routes_module.routes)
+    return app.test_client()
+
+
+def test_cache_stats_endpoint_is_admin_only(monkeypatch):
+    assert make_client(monkeypatch, is_admin=False).get("/internal/cache-stats").status_code == 403
+
+    response = make_client(monkeypatch, is_admin=True).get("/internal/cache-stats")
+
+    body = response.get_json()
+    assert response.status_code == 200
+    for name in ("resolved_lessons", "web_expectations", "topic_bodies", "exercise_catalog", "auth_tokens"):
+        assert name in body["caches"]
+    assert body["max_rss_bytes"] > 0
@@ -0,0 +1,78 @@
+import gzip
+import json
+from importlib import import_module
+
+from flask import Flask, Response, jsonify
+
+compression = import_module("app.compression")
+
+BIG_PAYLOAD = {"rows": [{"id": index, "text": "hello world"} for index in range(200)]}
+
+
+def make_client(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    compression._compressed_cache.clear()
+    app = Flask(__name__)
+
+    @app.route("/big")
+    def big():
+        return jsonify(BIG_PAYLOAD)
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/tagged")
+    def tagged():
+        resp = Response(json.dumps(BIG_PAYLOAD), mimetype="application/json")
+        resp.set_etag("abc-open")
+        return resp
+
+    compression.init_compression(app)
+    return app.test_client()
+
+
+def test_choose_encoding_respects_quality_values(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+
+    assert compression.choose_encoding("gzip, deflate, br") == "br"
+    assert compression.choose_encoding("br;q=0.5, gzip") == "gzip"
+    assert compression.choose_encoding("identity") is None
+    assert compression.choose_encoding("*") == "br"
+    assert compression.choose_encoding("gzip;q=0") is None
+
+
+def test_large_json_is_gzipped_and_small_json_is_not(monkeypatch):
+    client = make_client(monkeypatch)
+
+    big = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/big")
+
+    assert big.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in big.headers["Vary"]
+    assert json.loads(gzip.decompress(big.data)) == BIG_PAYLOAD
+    assert "Content-Encoding" not in small.headers
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_json() == BIG_PAYLOAD
+
+
+def test_tagged_bodies_are_compressed_once_and_get_weak_etags(monkeypatch):
+    client = make_client(monkeypatch)
+    calls = []
+    original = compression.compress_body
+
+    def counting_compress(body, encoding):
+        calls.append(encoding)
+        return original(body, encoding)
+
+    monkeypatch.setattr(compression, "compress_body", counting_compress)
+    hits_before = compression.get_compression_cache_stats()["hits"]
+
+    first = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+
+    assert calls == ["gzip"]
+    assert first.data == second.data
+    assert first.headers["ETag"] == 'W/"abc-open"'
+    assert compression.get_compression_cache_stats()["hits"] == hits_before + 1
@@ -0,0 +1,178 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from app.lesson_cache import ResolvedLessonCache
+
+content_versions = import_module("app.content_versions")
+exercise_bank = import_module("app.exercise_bank")
+pathway_lessons = import_module("app.pathway_lessons")
+resolver = import_module("app.resolver")
+topic_library = import_module("app.topic_library")
+web_lesson_progress = import_module("app.web_lesson_progress")
+
+
+class FakeVersionsQuery:
+    def __init__(self, rows, calls):
+        self.rows = rows
+        self.calls = calls
+        self.min_change_id = None
+        self.descending = False
+
+    def select(self, columns):
+        return self
+
+    def gt(self, column, value):
+        self.min_change_id = value
+        return self
+
+    def order(self, column, desc=False):
+        self.descending = desc
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def execute(self):
+        self.calls.append(self.min_change_id)
+        rows = [
+            row for row in self.rows
+            if self.min_change_id is None or row["change_id"] > self.min_change_id
+        ]
+        rows.sort(key=lambda row: row["change_id"], reverse=self.descending)
+        return SimpleNamespace(data=rows[: self.count])
+
+
+def use_versions(monkeypatch, rows):
+    calls = []
+    monkeypatch.setattr(
+        content_versions,
+        "supabase",
+        SimpleNamespace(table=lambda name: FakeVersionsQuery(rows, calls)),
+    )
+    monkeypatch.setattr(
+        content_versions,
+        "_poll_state",
+        {"change_id": None, "pid": None, "last_poll": 0.0, "errors": 0},
+    )
+    return calls
+
+
+def test_poll_evicts_only_bumped_keys_and_advances_the_watermark(monkeypatch):
+    rows = [{"scope": "lesson", "key": "lesson-old", "change_id": 3}]
+    calls = use_versions(monkeypatch, rows)
+    web_lesson_progress._web_expectations_cache.clear()
+    web_lesson_progress._web_expectations_cache.set("lesson-1", {})
+    web_lesson_progress._web_expectations_cache.set("lesson-2", {})
+    topic_library.invalidate_topic_cache()
+    topic_library._topic_index_cache.set("en", (b"{}", "etag"))
+    topic_library._topic_body_cache.set(("countable", "en"), (b"{}", "etag"))
+    topic_library._topic_body_cache.set(("articles", "en"), (b"{}", "etag"))
+    monkeypatch.setitem(pathway_lessons._pathway_lessons_cache, "timestamp", 1e12)
+    exercise_bank._catalog_cache.set(exercise_bank.EXERCISE_CATALOG_CACHE_KEY, {"sections": []})
+
+    # The first poll only records where this worker starts.
+    assert content_versions.poll_content_versions() == 0
+    assert "lesson-1" in web_lesson_progress._web_expectations_cache
+
+    rows.extend([
+        {"scope": "lesson", "key": "lesson-1", "change_id": 4},
+        {"scope": "topic", "key": "countable", "change_id": 5},
+        {"scope": "exercise_bank", "key": "", "change_id": 6},
+    ])
+    assert content_versions.poll_content_versions() == 3
+    assert content_versions.poll_content_versions() == 0
+
+    assert calls == [None, 3, 6]
+    assert web_lesson_progress._web_expectations_cache.keys() == ["lesson-2"]
+    assert pathway_lessons._pathway_lessons_cache["timestamp"] == 0.0
+    assert len(topic_library._topic_index_cache) == 0
+    assert topic_library._topic_body_cache.keys() == [("articles", "en")]
+    assert len(exercise_bank._catalog_cache) == 0
+
+
+def test_bump_calls_the_rpc_and_tolerates_failures(monkeypatch):
+    rpc_calls = []
+
+    def rpc(name, params):
+        rpc_calls.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=7))
+
+    monkeypatch.setattr(content_versions, "supabase", SimpleNamespace(rpc=rpc))
+    assert content_versions.bump_content_versions("lesson", ["lesson-1", None]) == 7
+    assert content_versions.bump_content_versions("global_images") == 7
+    assert rpc_calls == [
+        ("bump_content_versions", {"p_scope": "lesson", "p_keys": ["lesson-1"]}),
+        ("bump_content_versions", {"p_scope": "global_images", "p_keys": [""]}),
+    ]
+
+    def failing_rpc(name, params):
+        raise RuntimeError("Could not find the function public.bump_content_versions")
+
+    monkeypatch.setattr(content_versions, "supabase", SimpleNamespace(rpc=failing_rpc))
+    assert content_versions.bump_content_versions("topic", ["countable"]) is None
+
+
+class FakeCompiledLessons:
+    def __init__(self, snapshots):
+        self.snapshots = snapshots
+
+    def table(self, name):
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.row = row
+        return self
+
+    def execute(self):
+        self.snapshots[(self.row["lesson_id"], self.row["lang"])] = self.row["payload"].encode("utf-8")
+        return SimpleNamespace(data=[self.row], error=None)
+
+
+def use_worker_lesson_cache(monkeypatch, content):
+    cache = ResolvedLessonCache(max_bytes=1024 * 1024, ttl_seconds=60)
+    snapshots = {}
+    monkeypatch.setattr(resolver, "_resolved_lesson_cache", cache)
+    monkeypatch.setattr(resolver, "supabase", FakeCompiledLessons(snapshots))
+    monkeypatch.setattr(resolver, "_fetch_compiled_lesson", lambda lesson_id, lang: snapshots.get((lesson_id, lang)))
+    monkeypatch.setattr(
+        resolver,
+        "_build_resolved_lesson",
+        lambda lesson_id, lang: {"id": lesson_id, "audio_key": content[lesson_id]},
+    )
+    return cache
+
+
+def test_backfill_recompile_and_bump_reach_other_workers(monkeypatch):
+    content = {"lesson-1": "old"}
+    use_worker_lesson_cache(monkeypatch, content)
+    assert resolver.resolve_lesson("lesson-1", "en")["audio_key"] == "old"
+    bumps = []
+    monkeypatch.setattr(resolver, "bump_content_versions", lambda scope, keys=None: bumps.append((scope, keys)))
+
+    content["lesson-1"] = "new"
+    # The backfill runs in its own process, with its own cache.
+    with monkeypatch.context() as tool:
+        tool.setattr(resolver, "_resolved_lesson_cache", ResolvedLessonCache(max_bytes=1024, ttl_seconds=60))
+        assert resolver.recompile_lessons(["lesson-1", "lesson-1"]) == []
+    assert resolver.resolve_lesson("lesson-1", "en")["audio_key"] == "old"
+
+    # What this worker's poller does with the bump.
+    assert bumps == [("lesson", ["lesson-1"])]
+    content_versions.invalidate_scope(*bumps[0])
+    content["lesson-1"] = "live build should not run"
+    assert resolver.resolve_lesson("lesson-1", "en")["audio_key"] == "new"
+
+
+def test_snippet_and_global_image_bumps_evict_dependent_lessons(monkeypatch):
+    cache = use_worker_lesson_cache(monkeypatch, {"lesson-1": "a", "lesson-2": "b"})
+    resolver.resolve_lesson_payload("lesson-1", "en")
+    resolver.resolve_lesson_payload("lesson-2", "en")
+    monkeypatch.setattr(resolver, "lesson_ids_for_external_ids", lambda keys: ["lesson-1"] if "1.1" in keys else [])
+
+    content_versions.invalidate_scope(content_versions.AUDIO_SNIPPETS_SCOPE, ["1.1"])
+    assert cache.get_entry("lesson-1:en") is None
+    assert cache.get_entry("lesson-2:en") is not None
+
+    content_versions.invalidate_scope(content_versions.GLOBAL_IMAGES_SCOPE)
+    assert cache.get_entry("lesson-2:en") is None
@@ -0,0 +1,122 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from flask import Flask
+
+routes_module = import_module("app.routes")
+exercise_bank = import_module("app.exercise_bank")
+
+BANK_ROWS = [
+    {"id": 1, "category": "verbs_and_tenses", "section": "Present Simple", "title": "A", "sort_order": 2},
+    {"id": 2, "category": "verbs_and_tenses", "section": "Present Simple", "title": "B", "sort_order": 1},
+    {"id": 3, "category": "adjectives", "section": "Comparatives", "title": "C", "sort_order": 1},
+]
+FEATURED_ROWS = [{"section": "Comparatives"}]
+
+
+class FakeBankQuery:
+    def __init__(self, table_name, tables, calls):
+        self.table_name = table_name
+        self.rows = tables[table_name]
+        self.calls = calls
+        self.filters = {}
+
+    def select(self, columns):
+        self.columns = columns
+        return self
+
+    def in_(self, column, values):
+        self.filters[column] = set(values)
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def execute(self):
+        self.calls.append((self.table_name, {k: sorted(v) for k, v in self.filters.items()}))
+        rows = [
+            row for row in self.rows
+            if all(row.get(column) in values for column, values in self.filters.items())
+        ]
+        return SimpleNamespace(data=rows)
+
+
+def fake_supabase(bank_rows, calls):
+    tables = {"exercise_bank": bank_rows, "featured_sections": FEATURED_ROWS}
+    return SimpleNamespace(table=lambda name: FakeBankQuery(name, tables, calls))
+
+
+def make_client(monkeypatch, rows):
+    calls = []
+    fake = fake_supabase(rows, calls)
+    exercise_bank.invalidate_exercise_catalog()
+    monkeypatch.setattr(exercise_bank, "supabase", fake)
+    monkeypatch.setattr(routes_module, "supabase", fake)
+    app = Flask(__name__)
+    app.register_blueprint(routes_module.routes)
+    return app.test_client(), calls
+
+
+def test_listing_routes_share_one_catalog_load(monkeypatch):
+    client, calls = make_client(monkeypatch, BANK_ROWS)
+
+    sections = client.get("/api/exercise-bank/sections").get_json()
+    filtered = client.get("/api/exercise-bank/sections?category=adjectives").get_json()
+    featured = client.get("/api/exercise-bank/featured").get_json()
+
+    assert [section["section_slug"] for section in sections["sections"]] == [
+        "present-simple",
+        "comparatives",
+    ]
+    assert sections["sections"][0]["exercise_count"] == 2
+    assert [category["category"] for category in sections["categories"]] == [
+        "adjectives",
+        "verbs_and_tenses",
+    ]
+    assert [section["section"] for section in filtered["sections"]] == ["Comparatives"]
+    assert featured["featured"] == [{
+        "category": "adjectives",
+        "category_label": "Adjectives",
+        "category_slug": "adjectives",
+        "section": "Comparatives",
+        "section_th": None,
+        "section_slug": "comparatives",
+        "exercise_count": 1,
+    }]
+    assert sorted(table for table, _ in calls) == ["exercise_bank", "featured_sections"]
+
+
+def test_section_route_filters_in_the_database(monkeypatch):
+    client, calls = make_client(monkeypatch, BANK_ROWS)
+
+    response = client.get("/api/exercise-bank/section/verbs-and-tenses/present-simple")
+    again = client.get("/api/exercise-bank/section/verbs-and-tenses/present-simple")
+
+    section = response.get_json()["section"]
+    assert [exercise["title"] for exercise in section["exercises"]] == ["B", "A"]
+    assert section["section_slug"] == "present-simple"
+    assert again.status_code == 200
+    section_queries = [filters for table, filters in calls if table == "exercise_bank" and filters]
+    assert section_queries == [
+        {"category": ["verbs_and_tenses"], "section": ["Present Simple"]},
+    ] * 2
+    # The catalog is loaded once (two queries); each request adds one query.
+    assert len(calls) == 4
+
+
+def test_unknown_section_reloads_a_stale_catalog_and_invalidation_clears_it(monkeypatch):
+    client, calls = make_client(monkeypatch, BANK_ROWS)
+    client.get("/api/exercise-bank/section/adjectives/comparatives")
+    monkeypatch.setattr(exercise_bank, "EXERCISE_CATALOG_MIN_REFRESH_SECONDS", 0)
+    rows_with_new = BANK_ROWS + [
+        {"id": 4, "category": "adjectives", "section": "Superlatives", "title": "D", "sort_order": 1},
+    ]
+    monkeypatch.setattr(exercise_bank, "supabase", fake_supabase(rows_with_new, calls))
+
+    assert exercise_bank.resolve_section_slugs("adjectives", "superlatives") == [
+        ("adjectives", "Superlatives")
+    ]
+    assert exercise_bank.resolve_section_slugs("adjectives", "missing") == []
+
+    exercise_bank.invalidate_exercise_catalog()
+    assert exercise_bank.EXERCISE_CATALOG_CACHE_KEY not in exercise_bank._catalog_cache
@@ -0,0 +1,100 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+import_lessons = import_module("app.tools.import_lessons")
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.payload = None
+        self.in_values = None
+
+    @property
+    def not_(self):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def in_(self, column, values):
+        self.in_values = list(values)
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def upsert(self, payload, **kwargs):
+        self.op, self.payload = "upsert", payload
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def execute(self):
+        self.db["writes"].append((self.table, self.op, self.payload))
+        if self.op != "select":
+            return SimpleNamespace(data=[])
+        rows = self.db[self.table]
+        if self.table == "lesson_phrases" and self.in_values is not None:
+            rows = [row for row in rows if row["phrase_id"] in self.in_values]
+        return SimpleNamespace(data=rows)
+
+
+def test_updating_a_shared_phrase_recompiles_every_lesson_that_links_it(monkeypatch):
+    db = {
+        "phrases": [{"id": "phrase-1", "phrase": "BREAK THE ICE"}],
+        "lesson_phrases": [
+            {"lesson_id": "lesson-a", "phrase_id": "phrase-1"},
+            {"lesson_id": "lesson-b", "phrase_id": "phrase-1"},
+        ],
+        "writes": [],
+    }
+    monkeypatch.setattr(import_lessons, "supabase", SimpleNamespace(table=lambda name: FakeQuery(db, name)))
+    monkeypatch.setattr(import_lessons, "upsert_lesson", lambda data, lang, dry_run: "lesson-a")
+    for name in (
+        "upsert_transcript",
+        "upsert_comprehension",
+        "upsert_sections",
+        "upsert_common_mistakes",
+        "upsert_practice_exercises",
+        "upsert_tags",
+    ):
+        monkeypatch.setattr(import_lessons, name, lambda *args, **kwargs: None)
+    refreshed = []
+    monkeypatch.setattr(
+        import_lessons,
+        "refresh_app_total_units_for_lessons",
+        lambda lesson_ids, persist: refreshed.append(("app", lesson_ids)),
+    )
+    monkeypatch.setattr(
+        import_lessons,
+        "refresh_web_unit_manifests_for_lessons",
+        lambda lesson_ids, persist: refreshed.append(("web", lesson_ids)),
+    )
+    recompiled = []
+    monkeypatch.setattr(import_lessons, "recompile_lessons", lambda lesson_ids: recompiled.append(lesson_ids) or [])
+
+    import_lessons.process_lesson(
+        {
+            "lesson": {"external_id": "1.1"},
+            "transcript": [],
+            "comprehension_questions": [],
+            "tags": [],
+            "sections": [{
+                "type": "phrases_verbs",
+                "items": [{"phrase": "break the ice", "content": "New explanation"}],
+            }],
+        }
+    )
+
+    assert ("phrases", "update", {"content": "New explanation"}) in db["writes"]
+    assert recompiled == [["lesson-a", "lesson-b"]]
+    assert refreshed == [("app", ["lesson-a", "lesson-b"]), ("web", ["lesson-a", "lesson-b"])]
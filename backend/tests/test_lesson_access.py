@@ -0,0 +1,83 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+import pytest
+
+lesson_access = import_module("app.lesson_access")
+pathway_lessons = import_module("app.pathway_lessons")
+
+
+class FakeQuery:
+    def __init__(self, result, calls, name):
+        self.result = result
+        self.calls = calls
+        self.name = name
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def single(self):
+        return self
+
+    def execute(self):
+        self.calls.append(self.name)
+        return self.result
+
+
+class FakeSupabase:
+    def __init__(self, table_results):
+        self.table_results = table_results
+        self.calls = []
+
+    def table(self, name):
+        return FakeQuery(self.table_results[name], self.calls, name)
+
+
+LESSONS = [
+    {"id": "b1-2", "stage": "Beginner", "level": 1, "lesson_order": 2},
+    {"id": "b1-1", "stage": "Beginner", "level": 1, "lesson_order": 1},
+    {"id": "i1-1", "stage": "Intermediate", "level": 1, "lesson_order": 1},
+]
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    def install(is_paid):
+        fake = FakeSupabase(
+            {
+                "lessons": SimpleNamespace(data=[dict(lesson) for lesson in LESSONS]),
+                "users": SimpleNamespace(data={"is_paid": is_paid}),
+            }
+        )
+        monkeypatch.setattr(pathway_lessons, "supabase", fake)
+        monkeypatch.setattr(lesson_access, "supabase", fake)
+        monkeypatch.setitem(pathway_lessons._pathway_lessons_cache, "timestamp", 0.0)
+        lesson_access.invalidate_user_entitlement()
+        return fake
+
+    return install
+
+
+def test_free_user_unlocks_only_first_lesson_of_each_level(fake_db):
+    fake = fake_db(is_paid=False)
+
+    assert lesson_access.resolve_lesson_access("b1-1", "user-1") == (True, "first_in_level")
+    assert lesson_access.resolve_lesson_access("i1-1", "user-1") == (True, "first_in_level")
+    assert lesson_access.resolve_lesson_access("b1-2", "user-1") == (False, "locked")
+    # One users query fills the entitlement cache and one lessons query builds the index.
+    assert fake.calls == ["users", "lessons"]
+
+
+def test_paid_entitlement_is_cached_until_invalidated(fake_db):
+    fake = fake_db(is_paid=True)
+
+    assert lesson_access.resolve_lesson_access("b1-2", "user-1") == (True, "paid")
+    assert lesson_access.resolve_lesson_access("b1-2", "user-1") == (True, "paid")
+    assert fake.calls == ["users"]
+
+    lesson_access.invalidate_user_entitlement("user-1")
+    lesson_access.resolve_lesson_access("b1-2", "user-1")
+    assert fake.calls == ["users", "users"]
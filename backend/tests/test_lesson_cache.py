@@ -0,0 +1,66 @@
+from app.lesson_cache import ResolvedLessonCache
+
+
+def test_evicts_least_recently_used_entries_over_byte_budget():
+    cache = ResolvedLessonCache(max_bytes=10, ttl_seconds=60)
+    cache.set("a:en", b"aaaa")
+    cache.set("b:en", b"bbbb")
+    assert cache.get("a:en") == b"aaaa"
+
+    cache.set("c:en", b"cccc")
+
+    assert cache.get("b:en") is None
+    assert cache.get("a:en") == b"aaaa"
+    assert cache.get("c:en") == b"cccc"
+    stats = cache.stats()
+    assert stats["bytes"] == 8
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.lesson_cache.time.time", lambda: now[0])
+    cache = ResolvedLessonCache(max_bytes=100, ttl_seconds=5)
+    cache.set("a:en", b"payload")
+
+    now[0] += 6
+
+    assert cache.get("a:en") is None
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["bytes"] == 0
+
+
+def test_shared_store_is_visible_to_other_workers(tmp_path):
+    shared_path = str(tmp_path / "resolved.sqlite3")
+    worker_a = ResolvedLessonCache(max_bytes=100, ttl_seconds=60, shared_path=shared_path)
+    worker_b = ResolvedLessonCache(max_bytes=100, ttl_seconds=60, shared_path=shared_path)
+
+    worker_a.set("lesson-1:th", b'{"id":"lesson-1"}')
+
+    assert worker_b.get("lesson-1:th") == b'{"id":"lesson-1"}'
+    assert worker_b.stats()["shared_hits"] == 1
+    assert worker_b.get("lesson-1:th") == b'{"id":"lesson-1"}'
+    assert worker_b.stats()["hits"] == 1
+
+    worker_a.invalidate("lesson-1:th")
+    worker_b.invalidate("lesson-1:th")
+    assert worker_b.get("lesson-1:th") is None
+
+
+def test_shared_store_prunes_to_its_own_budget(tmp_path):
+    shared_path = str(tmp_path / "resolved.sqlite3")
+    writer = ResolvedLessonCache(
+        max_bytes=100, ttl_seconds=60, shared_path=shared_path, shared_max_bytes=8
+    )
+    reader = ResolvedLessonCache(max_bytes=100, ttl_seconds=60, shared_path=shared_path)
+
+    writer.set("a:en", b"aaaa")
+    writer.set("b:en", b"bbbb")
+    writer.set("c:en", b"cccc")
+
+    assert reader.get("a:en") is None
+    assert reader.get("c:en") == b"cccc"
+    assert writer.stats()["shared_evictions"] == 1
@@ -0,0 +1,275 @@
+import threading
+import time
+from importlib import import_module
+from types import SimpleNamespace
+
+import pytest
+
+from flask import Flask
+
+from app.lesson_cache import ResolvedLessonCache, content_hash_for
+
+routes_module = import_module("app.routes")
+resolver_module = import_module("app.resolver")
+
+PUBLIC_LESSON_ID = routes_module.PUBLIC_TRY_LESSON_IDS[0]
+
+
+def make_client():
+    app = Flask(__name__)
+    app.register_blueprint(routes_module.routes)
+    return app.test_client()
+
+
+def use_fresh_cache(monkeypatch):
+    cache = ResolvedLessonCache(max_bytes=1024 * 1024, ttl_seconds=60)
+    monkeypatch.setattr(resolver_module, "_resolved_lesson_cache", cache)
+    monkeypatch.setattr(resolver_module, "_fetch_compiled_lesson", lambda lesson_id, lang: None)
+    return cache
+
+
+def test_resolve_lesson_payload_builds_once_and_serves_cached_bytes(monkeypatch):
+    use_fresh_cache(monkeypatch)
+    builds = []
+
+    def fake_build(lesson_id, lang):
+        builds.append((lesson_id, lang))
+        return {"id": lesson_id, "title": "สวัสดี", "sections": []}
+
+    monkeypatch.setattr(resolver_module, "_build_resolved_lesson", fake_build)
+
+    first = resolver_module.resolve_lesson_payload("lesson-1", "th")
+    second = resolver_module.resolve_lesson_payload("lesson-1", "th")
+
+    assert builds == [("lesson-1", "th")]
+    assert first.body is second.body
+    assert resolver_module.resolve_lesson("lesson-1", "th") == {
+        "id": "lesson-1",
+        "title": "สวัสดี",
+        "sections": [],
+    }
+
+
+def test_concurrent_misses_for_one_lesson_share_a_build(monkeypatch):
+    use_fresh_cache(monkeypatch)
+    release = threading.Event()
+    builds = []
+    results = []
+
+    def slow_build(lesson_id, lang):
+        builds.append((lesson_id, lang))
+        release.wait(timeout=5)
+        return {"id": lesson_id, "sections": []}
+
+    monkeypatch.setattr(resolver_module, "_build_resolved_lesson", slow_build)
+    flights = resolver_module._resolve_flights
+    coalesced_before = flights.coalesced
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(resolver_module.resolve_lesson_payload("lesson-1", "en"))
+        )
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + 5
+    while flights.coalesced - coalesced_before < 2 and time.time() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert builds == [("lesson-1", "en")]
+    assert len({payload.content_hash for payload in results}) == 1
+
+
+def test_expired_lesson_is_served_stale_while_one_refresh_runs(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.lesson_cache.time.time", lambda: now[0])
+    cache = ResolvedLessonCache(max_bytes=1024 * 1024, ttl_seconds=60, stale_seconds=60)
+    monkeypatch.setattr(resolver_module, "_resolved_lesson_cache", cache)
+    monkeypatch.setattr(resolver_module, "_fetch_compiled_lesson", lambda lesson_id, lang: None)
+    versions = iter(["old", "new"])
+    monkeypatch.setattr(
+        resolver_module,
+        "_build_resolved_lesson",
+        lambda lesson_id, lang: {"id": lesson_id, "version": next(versions)},
+    )
+    refreshes = []
+    monkeypatch.setattr(resolver_module, "run_in_background", lambda name, fn: refreshes.append(fn))
+
+    resolver_module.resolve_lesson_payload("lesson-1", "en")
+    now[0] += 90
+    stale = resolver_module.resolve_lesson_payload("lesson-1", "en")
+    assert resolver_module.resolve_lesson("lesson-1", "en")["version"] == "old"
+    assert b'"old"' in stale.body
+    assert len(refreshes) == 2
+
+    refreshes[0]()
+    assert resolver_module.resolve_lesson("lesson-1", "en")["version"] == "new"
+
+
+def test_resolve_lesson_payload_serves_compiled_snapshot_before_building(monkeypatch):
+    use_fresh_cache(monkeypatch)
+    snapshot = resolver_module._encode_resolved_lesson({"id": "lesson-1", "sections": []})
+    monkeypatch.setattr(resolver_module, "_fetch_compiled_lesson", lambda lesson_id, lang: snapshot)
+
+    def fail_build(lesson_id, lang):
+        raise AssertionError("live resolver should not run when a snapshot exists")
+
+    monkeypatch.setattr(resolver_module, "_build_resolved_lesson", fail_build)
+
+    payload = resolver_module.resolve_lesson_payload("lesson-1", "en")
+
+    assert payload.body == snapshot
+    assert payload.content_hash == content_hash_for(snapshot)
+
+
+class FakeUpsertTable:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def upsert(self, row, on_conflict=None):
+        self.rows.append((row, on_conflict))
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=[], error=None)
+
+
+def test_compile_lesson_snapshots_persists_each_language(monkeypatch):
+    cache = use_fresh_cache(monkeypatch)
+    cache.set("lesson-1:en", b'{"stale":true}')
+    rows = []
+    monkeypatch.setattr(
+        resolver_module,
+        "supabase",
+        SimpleNamespace(table=lambda name: FakeUpsertTable(rows)),
+    )
+    monkeypatch.setattr(
+        resolver_module,
+        "_build_resolved_lesson",
+        lambda lesson_id, lang: {"id": lesson_id, "lang": lang},
+    )
+
+    hashes = resolver_module.compile_lesson_snapshots(["lesson-1"])
+
+    assert [row["lang"] for row, _ in rows] == ["en", "th"]
+    assert all(on_conflict == "lesson_id,lang" for _, on_conflict in rows)
+    assert rows[1][0]["payload"] == '{"id":"lesson-1","lang":"th"}'
+    assert hashes["lesson-1"]["th"] == rows[1][0]["content_hash"]
+    assert cache.get("lesson-1:en") is None
+
+
+def test_with_locked_splices_flag_into_encoded_body():
+    body = resolver_module._encode_resolved_lesson({"id": "lesson-1"})
+    payload = resolver_module.ResolvedLessonPayload(
+        "lesson-1", "en", body, content_hash_for(body)
+    )
+
+    assert payload.with_locked(False) == b'{"locked":false,"id":"lesson-1"}'
+    assert payload.with_locked(True) == b'{"locked":true,"id":"lesson-1"}'
+    assert payload.etag(False) != payload.etag(True)
+
+
+def test_resolved_route_returns_pre_encoded_payload(monkeypatch, capsys):
+    use_fresh_cache(monkeypatch)
+    monkeypatch.setattr(
+        resolver_module,
+        "_build_resolved_lesson",
+        lambda lesson_id, lang: {"id": lesson_id, "sections": [{"id": "s1"}]},
+    )
+    monkeypatch.setattr(
+        routes_module, "resolve_lesson_payload", resolver_module.resolve_lesson_payload
+    )
+
+    response = make_client().get(f"/api/lessons/{PUBLIC_LESSON_ID}/resolved?lang=en")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert response.get_json() == {
+        "id": PUBLIC_LESSON_ID,
+        "locked": False,
+        "sections": [{"id": "s1"}],
+    }
+    assert response.headers["Cache-Control"] == "private, max-age=60"
+    assert "[lesson-route]" in capsys.readouterr().out
+
+
+def test_resolved_route_answers_matching_etag_with_not_modified(monkeypatch):
+    use_fresh_cache(monkeypatch)
+    builds = []
+
+    def fake_build(lesson_id, lang):
+        builds.append(lesson_id)
+        return {"id": lesson_id, "sections": []}
+
+    monkeypatch.setattr(resolver_module, "_build_resolved_lesson", fake_build)
+    monkeypatch.setattr(
+        routes_module, "resolve_lesson_payload", resolver_module.resolve_lesson_payload
+    )
+    client = make_client()
+
+    first = client.get(f"/api/lessons/{PUBLIC_LESSON_ID}/resolved?lang=th")
+    etag = first.headers["ETag"]
+    second = client.get(
+        f"/api/lessons/{PUBLIC_LESSON_ID}/resolved?lang=th",
+        headers={"If-None-Match": etag},
+    )
+    stale = client.get(
+        f"/api/lessons/{PUBLIC_LESSON_ID}/resolved?lang=th",
+        headers={"If-None-Match": '"outdated"'},
+    )
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.data == b""
+    assert second.headers["ETag"] == etag
+    assert second.headers["Cache-Control"] == "private, max-age=60"
+    assert stale.status_code == 200
+    assert builds == [PUBLIC_LESSON_ID]
+
+
+class FakeRpcQuery:
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        return SimpleNamespace(data=self.data, error=None)
+
+
+def test_rpc_bundle_mode_fetches_lesson_in_one_call(monkeypatch):
+    calls = []
+    bundle = {
+        "lesson": {"id": "lesson-1", "stage": "Beginner", "level": 1, "title": "Hello"},
+        "sections": [{"id": "s1", "lesson_id": "lesson-1", "type": "prepare", "content_jsonb": []}],
+        "transcript": [{"id": "t1", "lesson_id": "lesson-1", "line_text": "Hi"}],
+    }
+
+    def fake_rpc(name, params):
+        calls.append((name, params))
+        return FakeRpcQuery(bundle)
+
+    monkeypatch.setattr(resolver_module, "supabase", SimpleNamespace(rpc=fake_rpc))
+    monkeypatch.setattr(resolver_module, "_get_cached_global_images", lambda: ([], True))
+    monkeypatch.setattr(resolver_module.Config, "LESSON_BUNDLE_MODE", "rpc")
+
+    raw = resolver_module._fetch_lesson_bundle("lesson-1")
+
+    assert calls == [("get_lesson_bundle", {"p_lesson_id": "lesson-1"})]
+    assert raw["lesson"]["title"] == "Hello"
+    assert raw["sections"][0]["id"] == "s1"
+    assert raw["questions"] == []
+    assert raw["common_mistakes"] == []
+
+
+def test_rpc_bundle_mode_reports_missing_lesson(monkeypatch):
+    monkeypatch.setattr(
+        resolver_module,
+        "supabase",
+        SimpleNamespace(rpc=lambda name, params: FakeRpcQuery(None)),
+    )
+    monkeypatch.setattr(resolver_module.Config, "LESSON_BUNDLE_MODE", "rpc")
+
+    with pytest.raises(KeyError):
+        resolver_module._fetch_lesson_bundle("missing")
@@ -6,6 +6,7 @@ from zoneinfo import ZoneInfo
 from flask import Flask
 
 routes_module = import_module("app.routes")
+auth_module = import_module("app.auth")
 
 
 class FakeQuery:
@@ -22,6 +23,17 @@ class FakeQuery:
         self.filters.append((column, value))
         return self
 
+    def gt(self, column, value):
+        self.filters.append((f"{column}>", value))
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, count):
+        self.limit_count = count
+        return self
+
     def single(self):
         return self
 
@@ -45,6 +57,23 @@ class FakeSupabase:
         return query
 
 
+PATHWAY_LESSONS = [
+    {"id": "b1-1", "stage": "Beginner", "level": 1, "lesson_order": 1, "title": "One"},
+    {"id": "b1-2", "stage": "Beginner", "level": 1, "lesson_order": 2, "title": "Two"},
+    {"id": "b2-1", "stage": "Beginner", "level": 2, "lesson_order": 1, "title": "Three"},
+    {"id": "b2-2", "stage": "Beginner", "level": 2, "lesson_order": 2, "title": "Four"},
+]
+
+
+def use_pathway_cache(monkeypatch, ordered_lessons=PATHWAY_LESSONS):
+    pathway_lessons = import_module("app.pathway_lessons")
+    monkeypatch.setattr(
+        pathway_lessons,
+        "_pathway_lessons_cache",
+        pathway_lessons.build_pathway_snapshot(ordered_lessons),
+    )
+
+
 def make_client():
     app = Flask(__name__)
     app.register_blueprint(routes_module.routes)
@@ -70,6 +99,7 @@ def test_user_profile_keeps_response_contract_and_uses_narrow_select(monkeypatch
         }
     )
     monkeypatch.setattr(routes_module, "supabase", fake_supabase)
+    monkeypatch.setattr(auth_module, "supabase", fake_supabase)
 
     response = make_client().get(
         "/api/user/profile",
@@ -99,19 +129,16 @@ def test_user_profile_keeps_response_contract_and_uses_narrow_select(monkeypatch
     assert "[user-profile]" in capsys.readouterr().out
 
 
-def test_completed_lessons_keeps_nested_lesson_payload(monkeypatch, capsys):
+def test_completed_lessons_joins_lesson_metadata_from_pathway_cache(monkeypatch, capsys):
+    use_pathway_cache(monkeypatch)
     completed_rows = [
-        {
-            "id": 9,
-            "lesson_id": "lesson-1",
-            "is_completed": True,
-            "lessons": {"id": "lesson-1", "title": "Hello"},
-        }
+        {"id": 9, "lesson_id": "b1-1", "is_completed": True, "completed_at": "2026-10-01T00:00:00Z"},
     ]
     fake_supabase = FakeSupabase(
         {"user_lesson_progress": SimpleNamespace(data=completed_rows)}
     )
     monkeypatch.setattr(routes_module, "supabase", fake_supabase)
+    monkeypatch.setattr(auth_module, "supabase", fake_supabase)
 
     response = make_client().get(
         "/api/user/completed-lessons",
@@ -119,13 +146,88 @@ def test_completed_lessons_keeps_nested_lesson_payload(monkeypatch, capsys):
     )
 
     assert response.status_code == 200
-    assert response.get_json() == {"completed_lessons": completed_rows}
+    assert response.get_json() == {
+        "completed_lessons": [
+            {
+                "id": 9,
+                "lesson_id": "b1-1",
+                "is_completed": True,
+                "completed_at": "2026-10-01T00:00:00Z",
+                "lessons": {
+                    "id": "b1-1",
+                    "stage": "Beginner",
+                    "level": 1,
+                    "lesson_order": 1,
+                    "lesson_external_id": None,
+                    "title": "One",
+                    "title_th": None,
+                    "focus": None,
+                    "focus_th": None,
+                },
+            }
+        ]
+    }
     assert fake_supabase.queries["user_lesson_progress"][0].select_args[0] == (
-        "*, lessons(*)",
+        routes_module.COMPLETED_LESSON_PROGRESS_SELECT,
     )
     assert "[completed-lessons]" in capsys.readouterr().out
 
 
+def test_completed_lessons_page_reads_one_pathway_snapshot(monkeypatch):
+    pathway_lessons = import_module("app.pathway_lessons")
+    use_pathway_cache(monkeypatch)
+    renamed = [{**lesson, "title": "Renamed"} for lesson in PATHWAY_LESSONS]
+    original_get = pathway_lessons.get_cached_pathway_lessons
+
+    def get_then_refresh():
+        cached_lessons = original_get()
+        # A background refresh swaps the snapshot while the page is being built.
+        monkeypatch.setattr(pathway_lessons, "_pathway_lessons_cache", pathway_lessons.build_pathway_snapshot(renamed))
+        return cached_lessons
+
+    monkeypatch.setattr(routes_module, "get_cached_pathway_lessons", get_then_refresh)
+    monkeypatch.setattr(pathway_lessons, "get_cached_pathway_lessons", get_then_refresh)
+    fake_supabase = FakeSupabase(
+        {"user_lesson_progress": SimpleNamespace(data=[{"lesson_id": "b1-1"}, {"lesson_id": "b1-2"}])}
+    )
+    monkeypatch.setattr(routes_module, "supabase", fake_supabase)
+    monkeypatch.setattr(auth_module, "supabase", fake_supabase)
+
+    response = make_client().get(
+        "/api/user/completed-lessons",
+        headers={"Authorization": "Bearer test-token"},
+    )
+
+    titles = [row["lessons"]["title"] for row in response.get_json()["completed_lessons"]]
+    assert titles == ["One", "Two"]
+
+
+def test_completed_lessons_ids_only_page_returns_cursor(monkeypatch):
+    fake_supabase = FakeSupabase(
+        {
+            "user_lesson_progress": SimpleNamespace(
+                data=[{"lesson_id": "b1-2"}, {"lesson_id": "b2-1"}, {"lesson_id": "b2-2"}]
+            )
+        }
+    )
+    monkeypatch.setattr(routes_module, "supabase", fake_supabase)
+    monkeypatch.setattr(auth_module, "supabase", fake_supabase)
+
+    response = make_client().get(
+        "/api/user/completed-lessons?ids_only=1&limit=2&cursor=b1-1",
+        headers={"Authorization": "Bearer test-token"},
+    )
+
+    assert response.get_json() == {
+        "completed_lesson_ids": ["b1-2", "b2-1"],
+        "next_cursor": "b2-1",
+    }
+    query = fake_supabase.queries["user_lesson_progress"][0]
+    assert query.select_args[0] == ("lesson_id",)
+    assert ("lesson_id>", "b1-1") in query.filters
+    assert query.limit_count == 3
+
+
 def test_daily_streak_keeps_response_contract(monkeypatch, capsys):
     today = datetime.now(ZoneInfo("Asia/Bangkok")).date().isoformat()
     fake_supabase = FakeSupabase({})
@@ -141,6 +243,7 @@ def test_daily_streak_keeps_response_contract(monkeypatch, capsys):
         }
     )
     monkeypatch.setattr(routes_module, "supabase", fake_supabase)
+    monkeypatch.setattr(auth_module, "supabase", fake_supabase)
     monkeypatch.setattr(routes_module, "supabase_admin", fake_admin)
 
     response = make_client().get(
@@ -160,3 +263,134 @@ def test_daily_streak_keeps_response_contract(monkeypatch, capsys):
         "timezone": "Asia/Bangkok",
     }
     assert "[daily-streak]" in capsys.readouterr().out
+
+
+def test_user_stats_counts_levels_from_pathway_index_with_one_query(monkeypatch, capsys):
+    use_pathway_cache(monkeypatch)
+    fake_supabase = FakeSupabase(
+        {
+            "user_lesson_progress": SimpleNamespace(
+                data=[{"lesson_id": "b1-1"}, {"lesson_id": "b1-2"}, {"lesson_id": "b2-1"}]
+            ),
+        }
+    )
+    monkeypatch.setattr(routes_module, "supabase", fake_supabase)
+    monkeypatch.setattr(auth_module, "supabase", fake_supabase)
+    monkeypatch.setattr(
+        routes_module,
+        "_build_daily_streak_status",
+        lambda user_id, tzinfo, timezone_name: {
+            "daily_streak": 0,
+            "checked_in_today": False,
+            "opened_on": "2026-10-17",
+            "timezone": timezone_name,
+            "last_checkin_date": None,
+        },
+    )
+
+    response = make_client().get(
+        "/api/user/stats",
+        headers={"Authorization": "Bearer test-token"},
+    )
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["lessons_completed"] == 3
+    assert body["levels_completed"] == 1
+    assert list(fake_supabase.queries) == ["user_lesson_progress"]
+    assert len(fake_supabase.queries["user_lesson_progress"]) == 1
+    assert "[user-stats]" in capsys.readouterr().out
+
+
+def test_next_lesson_uses_pathway_index_and_one_query(monkeypatch, capsys):
+    use_pathway_cache(monkeypatch)
+    fake_supabase = FakeSupabase(
+        {
+            "user_lesson_progress": SimpleNamespace(
+                data=[{"lesson_id": "b1-1"}, {"lesson_id": "b1-2"}, {"lesson_id": "removed"}]
+            ),
+        }
+    )
+    monkeypatch.setattr(routes_module, "supabase", fake_supabase)
+    monkeypatch.setattr(auth_module, "supabase", fake_supabase)
+
+    response = make_client().get(
+        "/api/user/next-lesson",
+        headers={"Authorization": "Bearer test-token"},
+    )
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "next_lesson": {
+            "level": 2,
+            "lesson_order": 1,
+            "title": "Three",
+            "stage": "Beginner",
+            "formatted": "Level 2 • Lesson 1",
+        }
+    }
+    assert list(fake_supabase.queries) == ["user_lesson_progress"]
+    assert fake_supabase.queries["user_lesson_progress"][0].select_args[0] == ("lesson_id",)
+    assert "[next-lesson]" in capsys.readouterr().out
+
+
+def test_next_lesson_is_none_after_the_last_lesson(monkeypatch):
+    use_pathway_cache(monkeypatch)
+    fake_supabase = FakeSupabase(
+        {"user_lesson_progress": SimpleNamespace(data=[{"lesson_id": "b2-2"}])}
+    )
+    monkeypatch.setattr(routes_module, "supabase", fake_supabase)
+    monkeypatch.setattr(auth_module, "supabase", fake_supabase)
+
+    response = make_client().get(
+        "/api/user/next-lesson",
+        headers={"Authorization": "Bearer test-token"},
+    )
+
+    assert response.get_json() == {"next_lesson": None}
+
+
+def test_pathway_snapshot_derives_level_stage_and_next_lesson_indexes():
+    pathway_lessons = import_module("app.pathway_lessons")
+    snapshot = pathway_lessons.build_pathway_snapshot(list(reversed(PATHWAY_LESSONS)), timestamp=1.0)
+
+    assert [lesson["id"] for lesson in snapshot["ordered_lessons"]] == ["b1-1", "b1-2", "b2-1", "b2-2"]
+    assert snapshot["first_lesson_id_by_level"] == {("Beginner", 1): "b1-1", ("Beginner", 2): "b2-1"}
+    assert snapshot["lesson_ids_by_stage"] == {"Beginner": ["b1-1", "b1-2", "b2-1", "b2-2"]}
+    assert snapshot["next_lesson_id_by_id"] == {"b1-1": "b1-2", "b1-2": "b2-1", "b2-1": "b2-2", "b2-2": None}
+    assert [lesson["id"] for lesson in pathway_lessons.get_level_lessons("Beginner", 2, snapshot)] == [
+        "b2-1",
+        "b2-2",
+    ]
+
+
+def test_expiring_pathway_snapshot_is_swapped_by_the_refresher(monkeypatch):
+    pathway_lessons = import_module("app.pathway_lessons")
+    use_pathway_cache(monkeypatch)
+    old_snapshot = pathway_lessons._pathway_lessons_cache
+    monkeypatch.setitem(old_snapshot, "timestamp", old_snapshot["timestamp"] - pathway_lessons.PATHWAY_LESSONS_CACHE_TTL_SECONDS + 5)
+    fake_supabase = FakeSupabase({"lessons": SimpleNamespace(data=PATHWAY_LESSONS[:2])})
+    monkeypatch.setattr(pathway_lessons, "supabase", fake_supabase)
+    monkeypatch.setattr(pathway_lessons.Config, "PATHWAY_LESSONS_REFRESH_SECONDS", 10)
+    sleeps = []
+
+    def fake_sleep(seconds):
+        if sleeps:
+            raise SystemExit
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(pathway_lessons.time, "sleep", fake_sleep)
+
+    # Readers keep the previous snapshot until the refresher rebinds it.
+    held = pathway_lessons.get_cached_pathway_lessons()
+    try:
+        pathway_lessons._refresh_forever()
+    except SystemExit:
+        pass
+
+    refreshed = pathway_lessons.get_cached_pathway_lessons()
+    assert len(held["ordered_lessons"]) == 4
+    assert [lesson["id"] for lesson in refreshed["ordered_lessons"]] == ["b1-1", "b1-2"]
+    assert refreshed["cache_hit"] is True
+    assert pathway_lessons._pathway_lessons_cache is not old_snapshot
+    assert len(fake_supabase.queries["lessons"]) == 1
@@ -0,0 +1,212 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+progress_summaries = import_module("app.progress_summaries")
+app_progress = import_module("app.app_lesson_progress")
+web_progress = import_module("app.web_lesson_progress")
+rebuild_tool = import_module("app.tools.rebuild_progress_summaries")
+
+MANIFEST = {
+    "section_unit_keys": ["section:prepare"],
+    "exercise_unit_keys": ["exercise:ex-1"],
+    "comprehension_unit_keys": [],
+    "all_visible_unit_keys": ["section:prepare", "exercise:ex-1"],
+}
+
+
+class FakeSummaryQuery:
+    def __init__(self, rows=None, error=None):
+        self.rows = rows or []
+        self.error = error
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def in_(self, column, values):
+        return self
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        return SimpleNamespace(data=self.rows)
+
+
+def test_summary_rows_match_live_summarizers():
+    progress_rows = [{
+        "lesson_id": "lesson-1",
+        "is_completed": False,
+        "last_unit_type": "exercise",
+        "last_unit_key": "app:exercise:ex-1",
+    }]
+    unit_rows = [
+        {"lesson_id": "lesson-1", "unit_key": "exercise:ex-1", "is_completed": True},
+        {
+            "lesson_id": "lesson-1",
+            "unit_key": "app:exercise:ex-1",
+            "section_key": "app:page:practice",
+            "is_completed": True,
+        },
+        {"lesson_id": "lesson-1", "unit_key": "app:page:prepare", "is_completed": False},
+    ]
+    # What the trigger stores for the rows above.
+    row = {
+        "lesson_id": "lesson-1",
+        "has_progress_row": True,
+        "manually_completed": False,
+        "last_unit_type": "exercise",
+        "last_unit_key": "app:exercise:ex-1",
+        "last_unit_section_key": "app:page:practice",
+        "unit_rows": 3,
+        "web_manifest_ready": True,
+        "web_completed_units": 1,
+        "web_total_units": 2,
+        "web_practice_completed": True,
+        "app_totals_ready": True,
+        "app_seen_units": 2,
+        "app_completed_units": 1,
+        "app_total_units": 4,
+    }
+
+    web_live = web_progress.summarize_web_lesson_progress(
+        ["lesson-1"], progress_rows, unit_rows, {"lesson-1": MANIFEST}
+    )
+    app_live = app_progress.summarize_app_lesson_progress_from_totals(
+        ["lesson-1"], progress_rows, unit_rows, {"lesson-1": 4}
+    )
+
+    assert progress_summaries.web_summary_from_row("lesson-1", row) == web_live["lesson-1"]
+    assert progress_summaries.app_summary_from_row("lesson-1", row) == app_live["lesson-1"]
+    assert progress_summaries.app_summary_from_row("lesson-1", row)["resume"] == {
+        "unit_type": "page",
+        "unit_key": "app:page:practice",
+    }
+
+
+def test_missing_row_means_not_started_and_unready_rows_are_computed_live(monkeypatch):
+    rows = [{"lesson_id": "lesson-2", "has_progress_row": True, "web_manifest_ready": False}]
+    monkeypatch.setattr(progress_summaries, "_summary_table_missing", False)
+    monkeypatch.setattr(
+        progress_summaries,
+        "supabase",
+        SimpleNamespace(table=lambda name: FakeSummaryQuery(rows)),
+    )
+    live_calls = []
+
+    def fake_live(user_id, lesson_ids):
+        live_calls.append(list(lesson_ids))
+        return {lesson_id: {"lesson_id": lesson_id, "source": "live"} for lesson_id in lesson_ids}
+
+    monkeypatch.setattr(progress_summaries, "compute_web_summaries_live", fake_live)
+    manifest_calls = []
+
+    def fake_expectations(lesson_ids, fallback=True, persist_fallback=False):
+        manifest_calls.append(list(lesson_ids))
+        return {lesson_id: MANIFEST for lesson_id in lesson_ids}
+
+    monkeypatch.setattr(progress_summaries, "fetch_web_lesson_expectations", fake_expectations)
+
+    summaries = progress_summaries.get_web_lesson_progress_summaries("user-1", ["lesson-1", "lesson-2"])
+
+    assert live_calls == [["lesson-2"]]
+    assert manifest_calls == [["lesson-1"]]
+    assert summaries["lesson-1"]["has_started"] is False
+    assert summaries["lesson-1"]["total_units"] == 2
+    assert summaries["lesson-1"]["percent_complete"] == 0
+    assert summaries["lesson-2"]["source"] == "live"
+
+
+def test_unstarted_app_lessons_report_stored_totals(monkeypatch):
+    monkeypatch.setattr(progress_summaries, "_summary_table_missing", False)
+    monkeypatch.setattr(
+        progress_summaries,
+        "supabase",
+        SimpleNamespace(table=lambda name: FakeSummaryQuery([])),
+    )
+    total_calls = []
+
+    def fake_totals(lesson_ids, fallback=False, persist_fallback=False):
+        total_calls.append(list(lesson_ids))
+        return {"lesson-1": 7, "lesson-2": 3}
+
+    monkeypatch.setattr(progress_summaries, "fetch_app_total_units_for_many", fake_totals)
+
+    summaries = progress_summaries.get_app_lesson_progress_summaries("user-1", ["lesson-1", "lesson-2"])
+
+    assert total_calls == [["lesson-1", "lesson-2"]]
+    assert summaries["lesson-1"]["total_units"] == 7
+    assert summaries["lesson-2"]["total_units"] == 3
+    assert summaries["lesson-2"]["has_started"] is False
+    assert summaries["lesson-2"]["resume"] is None
+
+
+def test_missing_summary_table_falls_back_to_live(monkeypatch):
+    monkeypatch.setattr(progress_summaries, "_summary_table_missing", False)
+    monkeypatch.setattr(
+        progress_summaries,
+        "supabase",
+        SimpleNamespace(table=lambda name: FakeSummaryQuery(error=Exception("PGRST205 missing table"))),
+    )
+    monkeypatch.setattr(
+        progress_summaries,
+        "compute_app_summaries_live",
+        lambda user_id, lesson_ids: {"lesson-1": {"source": "live"}},
+    )
+
+    summaries = progress_summaries.get_app_lesson_progress_summaries("user-1", ["lesson-1"])
+
+    assert summaries == {"lesson-1": {"source": "live"}}
+    assert progress_summaries._summary_table_missing is True
+
+
+def test_check_compares_what_the_routes_serve(monkeypatch):
+    lesson_ids = ["lesson-1", "lesson-2", "lesson-3", "lesson-4"]
+    progress_rows = [
+        {"lesson_id": "lesson-3", "is_completed": True},
+        {"lesson_id": "lesson-4", "is_completed": True},
+    ]
+    ready = {
+        "has_progress_row": True,
+        "manually_completed": True,
+        "web_manifest_ready": True,
+        "web_total_units": 2,
+        "app_totals_ready": True,
+        "app_total_units": 4,
+    }
+    rows = {
+        # lesson-1 has no row; lesson-2's row predates its manifest and total.
+        "lesson-2": {"lesson_id": "lesson-2", "has_progress_row": True},
+        "lesson-3": {"lesson_id": "lesson-3", **ready},
+        "lesson-4": {"lesson_id": "lesson-4", **ready, "web_total_units": 5},
+    }
+
+    def web_live(user_id, ids):
+        return web_progress.summarize_web_lesson_progress(
+            ids, progress_rows, [], {lesson_id: MANIFEST for lesson_id in ids}
+        )
+
+    def app_live(user_id, ids):
+        return app_progress.summarize_app_lesson_progress_from_totals(
+            ids, progress_rows, [], {lesson_id: 4 for lesson_id in ids}
+        )
+
+    for module in (progress_summaries, rebuild_tool):
+        monkeypatch.setattr(module, "compute_web_summaries_live", web_live)
+        monkeypatch.setattr(module, "compute_app_summaries_live", app_live)
+    monkeypatch.setattr(rebuild_tool, "fetch_progress_summary_rows", lambda user_id, ids: rows)
+    monkeypatch.setattr(
+        progress_summaries,
+        "fetch_web_lesson_expectations",
+        lambda ids, fallback=True, persist_fallback=False: {lesson_id: MANIFEST for lesson_id in ids},
+    )
+    monkeypatch.setattr(
+        progress_summaries,
+        "fetch_app_total_units_for_many",
+        lambda ids, fallback=False, persist_fallback=False: {lesson_id: 4 for lesson_id in ids},
+    )
+
+    mismatches = rebuild_tool.check_user("user-1", lesson_ids)
+
+    assert mismatches == ["  web user=user-1 lesson=lesson-4 total_units: stored=5 live=2"]
@@ -0,0 +1,31 @@
+import threading
+
+from app import supabase_client
+
+
+def test_run_concurrently_returns_results_by_name():
+    results = supabase_client.run_concurrently(
+        {
+            "a": lambda: 1,
+            "b": lambda: threading.current_thread().name,
+        }
+    )
+
+    assert results["a"] == 1
+    assert results["b"].startswith(supabase_client.SUPABASE_THREAD_NAME_PREFIX)
+
+
+def test_nested_run_concurrently_runs_inline_instead_of_deadlocking():
+    def outer():
+        return supabase_client.run_concurrently({"inner": lambda: "done"})
+
+    metrics_before = supabase_client.get_supabase_pool_metrics()["executor"]
+    results = supabase_client.run_concurrently({"outer": outer})
+    metrics_after = supabase_client.get_supabase_pool_metrics()["executor"]
+
+    assert results == {"outer": {"inner": "done"}}
+    assert metrics_after["inline_runs"] == metrics_before["inline_runs"] + 1
+
+
+def test_executor_is_shared_within_a_worker():
+    assert supabase_client.get_supabase_executor() is supabase_client.get_supabase_executor()
@@ -0,0 +1,96 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from flask import Flask
+
+routes_module = import_module("app.routes")
+topic_library = import_module("app.topic_library")
+
+TOPIC_ROW = {
+    "id": "topic-1",
+    "idx": 1,
+    "slug": "countable",
+    "name": "Countable nouns",
+    "name_th": "คำนามนับได้",
+    "subtitle": "Some or any",
+    "subtitle_th": None,
+    "tags": ["nouns"],
+    "is_featured": True,
+    "content_jsonb": [{"kind": "paragraph"}],
+    "content_jsonb_th": [{"kind": "paragraph_th"}],
+}
+
+
+class FakeTopicQuery:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def select(self, columns):
+        self.calls.append(columns)
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        self.slug = value
+        return self
+
+    def execute(self):
+        if getattr(self, "slug", "countable") != "countable":
+            return SimpleNamespace(data=[])
+        if self.calls[-1] == topic_library.TOPIC_INDEX_SELECT:
+            row = {key: value for key, value in TOPIC_ROW.items() if not key.startswith("content")}
+            row["content_jsonb_th_head"] = TOPIC_ROW["content_jsonb_th"][0]
+            return SimpleNamespace(data=[row])
+        return SimpleNamespace(data=[dict(TOPIC_ROW)])
+
+
+def make_client(monkeypatch):
+    calls = []
+    topic_library.invalidate_topic_cache()
+    monkeypatch.setattr(
+        topic_library,
+        "supabase",
+        SimpleNamespace(table=lambda name: FakeTopicQuery(calls)),
+    )
+    app = Flask(__name__)
+    app.register_blueprint(routes_module.routes)
+    return app.test_client(), calls
+
+
+def test_index_view_omits_bodies_and_is_cached_per_language(monkeypatch):
+    client, calls = make_client(monkeypatch)
+
+    first = client.get("/api/topic-library?view=index&lang=th")
+    second = client.get("/api/topic-library?view=index&lang=th")
+
+    assert first.get_json() == {
+        "topics": [{
+            "id": "topic-1",
+            "name": "คำนามนับได้",
+            "subtitle": "Some or any",
+            "slug": "countable",
+            "tags": ["nouns"],
+            "is_featured": True,
+        }]
+    }
+    assert second.data == first.data
+    assert calls == [topic_library.TOPIC_INDEX_SELECT]
+
+
+def test_topic_body_is_cached_and_revalidates_with_etag(monkeypatch):
+    client, calls = make_client(monkeypatch)
+
+    first = client.get("/api/topic-library/countable?lang=en")
+    etag = first.headers["ETag"]
+    revalidated = client.get(
+        "/api/topic-library/countable?lang=en",
+        headers={"If-None-Match": etag},
+    )
+    missing = client.get("/api/topic-library/unknown?lang=en")
+
+    assert first.get_json()["topic"]["content_jsonb"] == [{"kind": "paragraph"}]
+    assert revalidated.status_code == 304
+    assert missing.status_code == 404
+    assert calls == ["*", "*"]
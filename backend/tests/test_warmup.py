@@ -0,0 +1,43 @@
+from importlib import import_module
+
+warmup_module = import_module("app.warmup")
+
+
+def test_warm_caches_runs_every_task_and_reports_failures(monkeypatch, capsys):
+    calls = []
+
+    def fake_resolve(lesson_id, lang):
+        calls.append(("resolve", lesson_id, lang))
+
+    def failing_audio(lesson_id):
+        raise RuntimeError("storage down")
+
+    monkeypatch.setattr(warmup_module, "PUBLIC_TRY_LESSON_IDS", ["lesson-1"])
+    monkeypatch.setattr(warmup_module, "get_cached_pathway_lessons", lambda: calls.append(("pathway",)))
+    monkeypatch.setattr(warmup_module, "_get_cached_global_images", lambda: calls.append(("images",)))
+    monkeypatch.setattr(warmup_module, "resolve_lesson_payload", fake_resolve)
+    monkeypatch.setattr(warmup_module, "_build_try_audio_payload", failing_audio)
+
+    timings = warmup_module.warm_caches()
+
+    assert sorted(calls) == [
+        ("images",),
+        ("pathway",),
+        ("resolve", "lesson-1", "en"),
+        ("resolve", "lesson-1", "th"),
+    ]
+    assert set(timings) == {
+        "pathway_lessons",
+        "global_images",
+        "try_lesson:lesson-1:en",
+        "try_lesson:lesson-1:th",
+    }
+    out = capsys.readouterr().out
+    assert "[warmup] task failed name=try_audio:lesson-1" in out
+    assert "[warmup] done tasks=5 failed=1" in out
+
+
+def test_start_cache_warmup_respects_config(monkeypatch):
+    monkeypatch.setattr(warmup_module.Config, "CACHE_WARMUP_ENABLED", False)
+
+    assert warmup_module.start_cache_warmup() is None
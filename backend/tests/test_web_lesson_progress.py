@@ -0,0 +1,156 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+web_progress = import_module("app.web_lesson_progress")
+
+MANIFEST = {
+    "section_unit_keys": ["section:prepare"],
+    "exercise_unit_keys": ["exercise:ex-1"],
+    "comprehension_unit_keys": [],
+    "all_visible_unit_keys": ["section:prepare", "exercise:ex-1"],
+}
+
+
+class FakeLessonsQuery:
+    def __init__(self, rows, calls):
+        self.rows = rows
+        self.calls = calls
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def in_(self, column, values):
+        self.calls.append(("select", tuple(values)))
+        return self
+
+    def update(self, payload):
+        self.calls.append(("update", payload["web_total_units"]))
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+def test_fetch_uses_stored_manifest_and_builds_missing_ones(monkeypatch):
+    calls = []
+    rows = [
+        {"id": "lesson-1", "web_unit_manifest": MANIFEST},
+        {"id": "lesson-2", "web_unit_manifest": None},
+    ]
+    web_progress._web_expectations_cache.clear()
+    monkeypatch.setattr(
+        web_progress,
+        "supabase",
+        SimpleNamespace(table=lambda name: FakeLessonsQuery(rows, calls)),
+    )
+    built = []
+
+    def fake_build(lesson_ids):
+        built.append(list(lesson_ids))
+        return {"lesson-2": dict(MANIFEST, all_visible_unit_keys=["section:prepare"])}
+
+    monkeypatch.setattr(web_progress, "build_web_lesson_expectations_for_many", fake_build)
+
+    expectations = web_progress.fetch_web_lesson_expectations(
+        ["lesson-1", "lesson-2"], fallback=True, persist_fallback=True
+    )
+    again = web_progress.fetch_web_lesson_expectations(["lesson-1"])
+
+    assert expectations["lesson-1"] == MANIFEST
+    assert expectations["lesson-2"]["all_visible_unit_keys"] == ["section:prepare"]
+    assert again["lesson-1"] == MANIFEST
+    assert built == [["lesson-2"]]
+    assert calls == [("select", ("lesson-1", "lesson-2")), ("update", 1)]
+
+
+def test_summary_completes_lesson_when_all_practice_exercises_are_done():
+    summaries = web_progress.summarize_web_lesson_progress(
+        ["lesson-1"],
+        [],
+        [{"lesson_id": "lesson-1", "unit_key": "exercise:ex-1", "is_completed": True}],
+        {"lesson-1": MANIFEST},
+    )
+
+    assert summaries["lesson-1"]["is_completed"] is True
+    assert summaries["lesson-1"]["completed_units"] == 1
+    assert summaries["lesson-1"]["total_units"] == 2
+
+
+def test_source_queries_run_concurrently_with_timings():
+    import threading
+
+    barrier = threading.Barrier(2, timeout=2)
+
+    class BarrierQuery:
+        def __init__(self, name):
+            self.name = name
+
+        def execute(self):
+            # Both queries must be in flight at once for the barrier to release.
+            barrier.wait()
+            return SimpleNamespace(data=[self.name])
+
+    results, timings = web_progress.run_source_queries({
+        "sections": (lambda: BarrierQuery("sections"), "sections"),
+        "transcript": (lambda: BarrierQuery("transcript"), "transcript"),
+    })
+
+    assert results["sections"].data == ["sections"]
+    assert results["transcript"].data == ["transcript"]
+    assert set(timings) == {"sections", "transcript"}
+
+
+def test_phrase_content_presence_uses_first_rich_text_node():
+    assert web_progress.phrase_has_content({"content_jsonb_th_head": {"text": "hi"}})
+    assert web_progress.phrase_has_content({"content": " hello "})
+    assert not web_progress.phrase_has_content(
+        {"content": " ", "content_th": None, "content_jsonb_head": None}
+    )
+
+
+class FakeCountsSupabase:
+    def __init__(self, rpc_error=None):
+        self.rpc_error = rpc_error
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append(("rpc", name))
+        rows = [{"lesson_id": "lesson-1", "transcript_count": 12, "question_count": 0}]
+        return SimpleNamespace(execute=lambda: self._rpc_result(rows))
+
+    def _rpc_result(self, rows):
+        if self.rpc_error:
+            raise RuntimeError(self.rpc_error)
+        return SimpleNamespace(data=rows)
+
+    def table(self, name):
+        self.calls.append(("table", name))
+        rows = [{"lesson_id": "lesson-1"}] * (2 if name == "transcript_lines" else 1)
+        query = SimpleNamespace()
+        query.select = lambda *args: query
+        query.in_ = lambda *args: query
+        query.execute = lambda: SimpleNamespace(data=rows)
+        return query
+
+
+def test_content_counts_use_grouped_rpc_and_fall_back_to_rows(monkeypatch):
+    app_progress = import_module("app.app_lesson_progress")
+    fake = FakeCountsSupabase()
+    monkeypatch.setattr(app_progress, "supabase", fake)
+    monkeypatch.setattr(app_progress, "_content_counts_rpc_missing", False)
+
+    assert app_progress.fetch_lesson_content_counts(["lesson-1"]) == {
+        "lesson-1": {"transcript": 12, "questions": 0}
+    }
+    assert fake.calls == [("rpc", "get_lesson_content_counts")]
+
+    missing = FakeCountsSupabase(rpc_error="PGRST202 Could not find the function")
+    monkeypatch.setattr(app_progress, "supabase", missing)
+    for _ in range(2):
+        assert app_progress.fetch_lesson_content_counts(["lesson-1"]) == {
+            "lesson-1": {"transcript": 2, "questions": 1}
+        }
+    assert missing.calls.count(("rpc", "get_lesson_content_counts")) == 1
@@ -130,7 +130,7 @@ const FreeLessonsIndex = () => {
           return;
         }
 
-        const response = await fetch(`${API_BASE_URL}/api/user/completed-lessons`, {
+        const response = await fetch(`${API_BASE_URL}/api/user/completed-lessons?ids_only=1`, {
           method: "GET",
           headers: {
             Authorization: `Bearer ${session.access_token}`,
@@ -140,7 +140,7 @@ const FreeLessonsIndex = () => {
 
         if (response.ok) {
           const data = await response.json();
-          setCompletedLessons(data.completed_lessons || []);
+          setCompletedLessons((data.completed_lesson_ids || []).map((lesson_id) => ({ lesson_id })));
         } else {
           setCompletedLessons([]);
         }
@@ -300,7 +300,7 @@ const LessonsIndex = () => {
           return;
         }
 
-        const response = await fetch(`${API_BASE_URL}/api/user/completed-lessons`, {
+        const response = await fetch(`${API_BASE_URL}/api/user/completed-lessons?ids_only=1`, {
           method: 'GET',
           headers: {
             'Authorization': `Bearer ${session.access_token}`,
@@ -310,11 +310,12 @@ const LessonsIndex = () => {
 
         if (response.ok) {
           const data = await response.json();
+          const completedLessonIds = data.completed_lesson_ids || [];
           if (!cancelled) {
-            setCompletedLessons(data.completed_lessons || []);
+            setCompletedLessons(completedLessonIds.map((lesson_id) => ({ lesson_id })));
           }
           logLessonLibraryTiming("fetchCompletedLessons", startedAt, {
-            count: (data.completed_lessons || []).length,
+            count: completedLessonIds.length,
           });
         }
       } catch (error) {
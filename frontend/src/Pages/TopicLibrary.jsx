@@ -85,7 +85,7 @@ const TopicLibrary = ({ toggleSignupModal }) => {
           setLoading(true);
           setError(null);
         }
-        const response = await fetch(`${API_BASE_URL}/api/topic-library?lang=${uiLang}`, {
+        const response = await fetch(`${API_BASE_URL}/api/topic-library?view=index&lang=${uiLang}`, {
           signal: controller.signal,
         });
         if (!response.ok) {
@@ -0,0 +1,17 @@
+create table if not exists public.compiled_lessons (
+  lesson_id uuid not null references public.lessons (id) on delete cascade,
+  lang text not null check (lang in ('en', 'th')),
+  payload text not null,
+  content_hash text not null,
+  compiled_at timestamptz not null default now(),
+  primary key (lesson_id, lang)
+);
+
+comment on table public.compiled_lessons is
+'Resolved lesson JSON per language, written by the lesson importer and served by the resolver before it falls back to resolving live.';
+
+comment on column public.compiled_lessons.payload is
+'Encoded JSON exactly as served, stored as text so the bytes and content_hash survive the round trip.';
+
+-- Only the backend (service role) reads and writes snapshots; paid content must not be exposed to anon.
+alter table public.compiled_lessons enable row level security;
@@ -0,0 +1,43 @@
+create sequence if not exists public.content_versions_change_id_seq;
+
+create table if not exists public.content_versions (
+  scope text not null,
+  key text not null default '',
+  version bigint not null default 1,
+  change_id bigint not null default nextval('public.content_versions_change_id_seq'),
+  updated_at timestamptz not null default now(),
+  primary key (scope, key)
+);
+
+create index if not exists content_versions_change_id_idx
+  on public.content_versions (change_id);
+
+alter table public.content_versions enable row level security;
+
+comment on table public.content_versions is
+'Bumped by the import and backfill tools; backend workers poll rows with change_id above their watermark and evict only the matching cache keys. An empty key means the whole scope.';
+
+create or replace function public.bump_content_versions(p_scope text, p_keys text[] default array['']::text[])
+returns bigint
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  v_change_id bigint := 0;
+begin
+  insert into public.content_versions (scope, key)
+  select distinct p_scope, coalesce(k, '')
+  from unnest(coalesce(p_keys, array['']::text[])) as k
+  on conflict (scope, key) do update set
+    version = public.content_versions.version + 1,
+    change_id = nextval('public.content_versions_change_id_seq'),
+    updated_at = now();
+
+  select coalesce(max(change_id), 0) into v_change_id from public.content_versions;
+  return v_change_id;
+end;
+$$;
+
+revoke execute on function public.bump_content_versions(text, text[]) from public, anon, authenticated;
+grant execute on function public.bump_content_versions(text, text[]) to service_role;
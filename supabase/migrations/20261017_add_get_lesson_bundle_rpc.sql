@@ -0,0 +1,91 @@
+create or replace function public.get_lesson_bundle(p_lesson_id uuid)
+returns jsonb
+language sql
+stable
+set search_path = public
+as $$
+  select jsonb_build_object(
+    'lesson', jsonb_build_object(
+      'id', l.id,
+      'stage', l.stage,
+      'level', l.level,
+      'lesson_order', l.lesson_order,
+      'image_url', l.image_url,
+      'conversation_audio_url', l.conversation_audio_url,
+      'lesson_external_id', l.lesson_external_id,
+      'title', l.title,
+      'title_th', l.title_th,
+      'subtitle', l.subtitle,
+      'subtitle_th', l.subtitle_th,
+      'focus', l.focus,
+      'focus_th', l.focus_th,
+      'backstory', l.backstory,
+      'backstory_th', l.backstory_th,
+      'header_img', l.header_img
+    ),
+    'sections', coalesce((
+      select jsonb_agg(to_jsonb(s) order by s.sort_order)
+      from public.lesson_sections s
+      where s.lesson_id = l.id
+    ), '[]'::jsonb),
+    'transcript', coalesce((
+      select jsonb_agg(to_jsonb(t) order by t.sort_order)
+      from public.transcript_lines t
+      where t.lesson_id = l.id
+    ), '[]'::jsonb),
+    'questions', coalesce((
+      select jsonb_agg(to_jsonb(q) order by q.sort_order)
+      from public.comprehension_questions q
+      where q.lesson_id = l.id
+    ), '[]'::jsonb),
+    'exercises', coalesce((
+      select jsonb_agg(to_jsonb(e) order by e.sort_order)
+      from public.practice_exercises e
+      where e.lesson_id = l.id
+    ), '[]'::jsonb),
+    'phrase_links', coalesce((
+      select jsonb_agg(
+        jsonb_build_object(
+          'lesson_id', lp.lesson_id,
+          'phrase_id', lp.phrase_id,
+          'sort_order', lp.sort_order,
+          'phrases', to_jsonb(p)
+        )
+        order by lp.sort_order
+      )
+      from public.lesson_phrases lp
+      left join public.phrases p on p.id = lp.phrase_id
+      where lp.lesson_id = l.id
+    ), '[]'::jsonb),
+    'images', coalesce((
+      select jsonb_agg(jsonb_build_object('image_key', i.image_key, 'url', i.url))
+      from public.lesson_images i
+      where i.lesson_id = l.id
+    ), '[]'::jsonb),
+    'common_mistakes', coalesce((
+      select jsonb_agg(
+        jsonb_build_object(
+          'id', cm.id,
+          'lesson_id', cm.lesson_id,
+          'mistake_code', cm.mistake_code,
+          'title', cm.title,
+          'title_th', cm.title_th,
+          'sort_order', cm.sort_order,
+          'scm', cm.scm,
+          'content_jsonb', cm.content_jsonb,
+          'content_jsonb_th', cm.content_jsonb_th
+        )
+        order by cm.sort_order
+      )
+      from public.common_mistakes cm
+      where cm.lesson_id = l.id
+    ), '[]'::jsonb)
+  )
+  from public.lessons l
+  where l.id = p_lesson_id;
+$$;
+
+comment on function public.get_lesson_bundle(uuid) is
+'Returns every row the lesson resolver needs for one lesson as a single JSON document (LESSON_BUNDLE_MODE=rpc).';
+
+grant execute on function public.get_lesson_bundle(uuid) to anon, authenticated, service_role;
@@ -0,0 +1,26 @@
+create or replace function public.get_lesson_content_counts(p_lesson_ids uuid[])
+returns table (lesson_id uuid, transcript_count integer, question_count integer)
+language sql
+stable
+set search_path = public
+as $$
+  select
+    l.id as lesson_id,
+    (
+      select count(*)::integer
+      from public.transcript_lines t
+      where t.lesson_id = l.id
+    ) as transcript_count,
+    (
+      select count(*)::integer
+      from public.comprehension_questions q
+      where q.lesson_id = l.id
+    ) as question_count
+  from public.lessons l
+  where l.id = any(p_lesson_ids);
+$$;
+
+comment on function public.get_lesson_content_counts(uuid[]) is
+'Per-lesson transcript line and comprehension question counts for progress expectations; one row per lesson instead of one per line.';
+
+grant execute on function public.get_lesson_content_counts(uuid[]) to anon, authenticated, service_role;
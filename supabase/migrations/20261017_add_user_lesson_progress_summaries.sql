@@ -0,0 +1,272 @@
+create table if not exists public.user_lesson_progress_summaries (
+  user_id uuid not null,
+  lesson_id uuid not null references public.lessons(id) on delete cascade,
+  has_progress_row boolean not null default false,
+  manually_completed boolean not null default false,
+  last_unit_type text,
+  last_unit_key text,
+  last_unit_section_key text,
+  unit_rows integer not null default 0,
+  web_manifest_ready boolean not null default false,
+  web_completed_units integer not null default 0,
+  web_total_units integer not null default 0,
+  web_practice_completed boolean not null default false,
+  app_totals_ready boolean not null default false,
+  app_seen_units integer not null default 0,
+  app_completed_units integer not null default 0,
+  app_total_units integer not null default 0,
+  updated_at timestamptz not null default now(),
+  primary key (user_id, lesson_id)
+);
+
+create index if not exists user_lesson_progress_summaries_lesson_id_idx
+  on public.user_lesson_progress_summaries (lesson_id);
+
+alter table public.user_lesson_progress_summaries enable row level security;
+
+comment on table public.user_lesson_progress_summaries is
+'One row per user and lesson with the counts behind the web and app progress summaries. Maintained by triggers on user_lesson_progress, user_lesson_unit_progress and lessons.';
+
+create or replace function public.refresh_user_lesson_progress_summary(p_user_id uuid, p_lesson_id uuid)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  v_progress record;
+  v_has_progress boolean;
+  v_manifest jsonb;
+  v_app_total integer;
+  v_unit_rows integer;
+  v_app_seen integer;
+  v_app_completed integer;
+  v_web_completed integer;
+  v_practice_completed boolean;
+  v_last_section_key text;
+begin
+  if p_user_id is null or p_lesson_id is null then
+    return;
+  end if;
+
+  select l.web_unit_manifest, l.app_total_units
+  into v_manifest, v_app_total
+  from public.lessons l
+  where l.id = p_lesson_id;
+
+  if not found then
+    delete from public.user_lesson_progress_summaries
+    where user_id = p_user_id and lesson_id = p_lesson_id;
+    return;
+  end if;
+
+  select p.is_completed, p.last_unit_type, p.last_unit_key
+  into v_progress
+  from public.user_lesson_progress p
+  where p.user_id = p_user_id and p.lesson_id = p_lesson_id;
+  v_has_progress := found;
+
+  select
+    count(*),
+    count(distinct u.unit_key) filter (where u.unit_key like 'app:%'),
+    count(distinct u.unit_key) filter (where u.unit_key like 'app:%' and u.is_completed)
+  into v_unit_rows, v_app_seen, v_app_completed
+  from public.user_lesson_unit_progress u
+  where u.user_id = p_user_id and u.lesson_id = p_lesson_id;
+
+  if not v_has_progress and v_unit_rows = 0 then
+    delete from public.user_lesson_progress_summaries
+    where user_id = p_user_id and lesson_id = p_lesson_id;
+    return;
+  end if;
+
+  select count(*)
+  into v_web_completed
+  from jsonb_array_elements_text(coalesce(v_manifest->'all_visible_unit_keys', '[]'::jsonb)) as k(unit_key)
+  where exists (
+    select 1
+    from public.user_lesson_unit_progress u
+    where u.user_id = p_user_id
+      and u.lesson_id = p_lesson_id
+      and u.unit_key = k.unit_key
+      and u.is_completed
+  );
+
+  select
+    count(*) > 0
+    and bool_and(exists (
+      select 1
+      from public.user_lesson_unit_progress u
+      where u.user_id = p_user_id
+        and u.lesson_id = p_lesson_id
+        and u.unit_key = k.unit_key
+        and u.is_completed
+    ))
+  into v_practice_completed
+  from jsonb_array_elements_text(coalesce(v_manifest->'exercise_unit_keys', '[]'::jsonb)) as k(unit_key);
+
+  if v_has_progress and v_progress.last_unit_key is not null then
+    select u.section_key
+    into v_last_section_key
+    from public.user_lesson_unit_progress u
+    where u.user_id = p_user_id
+      and u.lesson_id = p_lesson_id
+      and u.unit_key = v_progress.last_unit_key
+    limit 1;
+  end if;
+
+  insert into public.user_lesson_progress_summaries (
+    user_id,
+    lesson_id,
+    has_progress_row,
+    manually_completed,
+    last_unit_type,
+    last_unit_key,
+    last_unit_section_key,
+    unit_rows,
+    web_manifest_ready,
+    web_completed_units,
+    web_total_units,
+    web_practice_completed,
+    app_totals_ready,
+    app_seen_units,
+    app_completed_units,
+    app_total_units,
+    updated_at
+  )
+  values (
+    p_user_id,
+    p_lesson_id,
+    v_has_progress,
+    v_has_progress and coalesce(v_progress.is_completed, false),
+    case when v_has_progress then v_progress.last_unit_type end,
+    case when v_has_progress then v_progress.last_unit_key end,
+    v_last_section_key,
+    v_unit_rows,
+    jsonb_typeof(v_manifest->'all_visible_unit_keys') = 'array',
+    v_web_completed,
+    coalesce(jsonb_array_length(
+      case when jsonb_typeof(v_manifest->'all_visible_unit_keys') = 'array'
+        then v_manifest->'all_visible_unit_keys' end
+    ), 0),
+    coalesce(v_practice_completed, false),
+    v_app_total is not null,
+    v_app_seen,
+    v_app_completed,
+    coalesce(v_app_total, 0),
+    now()
+  )
+  on conflict (user_id, lesson_id) do update set
+    has_progress_row = excluded.has_progress_row,
+    manually_completed = excluded.manually_completed,
+    last_unit_type = excluded.last_unit_type,
+    last_unit_key = excluded.last_unit_key,
+    last_unit_section_key = excluded.last_unit_section_key,
+    unit_rows = excluded.unit_rows,
+    web_manifest_ready = excluded.web_manifest_ready,
+    web_completed_units = excluded.web_completed_units,
+    web_total_units = excluded.web_total_units,
+    web_practice_completed = excluded.web_practice_completed,
+    app_totals_ready = excluded.app_totals_ready,
+    app_seen_units = excluded.app_seen_units,
+    app_completed_units = excluded.app_completed_units,
+    app_total_units = excluded.app_total_units,
+    updated_at = excluded.updated_at;
+end;
+$$;
+
+create or replace function public.rebuild_user_lesson_progress_summaries(p_user_id uuid default null)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  v_pair record;
+  v_count integer := 0;
+begin
+  if p_user_id is null then
+    truncate public.user_lesson_progress_summaries;
+  else
+    delete from public.user_lesson_progress_summaries where user_id = p_user_id;
+  end if;
+
+  for v_pair in
+    select user_id, lesson_id from public.user_lesson_progress
+    where p_user_id is null or user_id = p_user_id
+    union
+    select user_id, lesson_id from public.user_lesson_unit_progress
+    where p_user_id is null or user_id = p_user_id
+  loop
+    perform public.refresh_user_lesson_progress_summary(v_pair.user_id, v_pair.lesson_id);
+    v_count := v_count + 1;
+  end loop;
+
+  return v_count;
+end;
+$$;
+
+create or replace function public.user_lesson_progress_summary_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  if tg_op in ('INSERT', 'UPDATE') then
+    perform public.refresh_user_lesson_progress_summary(new.user_id, new.lesson_id);
+  end if;
+  if tg_op = 'DELETE'
+    or (tg_op = 'UPDATE' and (old.user_id, old.lesson_id) is distinct from (new.user_id, new.lesson_id)) then
+    perform public.refresh_user_lesson_progress_summary(old.user_id, old.lesson_id);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists user_lesson_progress_summary_refresh on public.user_lesson_progress;
+create trigger user_lesson_progress_summary_refresh
+after insert or update or delete on public.user_lesson_progress
+for each row execute function public.user_lesson_progress_summary_trigger();
+
+drop trigger if exists user_lesson_unit_progress_summary_refresh on public.user_lesson_unit_progress;
+create trigger user_lesson_unit_progress_summary_refresh
+after insert or update or delete on public.user_lesson_unit_progress
+for each row execute function public.user_lesson_progress_summary_trigger();
+
+-- Re-importing a lesson rewrites its unit manifest and app total, which changes
+-- every learner's counts for that lesson.
+create or replace function public.lesson_progress_totals_summary_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  v_user_id uuid;
+begin
+  for v_user_id in
+    select s.user_id from public.user_lesson_progress_summaries s where s.lesson_id = new.id
+  loop
+    perform public.refresh_user_lesson_progress_summary(v_user_id, new.id);
+  end loop;
+  return null;
+end;
+$$;
+
+drop trigger if exists lessons_progress_totals_summary_refresh on public.lessons;
+create trigger lessons_progress_totals_summary_refresh
+after update of web_unit_manifest, app_total_units on public.lessons
+for each row
+when (
+  old.web_unit_manifest is distinct from new.web_unit_manifest
+  or old.app_total_units is distinct from new.app_total_units
+)
+execute function public.lesson_progress_totals_summary_trigger();
+
+revoke execute on function public.refresh_user_lesson_progress_summary(uuid, uuid) from public, anon, authenticated;
+revoke execute on function public.rebuild_user_lesson_progress_summaries(uuid) from public, anon, authenticated;
+grant execute on function public.refresh_user_lesson_progress_summary(uuid, uuid) to service_role;
+grant execute on function public.rebuild_user_lesson_progress_summaries(uuid) to service_role;
+
+select public.rebuild_user_lesson_progress_summaries();
@@ -0,0 +1,9 @@
+alter table public.lessons
+add column if not exists web_unit_manifest jsonb,
+add column if not exists web_total_units integer;
+
+comment on column public.lessons.web_unit_manifest is
+'Cached web lesson unit keys (section, exercise, comprehension and all visible) used for progress summaries.';
+
+comment on column public.lessons.web_total_units is
+'Cached total count of web lesson units used for progress summaries.';